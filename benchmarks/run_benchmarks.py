@@ -0,0 +1,212 @@
+"""Benchmark every fuzzer against every target and write the results as JSON.
+
+    python -m benchmarks.run_benchmarks --budget 2000 --output results.json
+    python -m benchmarks.run_benchmarks --output new.json --compare old.json
+
+Every fuzzer/target pair runs in its own process with `random` and `np.random` seeded with
+`--seed`, and reports:
+`execs_per_sec`: executions per wall-clock second of the whole campaign,
+`coverage_curve`: `[seconds, coverage]` at every coverage increase, and `time_to_coverage`
+    the seconds needed to reach 50%, 90% and 100% of the final coverage,
+`tracing_overhead`: time to execute the campaign's inputs with a fresh executor, divided by
+    the time to call the target on them without tracing,
+`peak_rss_kb`: peak resident set size of the process (None where `resource` is unavailable).
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.targets import TARGETS
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.fuzzers.cgi_fuzzer import CGIFuzzer
+from poly_fuzzer.fuzzers.html_parser_fuzzer import HTMLParserFuzzer
+from poly_fuzzer.fuzzers.mutation_fuzzer import MutationFuzzer
+from poly_fuzzer.fuzzers.random_fuzzer import RandomFuzzer
+from poly_fuzzer.fuzzers.url_fuzzer import URLFuzzer
+from poly_fuzzer.power_schedules.aflfast_schedule import AFLFastPowerSchedule
+from poly_fuzzer.power_schedules.cgi_schedule import CGIPowerSchedule
+from poly_fuzzer.power_schedules.entropic_schedule import EntropicPowerSchedule
+from poly_fuzzer.power_schedules.html_parser_schedule import HTMLParserPowerSchedule
+from poly_fuzzer.power_schedules.url_schedule import URLPowerSchedule
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# name -> function(executor, seeds, grammar) returning a fuzzer
+FUZZERS = {
+    "random": lambda executor, seeds, grammar: RandomFuzzer(executor),
+    "mutation": lambda executor, seeds, grammar: MutationFuzzer(executor, seeds),
+    "url": lambda executor, seeds, grammar: URLFuzzer(
+        executor, seeds, power_schedule=URLPowerSchedule(), grammar=grammar
+    ),
+    "cgi": lambda executor, seeds, grammar: CGIFuzzer(
+        executor, seeds, power_schedule=CGIPowerSchedule(), grammar=grammar
+    ),
+    "html_parser": lambda executor, seeds, grammar: HTMLParserFuzzer(
+        executor, seeds, power_schedule=HTMLParserPowerSchedule(), grammar=grammar
+    ),
+    # The mutation fuzzer with the path-frequency schedules
+    "aflfast_fast": lambda executor, seeds, grammar: MutationFuzzer(
+        executor, seeds, power_schedule=AFLFastPowerSchedule("fast")
+    ),
+    "aflfast_coe": lambda executor, seeds, grammar: MutationFuzzer(
+        executor, seeds, power_schedule=AFLFastPowerSchedule("coe")
+    ),
+    "entropic": lambda executor, seeds, grammar: MutationFuzzer(
+        executor, seeds, power_schedule=EntropicPowerSchedule()
+    ),
+}
+
+COVERAGE_FRACTIONS = (0.5, 0.9, 1.0)
+
+
+def run_benchmark(fuzzer_name: str, target_name: str, budget: int, seed: int, coverage_mode: str) -> dict:
+    """Run one campaign and measure it."""
+    random.seed(seed)
+    np.random.seed(seed)
+    make_target, seeds, grammar = TARGETS[target_name]
+    executor = AbstractExecutor(make_target(), coverage_mode=coverage_mode)
+    fuzzer = FUZZERS[fuzzer_name](executor, [AbstractSeed(s.data) for s in seeds], grammar)
+
+    inputs = []
+    curve = []
+    coverage = 0
+    start = time.perf_counter()
+    for record in fuzzer.iter_fuzzer(budget):
+        inputs.append(record.input)
+        if record.coverage > coverage:
+            coverage = record.coverage
+            curve.append([time.perf_counter() - start, coverage])
+    seconds = time.perf_counter() - start
+
+    time_to_coverage = {}
+    for fraction in COVERAGE_FRACTIONS:
+        level = fraction * coverage
+        time_to_coverage[str(fraction)] = next(t for t, c in curve if c >= level) if curve else None
+
+    untraced, traced = _tracing_times(make_target, inputs, coverage_mode)
+    return {
+        "fuzzer": fuzzer_name,
+        "target": target_name,
+        "executions": len(inputs),
+        "seconds": seconds,
+        "execs_per_sec": len(inputs) / seconds if seconds else None,
+        "final_coverage": coverage,
+        "coverage_curve": curve,
+        "time_to_coverage": time_to_coverage,
+        "untraced_seconds": untraced,
+        "traced_seconds": traced,
+        "tracing_overhead": traced / untraced if untraced else None,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def _tracing_times(make_target, inputs, coverage_mode):
+    """Time calling a fresh target on `inputs` without and with a fresh executor."""
+    target = make_target()
+    start = time.perf_counter()
+    for input in inputs:
+        try:
+            target(input)
+        except Exception:
+            pass
+    untraced = time.perf_counter() - start
+
+    executor = AbstractExecutor(make_target(), coverage_mode=coverage_mode)
+    start = time.perf_counter()
+    for input in inputs:
+        executor._execute_input(input)
+    traced = time.perf_counter() - start
+    return untraced, traced
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(fuzzers, targets, budget: int, seed: int, coverage_mode: str) -> dict:
+    """Run every fuzzer/target pair in a fresh process, so peak RSS is per pair."""
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    results = []
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for target_name in targets:
+            for fuzzer_name in fuzzers:
+                result = pool.apply(run_benchmark, (fuzzer_name, target_name, budget, seed, coverage_mode))
+                print(
+                    f"{fuzzer_name:>12} {target_name:<12} {result['execs_per_sec']:>9.0f} ex/s  "
+                    f"coverage {result['final_coverage']:>4}  "
+                    f"overhead {result['tracing_overhead']:.1f}x  rss {result['peak_rss_kb']} kB"
+                )
+                results.append(result)
+    return {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "budget": budget,
+        "seed": seed,
+        "coverage_mode": coverage_mode,
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict):
+    """Print the ratio new/old of the main metrics for the pairs found in both files."""
+    old_results = {(r["fuzzer"], r["target"]): r for r in old["results"]}
+    print(f"{'fuzzer':>12} {'target':<12} {'execs/s':>8} {'coverage':>9} {'overhead':>9}")
+    for result in new["results"]:
+        before = old_results.get((result["fuzzer"], result["target"]))
+        if before is None:
+            continue
+        ratios = [
+            result[key] / before[key] if before[key] and result[key] is not None else float("nan")
+            for key in ("execs_per_sec", "final_coverage", "tracing_overhead")
+        ]
+        print(f"{result['fuzzer']:>12} {result['target']:<12} " + " ".join(f"{r:>8.2f}x" for r in ratios))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=2000, help="inputs per campaign")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--coverage-mode", choices=("line", "edge"), default="line")
+    parser.add_argument("--fuzzers", nargs="+", choices=sorted(FUZZERS), default=list(FUZZERS))
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=list(TARGETS))
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    suite = run_suite(args.fuzzers, args.targets, args.budget, args.seed, args.coverage_mode)
+    with open(args.output, "w") as f:
+        json.dump(suite, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), suite)
+
+
+if __name__ == "__main__":
+    main()
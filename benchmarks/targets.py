@@ -0,0 +1,115 @@
+"""Targets of the benchmark suite, with fixed seeds and grammars.
+The seeds and grammars are copies of those in `tests/`, pinned here so that benchmark
+results stay comparable when the test scripts change."""
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.abstract_grammar import AbstractGrammar
+from cgi_decode import cgi_decode
+
+
+CGI_GRAMMAR = AbstractGrammar({
+    "<start>": ["<cgi-input>"],
+    "<cgi-input>": ["<param>=<value>", "<param>=<value>&<cgi-input>"],
+    "<param>": ["name", "id", "search", "query"],
+    "<value>": ["<chars>"],
+    "<chars>": ["<char>", "<char><chars>"],
+    "<char>": ["A", "B", "C", "D", "E", "+", "%20", "%3F", "%", "%GG"],
+})
+
+CGI_SEEDS = [
+    AbstractSeed("+"),
+    AbstractSeed("hello+world"),
+    AbstractSeed("hello%20world"),
+    AbstractSeed("%3F"),
+    AbstractSeed("%"),
+    AbstractSeed("%GG"),
+]
+
+
+URL_GRAMMAR = AbstractGrammar({
+    "<start>": ["<scheme><domain><path><query>"],
+    "<scheme>": ["http://", "https://", "ftp://"],
+    "<domain>": ["<subdomain>.<tld>", "<host>"],
+    "<subdomain>": ["www", "api", "mail", "test"],
+    "<host>": ["example", "localhost", "google", "github"],
+    "<tld>": ["com", "org", "net", "io", "dev"],
+    "<path>": ["", "/<segment>", "/<segment>/<segment>"],
+    "<segment>": ["index", "api", "search", "user", "product"],
+    "<query>": ["", "?<param>", "?<param>&<param>"],
+    "<param>": ["q=<value>", "id=<number>", "type=<word>"],
+    "<value>": ["search", "query", "test"],
+    "<word>": ["user", "admin", "guest", "product"],
+    "<number>": ["1", "2", "123", "456", "789"],
+})
+
+URL_SEEDS = [
+    AbstractSeed("http://mlp.com/"),
+    AbstractSeed("https://test.com/index.html?q=hello"),
+    AbstractSeed("http://localhost/search?id=123&type=test"),
+    AbstractSeed(""),
+    AbstractSeed("www.example.org:8080/"),
+    AbstractSeed("vf9tepQ://HA[}g^o:t@O]6og}glcR$e/K6^6.-9f,if?wKn(kCex|!sc<d/api"),
+    AbstractSeed("http://www.dev.net/user/profile?id=456"),
+    AbstractSeed("https://api.io/product?id=789&type=product"),
+    AbstractSeed("\'f}CV%ki&\\[9/w/fVvU;o?yfcATDsstpVR\\r]WA-tMUJ2L#eNrO(;@E :C=tUu1kh=}1t%kKX-7utPx&DzMLdzx\"hkX_#"),
+    AbstractSeed("google.com")
+]
+
+
+HTML_GRAMMAR = AbstractGrammar({
+    "{start}": ["<!DOCTYPE html>\n<html>\n<head>\n<title>{text}</title>\n</head>\n<body>\n{content}\n</body>\n</html>"],
+    "{content}": ["{element}", "{element}{content}"],
+    "{element}": ["{heading}", "{paragraph}", "{link}", "{image}", "{div}"],
+    "{heading}": ["{h1}", "{h2}", "{h3}"],
+    "{h1}": ["<h1>{safe_text}</h1>"],
+    "{h2}": ["<h2>{safe_text}</h2>"],
+    "{h3}": ["<h3>{safe_text}</h3>"],
+    "{paragraph}": ["<p>{safe_text}</p>"],
+    "{link}": ["<a href=\"{url}\">{safe_text}</a>"],
+    "{image}": ["<img src=\"{url}\" alt=\"{safe_text}\">"],
+    "{div}": ["<div>{content}</div>"],
+    "{text}": [" ", "-", "_"],
+    "{safe_text}": ["{word}", "{word}{text}{word}"],
+    "{word}": ["{letter}", "{letter}{word}", "{number}"],
+    "{number}": ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"],
+    "{letter}": ["a", "b", "c", "d", "e", "f", "g", "h", "i", "j", "k", "l", "m", "n", "o", "p", "q", "r", "s", "t", "u", "v", "w", "x", "y", "z"],
+    "{url}": ["{scheme}{domain}{path}{query}"],
+    "{scheme}": ["http://", "https://", "ftp://"],
+    "{domain}": ["{subdomain}.{tld}", "{host}"],
+    "{subdomain}": ["www", "api", "mail", "test"],
+    "{host}": ["example", "localhost", "google", "github"],
+    "{tld}": ["com", "org", "net", "io", "dev"],
+    "{path}": ["", "/{segment}", "/{segment}/{segment}"],
+    "{segment}": ["index", "api", "search", "user", "product"],
+    "{query}": ["", "?{param}", "?{param}&{param}"],
+    "{param}": ["q={value}", "id={number}", "type={word}"],
+    "{value}": ["search", "query", "test"],
+}, start_symbol="{start}", nonterminal_open="{", nonterminal_close="}")
+
+HTML_SEEDS = [
+    AbstractSeed("<!DOCTYPE html>\n<html>\n<head>\n<title> kjziehfhoirbgrbg béjotbibrizgbfzronvporzjgiirhg</title>\n</head>\n<body>\n<div><div><p>4</p><h2>b</h2></div><div><p>v0 2</p></div><div><img src=\"ftp://example\" alt=\"j\"></div></div>\n</body>\n</html>"),
+    AbstractSeed("<!DlO\"J,?CTYP:&E PZlhtml>$>\n<hVhtml>B\n(Vk<heaTd>9\n<tiYt/4lXN1(?Q71GNe> <{/titlYe>j\n<q/sQhenWad;3_1>\n1w\\COJ4<bYody>\n/<h2>R&@x<FpB/Zh_2>H<?p0>{WgMsc1iYk-;cjv)</_p><G!&Nnh:3ih>1L<;h/hlu+&3><=diTqv[><imgZ s/hy\'o[i-CDzlirp;OKc=\"mg0fYtbpK:/`  x4/e0xX~ZampljQew2\"D 4I^a@tlyf#{2t=O\"f_x0?_QN(|2fP\"5>N>b</divp>,<7p&` a>?fij;<I/p0>\n<%d/1boNdy>e\n+<R/um?%htmQK@$l.>"),
+    AbstractSeed("<!DOCTYPE html><html><head><title>Test</title></head><body><h1>Hello World</h1></body></html>"),
+    AbstractSeed("!DOCTYPE html>\n<html>\n<head>\n<title> </title>\n</head>\n<body>\n<div><div><p>4</p><h2>b</h2></div><div><p>v0 2</p></div><div><img src=\"ftp://example\" alt=\"j\"></div></div>\n</body>\n</html>"),
+    AbstractSeed("<html>hello html parser</html>"),
+    AbstractSeed("mtm/h<?OJp7USbAaepifguegvuir  pgévbgruvouehiphpfabejobjfpiaehihf"),
+    AbstractSeed("!lO\"J,& P<l\n(V/41(7G><Z/tqsa_CJ4b<h&xb<F/>>{gc;cj<_<N:3><;huiqv>< ilrpOm0pK/`e0j\"D Ia@lft=0?N(\"b&/\n<d/oNye\n%hKl.>"),
+    AbstractSeed("<!|=v.@a]Q=~2l><ho@#>WheapSl1!n}u>\\Dat</Gikl0N<W*-LL>g~oe1q<aohLc:m}hltpP/0GxOmZle.QtjijExagm@E(`u/N/7>d-><~ht|l>', 28), ('<!DlO\"J,?CTYP:&E PZlhtml>$>\n<hVhtml>B\n(Vk<heaTd>9\n<tiYt/4lXN1(?Q71GNe> <{/titlYe>j\n<q/sQhenWad;3_1>\n1w\\COJ4<bYody>\n/<h2>R&@x<FpB/Zh_2>H<?p0>{WgMsc1iYk-;cjv)</_p><G!&Nnh:3ih>1L<;h/hlu+&3><=diTqv[><imgZ s/hy\'o[i-CDzlirp;OKc=\"mg0fYtbpK:/`  x4/e0xX~ZampljQew2\"D 4I^a@tlyf#{2t=O\"f_x0?_QN(|2fP\"5>N>b</divp>,<7p&` a>?fij;<I/p0>\n<%d/1boNdy>e\n+<R/um?%htmQK@$l.>"),
+    AbstractSeed("<!DOCTYPE html>\n<html>\n<head>\n<title> </title>\n</head>\n<body>\n<div><div><p>4</p><h2>b</h2></div><div><p>v0 2</p></div><div><img src=\"ftp://example\" alt=\"j\"></div></div>\n</body>\n</html>"),
+]
+
+
+
+def make_html_target():
+    """A fresh parser per campaign: `HTMLParser.feed` keeps unparsed data between calls."""
+    return HTMLParser().feed
+
+
+# name -> (function returning the target, seeds, grammar)
+TARGETS = {
+    "cgi_decode": (lambda: cgi_decode, CGI_SEEDS, CGI_GRAMMAR),
+    "urlparse": (lambda: urlparse, URL_SEEDS, URL_GRAMMAR),
+    "html_parser": (make_html_target, HTML_SEEDS, HTML_GRAMMAR),
+}
@@ -1,60 +1,186 @@
 import inspect
 import time
-import sys
+
+import numpy as np
+
+from poly_fuzzer.common.comparison_tracer import ComparisonTracer
+from poly_fuzzer.common.coverage_backend import AbstractCoverageBackend, make_coverage_backend
+from poly_fuzzer.common.coverage_map import MAP_SIZE, EdgeCoverageMap, location_hashes, signature
+from poly_fuzzer.common.crash_triage import CrashTriage
+from poly_fuzzer.common.result_cache import ResultCache
 
 
 class AbstractExecutor:
     '''
-        
+
     # The `AbstractExecutor` class is a Python class that provides functionality for executing a program
     # module and tracking code coverage.
+    # Coverage is collected by a pluggable `AbstractCoverageBackend`: `sys.monitoring` on Python 3.12+,
+    # `sys.settrace` on older interpreters.
+    # With `coverage_mode="line"` coverage is a set of `(filename, line_number)` pairs. With
+    # `coverage_mode="edge"` it is an AFL-style `EdgeCoverageMap`, and the coverage of an execution
+    # is the array of map indices it hit.
+    # With `cache_size` > 0, the results of the last `cache_size` distinct inputs are kept in a
+    # `ResultCache` and an input that is executed again is not traced; this assumes the target
+    # is deterministic. A cached input that raised is counted in its triage bucket again.
+    # `capture_comparisons` runs an input once more to record the operands of the comparisons
+    # the target makes with a `ComparisonTracer`, without touching the coverage.
+    # With a `triage`, the exceptions raised by the target are bucketed by a `CrashTriage`, and
+    # an exception that opens a new bucket counts as new coverage.
+    # Every execution also sets `path_signature`, a hash of its coverage (and hit-count buckets
+    # in edge mode) that identifies the path it took, for path-frequency power schedules. It
+    # is the same in every process, e.g. in the workers of a `ParallelRunner`.
     '''
-    def __init__(self, program_module):
+    def __init__(
+        self,
+        program_module,
+        coverage_backend: AbstractCoverageBackend = None,
+        coverage_mode: str = "line",
+        map_size: int = MAP_SIZE,
+        cache_size: int = 0,
+        triage: CrashTriage = None,
+    ):
         self.program_module = program_module
         self.module_name = program_module.__name__
         self.func_name = inspect.getmodule(program_module).__name__
         self.file_name = inspect.getsourcefile(program_module)
-        self._full_coverage = []
-        self._coverage = set()
+        if coverage_mode not in ("line", "edge"):
+            raise ValueError(f"Unknown coverage mode: {coverage_mode!r}")
+        self.coverage_mode = coverage_mode
+        self.coverage_map = self._make_coverage_map(map_size) if coverage_mode == "edge" else None
+        if coverage_backend is None:
+            coverage_backend = make_coverage_backend(self.is_target_code, self.coverage_map)
+        else:
+            coverage_backend.edge_map = self.coverage_map
+        self.coverage_backend = coverage_backend
+        # Coverage of the last execution, and of every execution so far
+        self.run_coverage = set()
+        self.global_coverage = set() if self.coverage_map is None else self.coverage_map
+        # Locations the last execution added to the global coverage
+        self.new_coverage = set()
+        # 2 if the last execution covered a new location, 1 if it only reached a new
+        # hit-count bucket (edge mode), 0 otherwise
+        self.novelty = 0
+        # Hash of the coverage of the last execution, see `_update_coverage`
+        self.path_signature = 0
+        self.result_cache = ResultCache(cache_size) if cache_size > 0 else None
+        # Optional `FuzzerStats` timing the executions
+        self.stats = None
+        self.triage = triage
+        # True if the last execution raised an exception that opened a new triage bucket
+        self.new_bucket = False
+        # Created by the first `capture_comparisons`
+        self.comparison_tracer = None
+
+    def _make_coverage_map(self, map_size: int) -> EdgeCoverageMap:
+        return EdgeCoverageMap(map_size)
 
     def _execute_input(self, input):
+        """Execute `input` and return `(exceptions, execution_time, coverage)`.
+        A cached result is returned with its original execution time; as the input ran
+        before, it adds no new coverage."""
+        stats = self.stats
+        if stats is None:
+            return self._execute_cached(input)
+        start = time.perf_counter_ns()
+        result = self._execute_cached(input)
+        stats.add("execute", time.perf_counter_ns() - start)
+        return result
+
+    def _execute_cached(self, input):
+        if self.result_cache is None:
+            return self._run_input(input)
+        cached = self.result_cache.get(input)
+        if cached is not None:
+            exceptions, execution_time, self.run_coverage, self.path_signature, bucket_key = cached
+            self.new_coverage = set() if self.coverage_map is None else np.empty(0, dtype=np.intp)
+            self.novelty = 0
+            self.new_bucket = False
+            if bucket_key is not None:
+                # The exception is raised again, in the same bucket
+                self.triage.record_repeat(bucket_key, input)
+            return exceptions, execution_time, self.run_coverage
+        result = self._run_input(input)
+        bucket_key = self.triage.last_key if result[0] and self.triage is not None else None
+        self.result_cache.put(input, result + (self.path_signature, bucket_key))
+        return result
+
+    def _run_input(self, input):
+        """Trace one execution of `input`."""
         exceptions = 0
+        self.new_bucket = False
+        backend = self.coverage_backend
+        backend.start()
         try:
-            sys.settrace(self.trace_function)
             start_time = time.time()
             # print(f"Input to be executed: {input}")
             output = self.program_module(input)
             end_time = time.time()
             execution_time = end_time - start_time
-            sys.settrace(None)
+            backend.stop()
         except Exception as e:
             exceptions += 1
             end_time = time.time()
             execution_time = end_time - start_time
-            sys.settrace(None)
+            backend.stop()
+            if self.triage is not None:
+                self.new_bucket = self.triage.record(e, input)
 
-        self._coverage = set(self._full_coverage)
+        stats = self.stats
+        if stats is None:
+            self._update_coverage(backend.coverage)
+        else:
+            stats.add("execute.target", int(execution_time * 1e9))
+            start = time.perf_counter_ns()
+            self._update_coverage(backend.coverage)
+            stats.add("execute.coverage", time.perf_counter_ns() - start)
+        if self.new_bucket:
+            self.novelty = 2
 
-        return exceptions, execution_time, self._coverage
+        return exceptions, execution_time, self.run_coverage
 
-    def trace_function(self, frame, event, arg):
-
-        if event == "line":
-            # Print information about the current line being executed
-
-            filename = frame.f_code.co_filename
-            line_number = frame.f_lineno
-
-            # Check if the file being executed matches the desired module
-            code_obj = frame.f_code
-            module = inspect.getmodule(code_obj)
-
-            if module is not None:
-                module_name = module.__name__
+    def capture_comparisons(self, input) -> list:
+        """Execute `input` with comparison tracing and return the `(kind, left, right)`
+        operands of the comparisons the target made. Coverage is neither collected nor updated."""
+        tracer = self.comparison_tracer
+        if tracer is None:
+            tracer = self.comparison_tracer = ComparisonTracer(self.is_target_code)
+        tracer.start()
+        try:
+            self.program_module(input)
+        except Exception:
+            pass
+        finally:
+            tracer.stop()
+        return tracer.comparisons
 
-                if self.module_name in filename or self.func_name == module_name:
+    def _execute_batch(self, inputs):
+        """Execute a batch of inputs, yielding one `(exceptions, execution_time, coverage)`
+        tuple per input. The executor's coverage attributes describe the input that was
+        yielded last, so callers can inspect them before the next input runs."""
+        for input in inputs:
+            yield self._execute_input(input)
 
-                    # Add the executed line to the set
-                    self._full_coverage.append(line_number)
+    def _update_coverage(self, run_coverage):
+        """Merge the coverage of the last execution into the global coverage.
+        In edge mode `run_coverage` is ignored and the hit counts are read from the map."""
+        if self.coverage_map is None:
+            self.run_coverage = run_coverage
+            self.new_coverage = self.run_coverage - self.global_coverage
+            self.global_coverage |= self.new_coverage
+            self.novelty = 2 if self.new_coverage else 0
+            self.path_signature = signature(location_hashes(run_coverage).tobytes())
+        else:
+            classified = self.coverage_map.classify()
+            self.run_coverage = np.flatnonzero(classified)
+            self.path_signature = signature(self.run_coverage.tobytes() + classified[self.run_coverage].tobytes())
+            self.novelty = self.coverage_map.has_new_bits(classified)
+            self.new_coverage = self.coverage_map.new_indices
 
-        return self.trace_function
+    def is_target_code(self, code_obj) -> bool:
+        """Return True if the code object belongs to the program under test.
+        Backends call this once per code object and cache the answer."""
+        module = inspect.getmodule(code_obj)
+        if module is None:
+            return False
+        return self.module_name in code_obj.co_filename or self.func_name == module.__name__
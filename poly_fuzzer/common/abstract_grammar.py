@@ -1,11 +1,21 @@
+import math
 import random
 import re
+import time
 
+from poly_fuzzer.common.grammar_coverage import GrammarCoverage
 
 
 class AbstractGrammar:
     """
     # The `AbstractGrammar` class is used to generate strings based on a given grammar.
+    The grammar is compiled once: nonterminals are interned to integer ids, expansions are
+    pre-tokenized and the minimum cost (number of expansions) to derive each nonterminal is
+    precomputed. Generation then expands a derivation tree from a work list, which keeps it
+    linear in the size of the output. `generate_tree` returns the tree itself, which
+    `TreeMutator` can mutate and splice.
+    `enable_coverage` makes generation prefer the expansions not covered yet, see
+    `GrammarCoverage`; otherwise expansions are chosen uniformly.
     Code partially taken from https://www.fuzzingbook.org/html/Grammars.html#"""
 
     def __init__(
@@ -26,6 +36,17 @@ class AbstractGrammar:
         )
         self.RE_NONTERMINAL = re.compile(f"({pattern})")
         self.gram = gram
+        self._compile()
+        # Optional `FuzzerStats` timing generation and counting expansions per nonterminal
+        self.stats = None
+        # Optional `GrammarCoverage`, see `enable_coverage`
+        self.coverage = None
+
+    def enable_coverage(self, k: int = 1, guide: str = "produced") -> GrammarCoverage:
+        """Track the expansions (and k-paths, with `k` > 1) that were produced or led to new
+        code coverage, and prefer the ones not covered according to `guide`."""
+        self.coverage = GrammarCoverage(self, k, guide)
+        return self.coverage
 
     def is_nonterminal(self, s):
         return self.RE_NONTERMINAL.match(s)
@@ -38,6 +59,57 @@ class AbstractGrammar:
 
         return [symbol for symbol in self.RE_NONTERMINAL.findall(expansion) if symbol in self.gram]
 
+    def _compile(self):
+        """Intern the nonterminals and pre-tokenize every expansion."""
+        self.symbols = list(self.gram)
+        self.symbol_ids = {symbol: symbol_id for symbol_id, symbol in enumerate(self.symbols)}
+        # expansions[symbol_id][k]: tokens of the k-th expansion, terminal strings or symbol ids
+        self.expansions = []
+        self.expansion_strings = []
+        self.expansion_nonterminal_counts = []
+        for symbol in self.symbols:
+            strings = [
+                expansion[0] if isinstance(expansion, tuple) else expansion
+                for expansion in self.gram[symbol]
+            ]
+            tokenized = [self._tokenize(string) for string in strings]
+            self.expansions.append(tokenized)
+            self.expansion_strings.append(strings)
+            self.expansion_nonterminal_counts.append(
+                [sum(1 for token in tokens if isinstance(token, int)) for tokens in tokenized]
+            )
+        self.min_cost = self._compute_min_costs()
+
+    def _tokenize(self, string: str) -> tuple:
+        tokens = []
+        for token in self.RE_NONTERMINAL.split(string):
+            if token in self.symbol_ids:
+                tokens.append(self.symbol_ids[token])
+            elif token:
+                tokens.append(token)
+        return tuple(tokens)
+
+    def _compute_min_costs(self) -> list[float]:
+        """Minimum number of expansions needed to derive a string from each nonterminal
+        (infinite if the nonterminal cannot terminate)."""
+        min_cost = [math.inf] * len(self.symbols)
+        changed = True
+        while changed:
+            changed = False
+            for symbol_id, expansions in enumerate(self.expansions):
+                for tokens in expansions:
+                    cost = 1 + sum(min_cost[token] for token in tokens if isinstance(token, int))
+                    if cost < min_cost[symbol_id]:
+                        min_cost[symbol_id] = cost
+                        changed = True
+        return min_cost
+
+    def expansion_cost(self, symbol_id: int, k: int) -> float:
+        """Minimum cost of deriving a string with the k-th expansion of a nonterminal."""
+        return 1 + sum(
+            self.min_cost[token] for token in self.expansions[symbol_id][k] if isinstance(token, int)
+        )
+
     def generate_input(
         self,
         start_symbol=None,
@@ -51,58 +123,118 @@ class AbstractGrammar:
             still left for expansion
         `max_expansion_trials`: maximum # of attempts to produce a string
         `log`: print expansion progress if True"""
+        return self.tree_to_string(
+            self.generate_tree(start_symbol, max_nonterminals, max_expansion_trials, log)
+        )
+
+    def generate_tree(
+        self,
+        start_symbol=None,
+        max_nonterminals: int = 10,
+        max_expansion_trials: int = 100,
+        log: bool = False,
+    ) -> list:
+        """Produce a derivation tree from `grammar`; same arguments as `generate_input`.
+        A node is a list `[symbol_id, children]` whose children are terminal strings and nodes.
+        If the start symbol is not a single nonterminal, the root's symbol_id is None.
+        Trees are never modified once generated, so they can share subtrees."""
         if start_symbol is None:
             start_symbol = self.START_SYMBOL
 
-        term = start_symbol
+        root = [None, list(self._tokenize(start_symbol))]
+        pending = []
+        for index, token in enumerate(root[1]):
+            if isinstance(token, int):
+                root[1][index] = node = [token, None]
+                pending.append(node)
+        coverage = self.coverage
+        # id(node) -> ancestor expansions of the pending nodes, for k-path coverage
+        paths = {} if coverage is not None and coverage.k > 1 else None
+
+        stats = self.stats
+        if stats is not None:
+            start_ns = time.perf_counter_ns()
+            expansion_counts = [0] * len(self.symbols)
+
         expansion_trials = 0
-        grammar = self.gram
-
-        while len(self.nonterminals(term)) > 0:
-            current_nonterminals = self.nonterminals(term)
-            symbol_to_expand = random.choice(current_nonterminals)
-            expansions = grammar[symbol_to_expand]
-            candidate_terms = []
-
-            for expansion in expansions:
-                # In later chapters, we allow expansions to be tuples,
-                # with the expansion being the first element
-                if isinstance(expansion, tuple):
-                    expansion = expansion[0]
-
-                new_term = term.replace(symbol_to_expand, expansion, 1)
-                nonterminal_count = len(self.nonterminals(new_term))
-                candidate_terms.append((expansion, new_term, nonterminal_count))
-
-            acceptable_candidates = [
-                candidate for candidate in candidate_terms if candidate[2] <= max_nonterminals
+        while pending:
+            current_count = len(pending)
+            # Pick a random open nonterminal and remove it from the work list in O(1)
+            position = random.randrange(current_count)
+            node = pending[position]
+            pending[position] = pending[-1]
+            pending.pop()
+
+            symbol_id = node[0]
+            if stats is not None:
+                expansion_counts[symbol_id] += 1
+            counts = self.expansion_nonterminal_counts[symbol_id]
+            acceptable = [
+                k for k, count in enumerate(counts) if current_count - 1 + count <= max_nonterminals
             ]
 
-            if acceptable_candidates:
-                expansion, term, _ = random.choice(acceptable_candidates)
-                if log:
-                    print("%-40s" % (symbol_to_expand + " -> " + expansion), term)
+            path = paths.pop(id(node), ()) if paths is not None else ()
+            if acceptable:
+                if coverage is None:
+                    k = random.choice(acceptable)
+                else:
+                    k = coverage.choose(symbol_id, acceptable, path)
                 expansion_trials = 0
-                continue
-
-            # Fallback: choose candidate with the fewest remaining nonterminals.
-            # This helps recursive grammars eventually converge.
-            expansion, term, new_count = min(candidate_terms, key=lambda candidate: candidate[2])
+            else:
+                # Fallback: choose the expansion with the fewest remaining nonterminals.
+                # This helps recursive grammars eventually converge.
+                k = min(
+                    range(len(counts)),
+                    key=lambda k: (counts[k], self.expansion_cost(symbol_id, k)),
+                )
+                if current_count - 1 + counts[k] >= current_count:
+                    expansion_trials += 1
+                else:
+                    expansion_trials = 0
+
+            if coverage is not None:
+                child_path = coverage.expand(symbol_id, k, path)
+            children = list(self.expansions[symbol_id][k])
+            for index, token in enumerate(children):
+                if isinstance(token, int):
+                    children[index] = child = [token, None]
+                    pending.append(child)
+                    if paths is not None:
+                        paths[id(child)] = child_path
+            node[1] = children
 
             if log:
-                print("%-40s" % (symbol_to_expand + " -> " + expansion), term)
-
-            if new_count >= len(current_nonterminals):
-                expansion_trials += 1
-            else:
-                expansion_trials = 0
+                print(
+                    "%-40s" % (self.symbols[symbol_id] + " -> " + self.expansion_strings[symbol_id][k]),
+                    self.tree_to_string(root),
+                )
 
-            if expansion_trials >= max_expansion_trials:
+            if not acceptable and expansion_trials >= max_expansion_trials:
                 raise RuntimeError(
                     "Cannot expand grammar within max_expansion_trials. "
-                    f"Current term: {term!r}"
+                    f"Current term: {self.tree_to_string(root)!r}"
                 )
 
-        return term
-
-
+        if stats is not None:
+            stats.add("grammar.generate_tree", time.perf_counter_ns() - start_ns)
+            for symbol_id, count in enumerate(expansion_counts):
+                if count:
+                    stats.count("expand." + self.symbols[symbol_id], count)
+
+        if len(root[1]) == 1 and not isinstance(root[1][0], str):
+            return root[1][0]
+        return root
+
+    def tree_to_string(self, root) -> str:
+        """Concatenate the leaves of a derivation tree; unexpanded nodes print their symbol."""
+        parts = []
+        stack = [root]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+            elif item[1] is None:
+                parts.append(self.symbols[item[0]])
+            else:
+                stack.extend(reversed(item[1]))
+        return "".join(parts)
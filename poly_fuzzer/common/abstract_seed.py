@@ -1,16 +1,204 @@
+import numpy as np
+
+
+# Per-seed statistics kept in the columns of a `SeedTable`: name -> dtype
+COLUMNS = {
+    "length": np.int32,
+    "coverage": np.int32,
+    "execution_time": np.float32,
+    "chosen": np.int32,
+    "productive": np.int32,
+    "energy": np.float64,
+    "path": np.int64,
+}
+# Columns the energy of a seed may depend on; writing them invalidates cached energies
+ENERGY_COLUMNS = frozenset(("length", "coverage", "execution_time", "path"))
+_POSITIONS = {name: position for position, name in enumerate(COLUMNS)}
+
+
+def _column(name):
+    position = _POSITIONS[name]
+
+    def get(self):
+        table = self._table
+        if table is None:
+            return self._row[position]
+        return table._columns[name][self._index].item()
+
+    def set(self, value):
+        table = self._table
+        if table is None:
+            self._row[position] = value
+        else:
+            table.set(name, self._index, value)
+
+    return property(get, set)
+
+
 class AbstractSeed:
     """Represent an seed with additional attributes, such as energy.
     It is necessary to create a power schedule that assigns energy to seeds.
+    A seed in a `SeedTable` is a `__slots__` view of one row of the table: its data, tree and
+    statistics live in the table, so power schedules can compute all energies at once.
     """
 
+    __slots__ = ("_table", "_index", "_data", "_tree", "_row")
+
     def __init__(self, data: str) -> None:
         """Initialize from seed data"""
-        self.data = data
+        self._table = None
+        self._index = None
+        self._data = data
+        self._tree = None
+        # Statistics of a seed that is not in a table, in `COLUMNS` order
+        self._row = [len(data), 0, 0.0, 0, 0, 0.0, 0]
+
+    @classmethod
+    def _view(cls, table, index: int) -> "AbstractSeed":
+        seed = cls.__new__(cls)
+        seed._table = table
+        seed._index = index
+        return seed
+
+    @property
+    def data(self) -> str:
+        table = self._table
+        return self._data if table is None else table._data[self._index]
+
+    @property
+    def tree(self):
+        """Derivation tree of the data, if it was produced by a grammar"""
+        table = self._table
+        return self._tree if table is None else table._trees.get(self._index)
 
-        # These will be needed for advanced power schedules
-        self.coverage = 0
-        self.energy = 0.0
+    @tree.setter
+    def tree(self, tree):
+        table = self._table
+        if table is None:
+            self._tree = tree
+        elif tree is None:
+            table._trees.pop(self._index, None)
+        else:
+            table._trees[self._index] = tree
+
+    @property
+    def key(self):
+        """Identifies the seed: views of the same row of a table have the same key."""
+        table = self._table
+        return id(self) if table is None else (id(table), self._index)
+
+    # These will be needed for advanced power schedules
+    coverage = _column("coverage")
+    energy = _column("energy")
+    execution_time = _column("execution_time")
+    # Number of times the seed was mutated, and how many of its mutants were novel
+    chosen = _column("chosen")
+    productive = _column("productive")
+    # `AbstractExecutor.path_signature` of the seed's execution
+    path = _column("path")
 
     def __str__(self) -> str:
         """Returns data as string representation of the seed"""
         return self.data
+
+
+class SeedTable:
+    """
+    # The `SeedTable` class is a population of seeds stored as columns.
+    The table keeps the data of its seeds in a list, their derivation trees in a dict (most
+    seeds have none) and their statistics (`COLUMNS`) in NumPy arrays that grow by doubling,
+    so a power schedule computes every energy in one vectorized expression over
+    `table.coverage`, `table.length`, ... (views of the first `len(table)` rows). Indexing
+    or iterating the table returns `AbstractSeed` views of its rows, created on demand; no
+    Python object is kept per seed. `append` copies a seed into a new row and returns the
+    view of that row; the seed given to it is left as it is.
+    `version` changes whenever a row is appended or an `ENERGY_COLUMNS` value is set, so
+    energies can be cached until then.
+    """
+
+    def __init__(self, seeds=(), capacity: int = 64):
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._data = []
+        # Row index -> derivation tree
+        self._trees = {}
+        self.version = 0
+        for seed in seeds:
+            self.append(seed)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self):
+        return map(self._view, range(len(self._data)))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._view(i) for i in range(*index.indices(len(self._data)))]
+        if index < 0:
+            index += len(self._data)
+        if not 0 <= index < len(self._data):
+            raise IndexError("seed index out of range")
+        return AbstractSeed._view(self, index)
+
+    def _view(self, index: int) -> AbstractSeed:
+        return AbstractSeed._view(self, index)
+
+    def append(self, seed: AbstractSeed) -> AbstractSeed:
+        """Add a copy of `seed` and return the view of its row; `seed` itself is unchanged,
+        so the same seeds can be given to several tables (e.g. several fuzzers)."""
+        index = len(self._data)
+        if index == len(self._columns["length"]):
+            for name, column in self._columns.items():
+                grown = np.zeros(2 * len(column), dtype=column.dtype)
+                grown[:index] = column
+                self._columns[name] = grown
+        data = seed.data
+        if seed._table is None:
+            row = seed._row
+        else:
+            row = [len(data) if name == "length" else getattr(seed, name) for name in COLUMNS]
+        for name, value in zip(COLUMNS, row):
+            self._columns[name][index] = value
+        self._data.append(data)
+        tree = seed.tree
+        if tree is not None:
+            self._trees[index] = tree
+        self.version += 1
+        return self._view(index)
+
+    def set(self, name: str, index: int, value):
+        self._columns[name][index] = value
+        if name in ENERGY_COLUMNS:
+            self.version += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """View of the column `name` for the seeds in the table."""
+        return self._columns[name][:len(self._data)]
+
+    @property
+    def length(self) -> np.ndarray:
+        return self.column("length")
+
+    @property
+    def coverage(self) -> np.ndarray:
+        return self.column("coverage")
+
+    @property
+    def execution_time(self) -> np.ndarray:
+        return self.column("execution_time")
+
+    @property
+    def chosen(self) -> np.ndarray:
+        return self.column("chosen")
+
+    @property
+    def productive(self) -> np.ndarray:
+        return self.column("productive")
+
+    @property
+    def energy(self) -> np.ndarray:
+        return self.column("energy")
+
+    @property
+    def path(self) -> np.ndarray:
+        return self.column("path")
@@ -0,0 +1,128 @@
+import numpy as np
+
+
+DELETE = "delete"
+REPLACE = "replace"
+INSERT = "insert"
+
+
+class CharacterOperator:
+    """A character mutation that `BatchMutator` can apply to a whole batch at once.
+    `kind` is one of DELETE, REPLACE or INSERT. With `multiple`, each application edits
+    between 1 and len(s) characters half of the time (like the URL and HTML fuzzers' mutators),
+    otherwise a single character. Inputs not longer than `min_length` are left untouched."""
+
+    def __init__(self, kind: str, multiple: bool = False, min_length: int = None):
+        if kind not in (DELETE, REPLACE, INSERT):
+            raise ValueError(f"Unknown operator kind: {kind!r}")
+        self.kind = kind
+        self.multiple = multiple
+        self.min_length = min_length
+
+
+class BatchMutator:
+    """
+    # The `BatchMutator` class mutates a batch of parents with a few NumPy calls instead of
+    # re-slicing a Python string for every edited character.
+    All parents are concatenated into one array of code points. The stacked mutations of every
+    candidate are drawn for the whole batch at once, and all edits are positioned relative to the
+    parent and applied together: replacements, then deletions, then insertions. Operators that are
+    plain callables (e.g. a grammar mutation) cannot be vectorized and are applied to the parent
+    first, once per time they were drawn.
+    """
+
+    def __init__(
+        self,
+        operators: list,
+        min_mutations: int = 1,
+        max_mutations: int = 10,
+        rng: np.random.Generator = None,
+    ):
+        self.operators = operators
+        self.min_mutations = min_mutations
+        self.max_mutations = max_mutations
+        self._rng = rng
+
+    @property
+    def rng(self) -> np.random.Generator:
+        if self._rng is None:
+            # Derive from the global NumPy state so np.random.seed makes batches reproducible
+            self._rng = np.random.default_rng(np.random.randint(0, 2**32))
+        return self._rng
+
+    def mutate_batch(self, parents: list[str]) -> list[str]:
+        """Return one mutated candidate per parent."""
+        n = len(parents)
+        if n == 0:
+            return []
+        rng = self.rng
+        num_mutations = rng.integers(self.min_mutations, self.max_mutations + 1, size=n)
+        uniform = np.full(len(self.operators), 1.0 / len(self.operators))
+        # counts[i, j]: how many times candidate i applies operator j
+        counts = rng.multinomial(num_mutations, uniform)
+
+        parents = list(parents)
+        for j, operator in enumerate(self.operators):
+            if callable(operator):
+                for i in np.flatnonzero(counts[:, j]):
+                    for _ in range(counts[i, j]):
+                        parents[i] = operator(parents[i])
+
+        lengths = np.fromiter(map(len, parents), dtype=np.int64, count=n)
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        # Havoc mutations leave lone surrogates (undecodable bytes) in inputs; keep them as is
+        flat = np.frombuffer("".join(parents).encode("utf-32-le", "surrogatepass"), dtype=np.uint32).copy()
+        keep = np.ones(len(flat), dtype=bool)
+        inserted_owners = []
+        inserted_positions = []
+        inserted_chars = []
+
+        for j, operator in enumerate(self.operators):
+            if callable(operator):
+                continue
+            owners, positions = self._draw_edits(operator, counts[:, j], lengths)
+            if operator.kind == REPLACE:
+                flat[offsets[owners] + positions] = rng.integers(32, 127, size=len(owners))
+            elif operator.kind == DELETE:
+                keep[offsets[owners] + positions] = False
+            else:
+                inserted_owners.append(owners)
+                inserted_positions.append(positions)
+                inserted_chars.append(rng.integers(32, 127, size=len(owners)).astype(np.uint32))
+
+        flat_owners = np.repeat(np.arange(n), lengths)
+        # Sort key of original character k of candidate i is (i, 2k+1); an insertion before it is (i, 2k)
+        stride = 2 * int(lengths.max()) + 2
+        keys = (flat_owners * stride + (np.arange(len(flat)) - offsets[flat_owners]) * 2 + 1)[keep]
+        owners = flat_owners[keep]
+        chars = flat[keep]
+        if inserted_owners:
+            inserted_owners = np.concatenate(inserted_owners)
+            inserted_keys = inserted_owners * stride + np.concatenate(inserted_positions) * 2
+            order = np.argsort(inserted_keys, kind="stable")
+            # The original keys are already sorted, so only the insertions need sorting
+            slots = np.searchsorted(keys, inserted_keys[order])
+            owners = np.insert(owners, slots, inserted_owners[order])
+            chars = np.insert(chars, slots, np.concatenate(inserted_chars)[order])
+        text = chars.tobytes().decode("utf-32-le", "surrogatepass")
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(owners, minlength=n)))).tolist()
+        return [text[bounds[i]:bounds[i + 1]] for i in range(n)]
+
+    def _draw_edits(self, operator: CharacterOperator, applications, lengths):
+        """Return (candidate index, position in the parent) for every edited character."""
+        rng = self.rng
+        limit = lengths + 1 if operator.kind == INSERT else lengths
+        allowed = limit > 0
+        if operator.min_length is not None:
+            allowed &= lengths > operator.min_length
+        applications = np.where(allowed, applications, 0)
+        owners = np.repeat(np.arange(len(lengths)), applications)
+        if operator.multiple:
+            # Each application edits 1..len(s) characters half of the time, else one
+            multiple = rng.random(len(owners)) < 0.5
+            sizes = np.where(
+                multiple, rng.integers(1, np.maximum(lengths[owners], 1) + 1), 1
+            )
+            owners = np.repeat(owners, sizes)
+        positions = (rng.random(len(owners)) * limit[owners]).astype(np.int64)
+        return owners, positions
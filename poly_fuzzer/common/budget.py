@@ -0,0 +1,82 @@
+import time
+
+
+class Budget:
+    """
+    # The `Budget` class decides when a campaign stops.
+    A campaign stops as soon as any of the given limits is reached:
+    `executions`: total number of executed inputs,
+    `seconds`: wall-clock time since the campaign started,
+    `plateau_executions` / `plateau_seconds`: executions / seconds without new coverage.
+    Execution limits are exact. The clock is only read every `check_interval` executions,
+    so time limits may be overshot by that many executions.
+    Limits count from `start`, so a resumed campaign (whose execution counter does not
+    restart from 0) gets the whole budget again.
+    """
+
+    def __init__(
+        self,
+        executions: int = None,
+        seconds: float = None,
+        plateau_executions: int = None,
+        plateau_seconds: float = None,
+        check_interval: int = 64,
+    ):
+        if executions is None and seconds is None and plateau_executions is None and plateau_seconds is None:
+            raise ValueError("A budget needs at least one limit")
+        self.executions = executions
+        self.seconds = seconds
+        self.plateau_executions = plateau_executions
+        self.plateau_seconds = plateau_seconds
+        self.check_interval = check_interval
+        self.start()
+
+    @classmethod
+    def of(cls, budget) -> "Budget":
+        """Return `budget` itself, or a budget of `budget` executions if it is a number."""
+        if isinstance(budget, Budget):
+            return budget
+        return cls(executions=budget)
+
+    def start(self, executions: int = 0):
+        """Start the clock; called when a campaign starts or resumes after `executions` executions."""
+        self.start_ns = time.perf_counter_ns()
+        self.start_execution = executions
+        self.last_progress_ns = self.start_ns
+        self.last_progress_execution = executions
+        self._next_check = executions + self.check_interval
+
+    def progress(self, executions: int):
+        """Record that the `executions`-th execution found new coverage."""
+        self.last_progress_execution = executions
+        if self.plateau_seconds is not None:
+            self.last_progress_ns = time.perf_counter_ns()
+
+    def remaining(self, executions: int) -> int:
+        """Upper bound on the number of executions left, or None if it is unbounded."""
+        remaining = None
+        if self.executions is not None:
+            remaining = self.start_execution + self.executions - executions
+        if self.plateau_executions is not None:
+            plateau = self.last_progress_execution + self.plateau_executions - executions
+            remaining = plateau if remaining is None else min(remaining, plateau)
+        return remaining
+
+    def exhausted(self, executions: int) -> bool:
+        """Return True if the campaign must stop after `executions` executions."""
+        if self.executions is not None and executions - self.start_execution >= self.executions:
+            return True
+        if (
+            self.plateau_executions is not None
+            and executions - self.last_progress_execution >= self.plateau_executions
+        ):
+            return True
+        if executions < self._next_check:
+            return False
+        self._next_check = executions + self.check_interval
+        now = time.perf_counter_ns()
+        if self.seconds is not None and now - self.start_ns >= self.seconds * 1e9:
+            return True
+        if self.plateau_seconds is not None and now - self.last_progress_ns >= self.plateau_seconds * 1e9:
+            return True
+        return False
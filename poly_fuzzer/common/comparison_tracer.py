@@ -0,0 +1,210 @@
+import builtins
+import dis
+import sys
+
+
+# Instructions that push one operand, evaluated from the frame when the comparison runs
+_FAST_LOADS = {"LOAD_FAST", "LOAD_FAST_CHECK", "LOAD_FAST_BORROW"}
+_NAME_LOADS = {"LOAD_DEREF", "LOAD_CLASSDEREF", "LOAD_NAME"}
+_CONST_LOADS = {"LOAD_CONST", "LOAD_SMALL_INT"}
+# Instructions that push two local variables at once (Python 3.13+)
+_PAIR_LOADS = {"LOAD_FAST_LOAD_FAST", "LOAD_FAST_BORROW_LOAD_FAST_BORROW"}
+
+_MISSING = object()
+
+
+def comparison_sites(code) -> dict:
+    """Return {instruction offset: (kind, left source, right source)} for the comparisons,
+    `in` tests and subscripts of `code` whose two operands are variables, constants or
+    attributes of those. `kind` is the comparison operator, "in" or "[]"; for "[]" the
+    left operand is the key and the right one the container. A source is
+    `(opname, argument, attribute names)`.
+    Operands computed in any other way (calls, arithmetic) are not tracked."""
+    instructions = [
+        instruction for instruction in dis.get_instructions(code) if instruction.opname not in ("NOP", "CACHE")
+    ]
+    sites = {}
+    for index, instruction in enumerate(instructions):
+        opname = instruction.opname
+        if opname == "COMPARE_OP":
+            kind = instruction.argrepr.removeprefix("bool(").removesuffix(")")
+        elif opname == "CONTAINS_OP":
+            kind = "in"
+        elif opname == "BINARY_SUBSCR":
+            kind = "[]"
+        else:
+            continue
+        operands = _operand_sources(instructions, index)
+        if operands is None:
+            continue
+        left, right = operands
+        if kind == "[]":
+            left, right = right, left
+        sites[instruction.offset] = (kind, left, right)
+    return sites
+
+
+def _operand_sources(instructions, index):
+    """Sources of the two operands consumed by `instructions[index]`, or None."""
+    right, index = _source(instructions, index - 1)
+    if right is None:
+        return None
+    if right[0] in _PAIR_LOADS:
+        # Both operands pushed by one instruction, then the attributes of the right one
+        first, second = right[1]
+        return ("LOAD_FAST", first, ()), ("LOAD_FAST", second, right[2])
+    left, _ = _source(instructions, index)
+    if left is None or left[0] in _PAIR_LOADS:
+        return None
+    return left, right
+
+
+def _source(instructions, index):
+    """Parse backwards the operand pushed by the instructions ending at `index`: a load
+    (or a pair load, see `_operand_sources`) followed by attribute loads. Return the source and the index before it, or (None, None)."""
+    attributes = []
+    while index >= 0 and instructions[index].opname == "LOAD_ATTR":
+        instruction = instructions[index]
+        # On 3.12+, an odd argument means the attribute is loaded as a method to call
+        if sys.version_info >= (3, 12) and instruction.arg & 1:
+            return None, None
+        attributes.append(instruction.argval)
+        index -= 1
+    if index < 0:
+        return None, None
+    instruction = instructions[index]
+    opname = instruction.opname
+    if opname == "LOAD_GLOBAL":
+        # On 3.11+, an odd argument also pushes NULL for a call
+        if sys.version_info >= (3, 11) and instruction.arg & 1:
+            return None, None
+    elif (
+        opname not in _FAST_LOADS
+        and opname not in _NAME_LOADS
+        and opname not in _CONST_LOADS
+        and opname not in _PAIR_LOADS
+    ):
+        return None, None
+    return (opname, instruction.argval, tuple(reversed(attributes))), index - 1
+
+
+def _evaluate(frame, source):
+    opname, argument, attributes = source
+    if opname in _CONST_LOADS:
+        value = argument
+    elif opname == "LOAD_GLOBAL":
+        value = frame.f_globals.get(argument, _MISSING)
+        if value is _MISSING:
+            value = getattr(builtins, argument, _MISSING)
+    else:
+        value = frame.f_locals.get(argument, _MISSING)
+        if value is _MISSING and opname == "LOAD_NAME":
+            value = frame.f_globals.get(argument, _MISSING)
+    for attribute in attributes:
+        if value is _MISSING:
+            break
+        value = getattr(value, attribute, _MISSING)
+    return value
+
+
+class ComparisonTracer:
+    """
+    # The `ComparisonTracer` class records the operands of the comparisons the target makes.
+    Between `start` and `stop`, every comparison (`==`, `<`, ...), `in` test and subscript
+    (`table[key]`) executed by target code is recorded in `comparisons` as
+    `(kind, left, right)` (see `comparison_sites`), at most `max_comparisons` of them.
+    The operands are read from the frame when the instruction is about to run, using
+    `sys.settrace` with opcode events (`f_trace_opcodes`), which is only turned on in frames
+    of target code that contains comparisons. This is much slower than coverage tracing
+    and is meant for occasional runs, see `AbstractExecutor.capture_comparisons`.
+    """
+
+    def __init__(self, is_target, max_comparisons: int = 1024):
+        self.is_target = is_target
+        self.max_comparisons = max_comparisons
+        self.comparisons = []
+        self._seen = set()
+        self._sites = {}
+
+    def start(self):
+        global _opcode_events_ready
+        if not _opcode_events_ready:
+            _enable_opcode_events()
+            _opcode_events_ready = True
+        self.comparisons = []
+        self._seen = set()
+        sys.settrace(self._trace_call)
+
+    def stop(self):
+        sys.settrace(None)
+
+    def _code_sites(self, code):
+        try:
+            return self._sites[code]
+        except KeyError:
+            sites = self._sites[code] = comparison_sites(code) if self.is_target(code) else None
+            return sites
+
+    def _trace_call(self, frame, event, arg):
+        sites = self._code_sites(frame.f_code)
+        if not sites:
+            return None
+
+        def trace_opcode(frame, event, arg):
+            if event == "opcode":
+                site = sites.get(frame.f_lasti)
+                if site is not None:
+                    self._record(frame, site)
+            return trace_opcode
+
+        # On 3.13, opcode events only reach a frame whose local trace function is set first
+        frame.f_trace = trace_opcode
+        frame.f_trace_opcodes = True
+        return trace_opcode
+
+    def _record(self, frame, site):
+        if len(self.comparisons) >= self.max_comparisons:
+            return
+        kind, left_source, right_source = site
+        left = _evaluate(frame, left_source)
+        right = _evaluate(frame, right_source)
+        if left is _MISSING or right is _MISSING:
+            return
+        # Loops repeat the same comparisons; containers are identified by identity
+        key = (kind, _key(left), _key(right))
+        if key not in self._seen:
+            self._seen.add(key)
+            self.comparisons.append((kind, left, right))
+
+
+# On 3.12, the first frame of a process given `f_trace_opcodes` gets no opcode events
+_opcode_events_ready = False
+
+
+def _enable_opcode_events():
+    """Trace the opcodes of one frame, so that later frames get opcode events."""
+
+    def trace(frame, event, arg):
+        frame.f_trace = ignore
+        frame.f_trace_opcodes = True
+        return ignore
+
+    def ignore(frame, event, arg):
+        return ignore
+
+    previous = sys.gettrace()
+    sys.settrace(trace)
+    try:
+        _no_op()
+    finally:
+        sys.settrace(previous)
+
+
+def _no_op():
+    pass
+
+
+def _key(value):
+    if isinstance(value, (str, bytes, int, float)):
+        return value
+    return id(value)
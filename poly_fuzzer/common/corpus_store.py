@@ -0,0 +1,146 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+
+
+def input_digest(input: str) -> str:
+    """Content hash identifying an input in a corpus."""
+    return hashlib.sha1(input.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def coverage_signature(run_coverage) -> str:
+    """Hash of the locations an execution covered: line pairs, or edge map indices."""
+    if isinstance(run_coverage, np.ndarray):
+        return hashlib.sha1(np.sort(run_coverage).astype(np.int64).tobytes()).hexdigest()
+    return hashlib.sha1(repr(sorted(run_coverage)).encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class CorpusStore:
+    """
+    # The `CorpusStore` class persists a fuzzing corpus in a SQLite database.
+    Inputs are addressed by their content hash, so an input is stored (and returned by `seeds`)
+    only once; adding it again only increments its hit count. Every input keeps the metadata
+    it was found with: the number and signature of the locations it covered, its execution
+    time and its energy. A campaign is resumed, or seeded from a previous run, by passing
+    `seeds()` to a fuzzer.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS seeds (
+            digest TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            coverage INTEGER NOT NULL DEFAULT 0,
+            signature TEXT,
+            execution_time REAL NOT NULL DEFAULT 0,
+            hits INTEGER NOT NULL DEFAULT 1,
+            energy REAL NOT NULL DEFAULT 0,
+            added REAL NOT NULL
+        )
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(self._SCHEMA)
+        self._connection.commit()
+        # Digests of the stored inputs, so lookups do not query the database
+        self._digests = {row[0] for row in self._connection.execute("SELECT digest FROM seeds")}
+        # Hit counts not yet written to the database
+        self._pending_hits = {}
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def __contains__(self, input: str) -> bool:
+        return input_digest(input) in self._digests
+
+    def add(
+        self,
+        input: str,
+        coverage: int = 0,
+        signature: str = None,
+        execution_time: float = 0.0,
+        energy: float = 0.0,
+    ) -> bool:
+        """Store an input with its metadata. Return False, and count a hit, if it is already stored."""
+        digest = input_digest(input)
+        if digest in self._digests:
+            self._pending_hits[digest] = self._pending_hits.get(digest, 0) + 1
+            return False
+        self._digests.add(digest)
+        self._connection.execute(
+            "INSERT INTO seeds (digest, data, coverage, signature, execution_time, energy, added) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (digest, input.encode("utf-8", "surrogatepass"), coverage, signature,
+             execution_time, energy, time.time()),
+        )
+        self.flush()
+        return True
+
+    def record_hit(self, input: str) -> bool:
+        """Count one more execution of a stored input. Return False if it is not stored."""
+        digest = input_digest(input)
+        if digest not in self._digests:
+            return False
+        self._pending_hits[digest] = self._pending_hits.get(digest, 0) + 1
+        return True
+
+    def update(self, seed: AbstractSeed):
+        """Persist the current energy of a stored seed."""
+        digest = input_digest(seed.data)
+        if digest in self._digests:
+            self._connection.execute(
+                "UPDATE seeds SET energy = ? WHERE digest = ?", (seed.energy, digest)
+            )
+
+    def metadata(self, input: str) -> dict:
+        """Return the stored metadata of an input, or None if it is not stored."""
+        self.flush()
+        row = self._connection.execute(
+            "SELECT coverage, signature, execution_time, hits, energy, added FROM seeds WHERE digest = ?",
+            (input_digest(input),),
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ("coverage", "signature", "execution_time", "hits", "energy", "added")
+        return dict(zip(keys, row))
+
+    def seeds(self, limit: int = None) -> list[AbstractSeed]:
+        """Return the stored inputs as seeds, in the order they were added."""
+        self.flush()
+        query = "SELECT data, coverage, execution_time, energy FROM seeds ORDER BY added, rowid"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        seeds = []
+        for data, coverage, execution_time, energy in self._connection.execute(query):
+            seed = AbstractSeed(data.decode("utf-8", "surrogatepass"))
+            seed.coverage = coverage
+            seed.execution_time = execution_time
+            seed.energy = energy
+            seeds.append(seed)
+        return seeds
+
+    def flush(self):
+        """Write the pending hit counts and commit."""
+        if self._pending_hits:
+            self._connection.executemany(
+                "UPDATE seeds SET hits = hits + ? WHERE digest = ?",
+                [(hits, digest) for digest, hits in self._pending_hits.items()],
+            )
+            self._pending_hits.clear()
+        self._connection.commit()
+
+    def close(self):
+        if self._connection is not None:
+            self.flush()
+            self._connection.close()
+            self._connection = None
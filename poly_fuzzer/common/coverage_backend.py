@@ -0,0 +1,194 @@
+import abc
+import sys
+
+from poly_fuzzer.common.coverage_map import EdgeCoverageMap, location_id
+
+
+class AbstractCoverageBackend(abc.ABC):
+    """
+    # The `AbstractCoverageBackend` class collects the lines of the target that are executed
+    # between `start` and `stop`, as `(filename, line_number)` pairs. `is_target` decides, once
+    # per code object, whether the code belongs to the program under test.
+    # With an `edge_map`, the backend records (previous line, current line) edges with hit
+    # counts into the map's `trace_bits` instead.
+    """
+
+    def __init__(self, is_target, edge_map: EdgeCoverageMap = None):
+        self.is_target = is_target
+        self.edge_map = edge_map
+        self.coverage = set()
+        self._target_codes = {}
+        self._location_ids = {}
+        self._prev_location = 0
+
+    def _is_target_code(self, code) -> bool:
+        """Resolve the target filter once per code object."""
+        try:
+            return self._target_codes[code]
+        except KeyError:
+            result = self._target_codes[code] = bool(self.is_target(code))
+            return result
+
+    def warm_up(self, codes):
+        """Resolve the target filter for `codes` now, e.g. before forking, so that processes
+        forked later find the answers cached."""
+        for code in codes:
+            self._is_target_code(code)
+
+    def _record_edge(self, filename, line_number):
+        key = (filename, line_number)
+        location = self._location_ids.get(key)
+        if location is None:
+            location = self._location_ids[key] = location_id(
+                filename, line_number, self.edge_map.map_size
+            )
+        trace_bits = self.edge_map.trace_bits
+        index = location ^ self._prev_location
+        hits = trace_bits[index]
+        if hits != 255:
+            trace_bits[index] = hits + 1
+        self._prev_location = location >> 1
+
+    def start(self):
+        """Start collecting coverage into a fresh `coverage` set (or a cleared edge map)."""
+        self.coverage = set()
+        if self.edge_map is not None:
+            self.edge_map.reset()
+            self._prev_location = 0
+
+    @abc.abstractmethod
+    def stop(self):
+        """Stop collecting coverage."""
+        pass
+
+
+class SettraceCoverageBackend(AbstractCoverageBackend):
+    """Coverage through `sys.settrace`. Only frames of target code objects get a line tracer."""
+
+    def start(self):
+        super().start()
+        sys.settrace(self._trace_call)
+
+    def stop(self):
+        sys.settrace(None)
+
+    def _trace_call(self, frame, event, arg):
+        if self._is_target_code(frame.f_code):
+            if self.edge_map is not None:
+                return self._trace_edge
+            return self._trace_line
+        return None
+
+    def _trace_line(self, frame, event, arg):
+        if event == "line":
+            self.coverage.add((frame.f_code.co_filename, frame.f_lineno))
+        return self._trace_line
+
+    def _trace_edge(self, frame, event, arg):
+        if event == "line":
+            self._record_edge(frame.f_code.co_filename, frame.f_lineno)
+        return self._trace_edge
+
+
+class MonitoringCoverageBackend(AbstractCoverageBackend):
+    """Coverage through `sys.monitoring` (Python 3.12+).
+    LINE and BRANCH events are only enabled on target code objects, and every location is
+    disabled once it has been seen, so each line costs one callback per execution.
+    Branches are recorded as `(filename, source_line, destination_line)` when `branches` is True.
+    Edge coverage needs every hit, so with an `edge_map` lines are never disabled.
+    All instances share one tool id; the callbacks go to the backend that is currently started.
+    """
+
+    tool_id = None
+    _active = None
+
+    def __init__(self, is_target, edge_map: EdgeCoverageMap = None, branches: bool = False):
+        super().__init__(is_target, edge_map)
+        self.branches = branches
+        self._enabled_codes = set()
+        self._line_tables = {}
+
+    def start(self):
+        super().start()
+        monitoring = sys.monitoring
+        cls = MonitoringCoverageBackend
+        if cls.tool_id is None:
+            cls._register()
+        if cls._active is not self:
+            # Local events belong to the previously started backend, which may have another target
+            if cls._active is not None:
+                cls._active._disable_local_events()
+            cls._active = self
+        # Locations disabled during the previous execution must fire again for this one
+        monitoring.restart_events()
+        monitoring.set_events(cls.tool_id, monitoring.events.PY_START)
+
+    def stop(self):
+        sys.monitoring.set_events(MonitoringCoverageBackend.tool_id, 0)
+
+    def _disable_local_events(self):
+        for code in self._enabled_codes:
+            sys.monitoring.set_local_events(MonitoringCoverageBackend.tool_id, code, 0)
+        self._enabled_codes = set()
+
+    @classmethod
+    def _register(cls):
+        monitoring = sys.monitoring
+        for tool_id in (monitoring.COVERAGE_ID, 3, 4):
+            if monitoring.get_tool(tool_id) is None:
+                monitoring.use_tool_id(tool_id, "poly_fuzzer")
+                break
+        else:
+            raise RuntimeError("No free sys.monitoring tool id for coverage")
+        monitoring.register_callback(tool_id, monitoring.events.PY_START, _monitoring_start)
+        monitoring.register_callback(tool_id, monitoring.events.LINE, _monitoring_line)
+        monitoring.register_callback(tool_id, monitoring.events.BRANCH, _monitoring_branch)
+        cls.tool_id = tool_id
+
+    def _on_start(self, code, instruction_offset):
+        if code not in self._enabled_codes and self._is_target_code(code):
+            events = sys.monitoring.events.LINE
+            if self.branches:
+                events |= sys.monitoring.events.BRANCH
+            sys.monitoring.set_local_events(MonitoringCoverageBackend.tool_id, code, events)
+            self._enabled_codes.add(code)
+        return sys.monitoring.DISABLE
+
+    def _on_line(self, code, line_number):
+        if self.edge_map is not None:
+            self._record_edge(code.co_filename, line_number)
+            return None
+        self.coverage.add((code.co_filename, line_number))
+        return sys.monitoring.DISABLE
+
+    def _on_branch(self, code, instruction_offset, destination_offset):
+        lines = self._line_tables.get(code)
+        if lines is None:
+            lines = self._line_tables[code] = {
+                offset: line
+                for start, end, line in code.co_lines()
+                for offset in range(start, end, 2)
+            }
+        self.coverage.add(
+            (code.co_filename, lines.get(instruction_offset), lines.get(destination_offset))
+        )
+        return sys.monitoring.DISABLE
+
+
+def _monitoring_start(code, instruction_offset):
+    return MonitoringCoverageBackend._active._on_start(code, instruction_offset)
+
+
+def _monitoring_line(code, line_number):
+    return MonitoringCoverageBackend._active._on_line(code, line_number)
+
+
+def _monitoring_branch(code, instruction_offset, destination_offset):
+    return MonitoringCoverageBackend._active._on_branch(code, instruction_offset, destination_offset)
+
+
+def make_coverage_backend(is_target, edge_map: EdgeCoverageMap = None) -> AbstractCoverageBackend:
+    """Return the fastest coverage backend available on this interpreter."""
+    if hasattr(sys, "monitoring"):
+        return MonitoringCoverageBackend(is_target, edge_map)
+    return SettraceCoverageBackend(is_target, edge_map)
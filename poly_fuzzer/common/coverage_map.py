@@ -0,0 +1,111 @@
+import hashlib
+import zlib
+
+import numpy as np
+
+
+MAP_SIZE = 1 << 16
+
+
+def _count_class_lookup() -> np.ndarray:
+    """AFL hit-count buckets: 1, 2, 3, 4-7, 8-15, 16-31, 32-127, 128+."""
+    lookup = np.zeros(256, dtype=np.uint8)
+    lookup[1] = 1
+    lookup[2] = 2
+    lookup[3] = 4
+    lookup[4:8] = 8
+    lookup[8:16] = 16
+    lookup[16:32] = 32
+    lookup[32:128] = 64
+    lookup[128:] = 128
+    return lookup
+
+
+COUNT_CLASS_LOOKUP = _count_class_lookup()
+
+
+def location_id(filename: str, line_number: int, map_size: int = MAP_SIZE) -> int:
+    """Stable id of a source line in the bitmap (the same in every process)."""
+    return zlib.crc32(f"{filename}:{line_number}".encode()) % map_size
+
+
+class _LocationHashes(dict):
+    """Cache of `location_hash` by location."""
+
+    def __missing__(self, location):
+        value = self[location] = location_hash(location)
+        return value
+
+
+_LOCATION_HASHES = _LocationHashes()
+
+
+def location_hash(location) -> int:
+    """Stable 32-bit hash of a line-coverage location (the same in every process)."""
+    return zlib.crc32(repr(location).encode("utf-8", "surrogatepass"))
+
+
+def location_hashes(run_coverage) -> np.ndarray:
+    """Sorted `location_hash`es of the locations of a line-coverage `run_coverage`."""
+    hashes = np.fromiter(map(_LOCATION_HASHES.__getitem__, run_coverage), dtype=np.uint32, count=len(run_coverage))
+    hashes.sort()
+    return hashes
+
+
+def signature(data: bytes) -> int:
+    """Stable signed 64-bit hash of `data`, e.g. of the locations of an execution."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little", signed=True)
+
+
+def feature_indices(run_coverage, map_size: int = MAP_SIZE) -> np.ndarray:
+    """Indices in `[0, map_size)` of the locations of `run_coverage`: edge map indices are
+    kept, line locations are hashed with `location_hash`."""
+    if isinstance(run_coverage, np.ndarray):
+        return run_coverage & (map_size - 1)
+    return np.unique(location_hashes(run_coverage) & (map_size - 1))
+
+
+class EdgeCoverageMap:
+    """
+    # The `EdgeCoverageMap` class is an AFL-style edge coverage bitmap.
+    Every (previous location, current location) pair is hashed into `trace_bits`, which counts
+    hits for the current execution. After an execution the counts are bucketed and compared
+    against `virgin_bits`, the bits never seen so far, with NumPy operations over the whole map.
+    """
+
+    def __init__(self, map_size: int = MAP_SIZE, trace_bits=None):
+        """`trace_bits` may be a writable buffer of `map_size` bytes, e.g. shared memory."""
+        if map_size & (map_size - 1):
+            raise ValueError("map_size must be a power of two")
+        self.map_size = map_size
+        self.trace_bits = bytearray(map_size) if trace_bits is None else trace_bits
+        self.virgin_bits = np.full(map_size, 0xFF, dtype=np.uint8)
+        self._trace_view = np.frombuffer(self.trace_bits, dtype=np.uint8)
+        # Number of edges seen at least once, and map indices with new bits in the last merge
+        self.edge_count = 0
+        self.new_indices = np.empty(0, dtype=np.intp)
+
+    def reset(self):
+        """Clear the hit counts before an execution."""
+        self._trace_view.fill(0)
+
+    def classify(self) -> np.ndarray:
+        """Return the bucketed hit counts of the last execution."""
+        return COUNT_CLASS_LOOKUP[self._trace_view]
+
+    def has_new_bits(self, classified: np.ndarray) -> int:
+        """Merge `classified` into the virgin map.
+        Return 2 if an edge was seen for the first time, 1 if only a new hit-count bucket
+        was reached, and 0 otherwise."""
+        new_bits = classified & self.virgin_bits
+        if not new_bits.any():
+            self.new_indices = np.empty(0, dtype=np.intp)
+            return 0
+        self.new_indices = np.flatnonzero(new_bits)
+        new_edges = np.count_nonzero(classified[self.virgin_bits == 0xFF])
+        self.virgin_bits &= ~classified
+        self.edge_count += new_edges
+        return 2 if new_edges else 1
+
+    def __len__(self) -> int:
+        return self.edge_count
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+
+
+class CrashBucket:
+    """The exceptions of one type raised from the same innermost frames, with the
+    shortest input that raised one."""
+
+    __slots__ = ("bucket_id", "exception_type", "frames", "message", "count", "reproducer", "_codes")
+
+    def __init__(self, exception_type: str, frames: tuple, message: str, reproducer: str, codes=()):
+        self.exception_type = exception_type
+        # Innermost last: (filename, function, line_number)
+        self.frames = frames
+        self.message = message
+        self.count = 1
+        self.reproducer = reproducer
+        description = exception_type + "".join(f"|{f}:{n}:{l}" for f, n, l in frames)
+        self.bucket_id = hashlib.sha1(description.encode("utf-8", "surrogatepass")).hexdigest()[:16]
+        # Keeps the code objects whose ids are in the bucket's key alive
+        self._codes = codes
+
+    def as_dict(self) -> dict:
+        return {
+            "bucket_id": self.bucket_id,
+            "exception_type": self.exception_type,
+            "frames": [list(frame) for frame in self.frames],
+            "message": self.message,
+            "count": self.count,
+            "reproducer": self.reproducer,
+        }
+
+
+def _traceback(exception: BaseException):
+    """Yield the traceback entries of `exception`, without the first one: the frame that
+    caught it (the executor's), which is the same for every exception."""
+    tb = exception.__traceback__
+    if tb is not None and tb.tb_next is not None:
+        tb = tb.tb_next
+    while tb is not None:
+        yield tb
+        tb = tb.tb_next
+
+
+def describe_exception(exception: BaseException, frames: int = 5) -> tuple:
+    """Return `(type name, ((filename, function, line_number), ...))` for the innermost
+    `frames` frames of the traceback of `exception`."""
+    stack = [
+        (tb.tb_frame.f_code.co_filename, tb.tb_frame.f_code.co_name, tb.tb_lineno)
+        for tb in _traceback(exception)
+    ]
+    return type(exception).__qualname__, tuple(stack[-frames:])
+
+
+class CrashTriage:
+    """
+    # The `CrashTriage` class buckets the exceptions raised by the target.
+    A bucket is the exception type plus the innermost `frames` frames of its traceback
+    (code object and line number, without the frame that caught it), so one bug raised from
+    many inputs fills one bucket.
+    Bucketing only walks the traceback and hashes object ids and line numbers; nothing is
+    formatted unless the exception opens a new bucket. Every bucket counts its exceptions and
+    keeps the shortest input that raised one. At most `max_buckets` buckets are kept; the
+    exceptions that would open more are counted in `dropped`.
+    `record` returns True for a new bucket, which `AbstractExecutor` reports as new coverage.
+    The key of the last exception is kept in `last_key`, so that an input answered from a
+    result cache can be counted again with `record_repeat`.
+    """
+
+    def __init__(self, frames: int = 5, max_buckets: int = 1024):
+        self.frames = frames
+        self.max_buckets = max_buckets
+        # key -> CrashBucket, see `_key`
+        self.buckets = {}
+        self.dropped = 0
+        # Key of the last exception recorded
+        self.last_key = None
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+    def _key(self, exception: BaseException):
+        stack = [(id(tb.tb_frame.f_code), tb.tb_lineno) for tb in _traceback(exception)]
+        return (type(exception), tuple(stack[-self.frames:]))
+
+    def record(self, exception: BaseException, input: str) -> bool:
+        """Add `exception`, raised by `input`, to its bucket; return True if the bucket is new."""
+        key = self.last_key = self._key(exception)
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            self._hit(bucket, input)
+            return False
+        if len(self.buckets) >= self.max_buckets:
+            self.dropped += 1
+            return False
+        exception_type, frames = describe_exception(exception, self.frames)
+        codes = [tb.tb_frame.f_code for tb in _traceback(exception)]
+        self.buckets[key] = CrashBucket(
+            exception_type, frames, exception_message(exception), input, tuple(codes[-self.frames:])
+        )
+        return True
+
+    def record_description(self, exception_type: str, frames: tuple, message: str, input: str) -> bool:
+        """Like `record`, for an exception already described by `describe_exception`
+        (e.g. in another process), or a failure without a traceback (`frames` empty)."""
+        key = self.last_key = (exception_type, frames)
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            self._hit(bucket, input)
+            return False
+        if len(self.buckets) >= self.max_buckets:
+            self.dropped += 1
+            return False
+        self.buckets[key] = CrashBucket(exception_type, frames, message, input)
+        return True
+
+    def record_repeat(self, key, input: str):
+        """Count one more exception in the bucket `key` (a `last_key`), raised again by `input`."""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.dropped += 1
+        else:
+            self._hit(bucket, input)
+
+    @staticmethod
+    def _hit(bucket: CrashBucket, input: str):
+        bucket.count += 1
+        if len(input) < len(bucket.reproducer):
+            bucket.reproducer = input
+
+    def summary(self) -> list[dict]:
+        """Return the buckets as dicts, most frequent first."""
+        return [bucket.as_dict() for bucket in sorted(self.buckets.values(), key=lambda b: -b.count)]
+
+    def save(self, directory: str):
+        """Write the reproducer of every bucket to `<directory>/<type>-<bucket_id>` and the
+        buckets to `<directory>/buckets.json`."""
+        os.makedirs(directory, exist_ok=True)
+        for bucket in self.buckets.values():
+            path = os.path.join(directory, f"{bucket.exception_type}-{bucket.bucket_id}")
+            with open(path, "w", encoding="utf-8", errors="surrogatepass") as f:
+                f.write(bucket.reproducer)
+        with open(os.path.join(directory, "buckets.json"), "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+def merge_summaries(summaries: list[list[dict]]) -> list[dict]:
+    """Merge `CrashTriage.summary` lists of several processes: counts are added and the
+    shortest reproducer of every bucket is kept."""
+    merged = {}
+    for summary in summaries:
+        for bucket in summary:
+            known = merged.get(bucket["bucket_id"])
+            if known is None:
+                merged[bucket["bucket_id"]] = dict(bucket)
+                continue
+            known["count"] += bucket["count"]
+            if len(bucket["reproducer"]) < len(known["reproducer"]):
+                known["reproducer"] = bucket["reproducer"]
+    return sorted(merged.values(), key=lambda bucket: -bucket["count"])
+
+
+def exception_message(exception: BaseException) -> str:
+    """`str(exception)`, truncated; empty if it cannot be formatted."""
+    try:
+        return str(exception)[:200]
+    except Exception:
+        return ""
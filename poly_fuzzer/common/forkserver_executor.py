@@ -0,0 +1,308 @@
+import inspect
+import marshal
+import mmap
+import os
+import signal
+import struct
+import time
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.coverage_map import MAP_SIZE, EdgeCoverageMap
+from poly_fuzzer.common.crash_triage import describe_exception, exception_message
+
+
+# Exit statuses reported by the fork server for one execution
+STATUS_OK = 0
+STATUS_EXCEPTION = 1
+STATUS_TIMEOUT = 2
+STATUS_CRASH = 3
+
+_REQUEST = struct.Struct("<I")
+_SHUTDOWN = 0xFFFFFFFF
+_RESULT = struct.Struct("<B")
+# Shared memory header written by the child: execution time, coverage payload length,
+# exception description length (the description follows the coverage payload) and status
+_HEADER = struct.Struct("<dIIB")
+
+
+def _write_all(fd, data: bytes):
+    """Write all of `data`; `os.write` on a pipe may write only part of a large buffer."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _code_objects(program_module) -> list:
+    """The code objects the target is likely to run: those of the functions and methods of its
+    module (and of the classes of a bound method), with the code objects nested in them."""
+    roots = []
+    code = getattr(program_module, "__code__", None)
+    if code is not None:
+        roots.append(code)
+    namespaces = []
+    module = inspect.getmodule(program_module)
+    if module is not None:
+        namespaces.append(vars(module))
+    owner = getattr(program_module, "__self__", None)
+    if owner is not None:
+        namespaces += [vars(cls) for cls in type(owner).__mro__ if cls is not object]
+    for namespace in namespaces:
+        for value in list(namespace.values()):
+            if isinstance(value, type) and module is not None and value.__module__ == module.__name__:
+                members = list(vars(value).values())
+            else:
+                members = [value]
+            for member in members:
+                if isinstance(member, (staticmethod, classmethod)):
+                    member = member.__func__
+                elif isinstance(member, property):
+                    roots += [f.__code__ for f in (member.fget, member.fset, member.fdel) if f is not None]
+                    continue
+                code = getattr(member, "__code__", None)
+                if inspect.iscode(code):
+                    roots.append(code)
+    codes = {}
+    while roots:
+        code = roots.pop()
+        if code not in codes:
+            codes[code] = None
+            roots += [const for const in code.co_consts if inspect.iscode(const)]
+    return list(codes)
+
+
+def _read_exact(fd, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = os.read(fd, size)
+        if not chunk:
+            return b""
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class ForkServerExecutor(AbstractExecutor):
+    """
+    # The `ForkServerExecutor` class runs every input in its own process.
+    A fork server is forked once from the (already warmed up) fuzzer process and then forks
+    one child per input. Each child has a wall-clock `timeout` (seconds) and an optional
+    address-space `memory_limit` (bytes), so hangs, crashes, `SystemExit` and state leaked
+    by the target cannot affect the campaign. Coverage comes back through shared memory and
+    `_execute_input` keeps the `(exceptions, execution_time, coverage)` contract; `last_status`
+    is only updated by executions that are not answered from the result cache.
+    With a `triage`, children describe their exceptions with `describe_exception`; timeouts
+    and crashes are triaged as "Timeout" and "Crash" buckets without frames.
+    Forking costs far more than a small target: the child copies every page it writes to.
+    With `persistent` > 1, one child runs up to that many inputs, stopping itself between
+    them like AFL's persistent mode, so state the target leaks can then reach the next
+    inputs of the same child; a child that times out or crashes is replaced.
+    Requires `os.fork` (POSIX).
+    """
+
+    def __init__(
+        self,
+        program_module,
+        timeout: float = 1.0,
+        memory_limit: int = None,
+        coverage_mode: str = "line",
+        map_size: int = MAP_SIZE,
+        coverage_buffer_size: int = 1 << 22,
+        persistent: int = 1,
+        **kwargs,
+    ):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("ForkServerExecutor requires os.fork")
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.persistent = persistent
+        self._shared = mmap.mmap(-1, _HEADER.size + coverage_buffer_size)
+        super().__init__(program_module, coverage_mode=coverage_mode, map_size=map_size, **kwargs)
+        self.server_pid = None
+        self._requests = None
+        self._results = None
+        # Status of the last execution, one of the STATUS_* constants
+        self.last_status = STATUS_OK
+
+    def _make_coverage_map(self, map_size: int) -> EdgeCoverageMap:
+        return EdgeCoverageMap(map_size, trace_bits=mmap.mmap(-1, map_size))
+
+    def _run_input(self, input):
+        if self.server_pid is None:
+            self._start_server()
+        payload = input.encode("utf-8", "surrogatepass")
+        _write_all(self._requests, _REQUEST.pack(len(payload)) + payload)
+        result = _read_exact(self._results, _RESULT.size)
+        if not result:
+            self.close()
+            raise RuntimeError("Fork server exited unexpectedly")
+        (self.last_status,) = _RESULT.unpack(result)
+
+        coverage = set()
+        description = None
+        if self.last_status == STATUS_TIMEOUT:
+            execution_time = self.timeout
+        else:
+            execution_time, length, description_length, _ = _HEADER.unpack_from(self._shared, 0)
+            if length and self.coverage_map is None:
+                coverage = marshal.loads(self._shared[_HEADER.size:_HEADER.size + length])
+            if description_length:
+                start = _HEADER.size + length
+                description = marshal.loads(self._shared[start:start + description_length])
+        exceptions = 0 if self.last_status == STATUS_OK else 1
+        self.new_bucket = False
+        if self.triage is not None and exceptions:
+            if description is None:
+                description = ("Timeout" if self.last_status == STATUS_TIMEOUT else "Crash", (), "")
+            self.new_bucket = self.triage.record_description(*description, input)
+        self._update_coverage(coverage)
+        if self.new_bucket:
+            self.novelty = 2
+
+        return exceptions, execution_time, self.run_coverage
+
+    def _start_server(self):
+        # Warm up the target filter (and inspect's module cache) once, before forking, so the
+        # children do not resolve it again for every execution
+        self.coverage_backend.warm_up(_code_objects(self.program_module))
+        request_read, request_write = os.pipe()
+        result_read, result_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(request_write)
+            os.close(result_read)
+            try:
+                self._serve(request_read, result_write)
+            finally:
+                os._exit(0)
+        os.close(request_read)
+        os.close(result_write)
+        self.server_pid = pid
+        self._requests = request_write
+        self._results = result_read
+
+    def _serve(self, requests, results):
+        """Fork server loop: fork a child per input (or per `persistent` inputs) and report
+        how every input ended."""
+        # Without a Python handler SIGALRM kills the child even inside C code
+        signal.signal(signal.SIGALRM, signal.SIG_DFL)
+        child = None
+        child_inputs = None
+        try:
+            while True:
+                header = _read_exact(requests, _REQUEST.size)
+                if not header:
+                    return
+                (length,) = _REQUEST.unpack(header)
+                if length == _SHUTDOWN:
+                    return
+                payload = _read_exact(requests, length)
+                _HEADER.pack_into(self._shared, 0, 0.0, 0, 0, STATUS_CRASH)
+                if child is None:
+                    inputs_read = None
+                    if self.persistent > 1:
+                        inputs_read, child_inputs = os.pipe()
+                    child = os.fork()
+                    if child == 0:
+                        self._run_child(payload.decode("utf-8", "surrogatepass"), inputs_read)
+                    if inputs_read is not None:
+                        os.close(inputs_read)
+                else:
+                    # The child waits for the next input, stopped
+                    os.kill(child, signal.SIGCONT)
+                    _write_all(child_inputs, header + payload)
+                _, wait_status = os.waitpid(child, os.WUNTRACED)
+                if os.WIFSTOPPED(wait_status):
+                    status = _HEADER.unpack_from(self._shared, 0)[3]
+                else:
+                    child = None
+                    if child_inputs is not None:
+                        os.close(child_inputs)
+                        child_inputs = None
+                    exit_code = os.waitstatus_to_exitcode(wait_status)
+                    if exit_code in (STATUS_OK, STATUS_EXCEPTION):
+                        status = exit_code
+                    elif exit_code == -signal.SIGALRM:
+                        status = STATUS_TIMEOUT
+                    else:
+                        status = STATUS_CRASH
+                _write_all(results, _RESULT.pack(status))
+        finally:
+            if child is not None:
+                os.kill(child, signal.SIGKILL)
+                os.waitpid(child, 0)
+
+    def _run_child(self, input, inputs):
+        """Run `input` in the forked child, and with `persistent`, the next inputs read from
+        the pipe `inputs`, then exit; never returns."""
+        status = STATUS_CRASH
+        try:
+            if self.memory_limit is not None:
+                import resource
+
+                resource.setrlimit(resource.RLIMIT_AS, (self.memory_limit, self.memory_limit))
+            for executed in range(1, self.persistent + 1):
+                # A crash before the results are written is reported as one
+                status = STATUS_CRASH
+                status = self._run_one(input)
+                if executed == self.persistent:
+                    break
+                # Report the result and wait for the fork server to send the next input
+                os.kill(os.getpid(), signal.SIGSTOP)
+                header = _read_exact(inputs, _REQUEST.size)
+                if not header:
+                    break
+                (length,) = _REQUEST.unpack(header)
+                input = _read_exact(inputs, length).decode("utf-8", "surrogatepass")
+        finally:
+            os._exit(status)
+
+    def _run_one(self, input) -> int:
+        """Run one input in the child, write its results to shared memory and return its status."""
+        signal.setitimer(signal.ITIMER_REAL, self.timeout)
+        backend = self.coverage_backend
+        error = None
+        backend.start()
+        start_time = time.perf_counter()
+        try:
+            self.program_module(input)
+            status = STATUS_OK
+        except BaseException as e:
+            status = STATUS_EXCEPTION
+            error = e
+        execution_time = time.perf_counter() - start_time
+        backend.stop()
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+        description = b""
+        if error is not None and self.triage is not None:
+            exception_type, frames = describe_exception(error, self.triage.frames)
+            description = marshal.dumps((exception_type, frames, exception_message(error)))
+
+        payload = b"" if self.coverage_map is not None else marshal.dumps(backend.coverage)
+        if _HEADER.size + len(payload) + len(description) > len(self._shared):
+            payload = description = b""
+            status = STATUS_CRASH
+        end = _HEADER.size + len(payload)
+        self._shared[_HEADER.size:end] = payload
+        self._shared[end:end + len(description)] = description
+        _HEADER.pack_into(self._shared, 0, execution_time, len(payload), len(description), status)
+        return status
+
+    def close(self):
+        """Stop the fork server."""
+        if self.server_pid is not None:
+            # Servers started later inherit our pipe, so EOF alone would not reach this one
+            try:
+                os.write(self._requests, _REQUEST.pack(_SHUTDOWN))
+            except OSError:
+                pass
+            os.close(self._requests)
+            os.close(self._results)
+            os.waitpid(self.server_pid, 0)
+            self.server_pid = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,156 @@
+import random
+
+
+GUIDES = ("produced", "productive")
+
+
+class GrammarCoverage:
+    """
+    # The `GrammarCoverage` class steers `AbstractGrammar` generation towards uncovered expansions.
+    Every (nonterminal, expansion) pair of the grammar has a bit in a Python int bitmask.
+    An expansion is produced once a generated tree used it, and productive once an input
+    whose tree used it found new code coverage (reported with `record`). With `k` > 1, the
+    k-paths (an expansion with the expansions of its `k - 1` nearest ancestors) are tracked
+    as well. `guide` selects which of the two counts as covered.
+    When a nonterminal is expanded, an uncovered expansion (or k-path) is chosen first. Next
+    come the expansions whose subtrees can still reach uncovered expansions, weighted by how
+    many they can reach. Only after that is the choice uniform. The expansions reachable
+    from every expansion are precomputed as bitmasks, so a choice is a few integer ANDs.
+    """
+
+    def __init__(self, grammar, k: int = 1, guide: str = "produced"):
+        if guide not in GUIDES:
+            raise ValueError(f"Unknown guide: {guide!r}")
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.grammar = grammar
+        self.k = k
+        self.guide = guide
+        # Bit of the first expansion of every nonterminal
+        self.offsets = []
+        offset = 0
+        for expansions in grammar.expansions:
+            self.offsets.append(offset)
+            offset += len(expansions)
+        self.expansion_count = offset
+        self.reach, self.expansion_reach = self._compute_reach()
+        # (symbol_id, tokens) -> expansion index, to recover the expansions of a tree
+        self._expansion_index = {
+            (symbol_id, tokens): k
+            for symbol_id, expansions in enumerate(grammar.expansions)
+            for k, tokens in enumerate(expansions)
+        }
+        self.produced = 0
+        self.productive = 0
+        self.produced_paths = set()
+        self.productive_paths = set()
+
+    def _compute_reach(self):
+        """Return, per nonterminal and per expansion, the bitmask of the expansions that can
+        occur in a tree derived from it (including its own)."""
+        grammar = self.grammar
+        reach = [0] * len(grammar.expansions)
+        changed = True
+        while changed:
+            changed = False
+            for symbol_id, expansions in enumerate(grammar.expansions):
+                mask = reach[symbol_id]
+                for k, tokens in enumerate(expansions):
+                    mask |= 1 << (self.offsets[symbol_id] + k)
+                    for token in tokens:
+                        if isinstance(token, int):
+                            mask |= reach[token]
+                if mask != reach[symbol_id]:
+                    reach[symbol_id] = mask
+                    changed = True
+        expansion_reach = []
+        for symbol_id, expansions in enumerate(grammar.expansions):
+            masks = []
+            for k, tokens in enumerate(expansions):
+                mask = 1 << (self.offsets[symbol_id] + k)
+                for token in tokens:
+                    if isinstance(token, int):
+                        mask |= reach[token]
+                masks.append(mask)
+            expansion_reach.append(masks)
+        return reach, expansion_reach
+
+    def _covered(self):
+        if self.guide == "produced":
+            return self.produced, self.produced_paths
+        return self.productive, self.productive_paths
+
+    def choose(self, symbol_id: int, acceptable: list, path: tuple) -> int:
+        """Choose among the `acceptable` expansions of `symbol_id`, whose node has the
+        ancestor expansions `path` (empty unless `k` > 1)."""
+        covered, covered_paths = self._covered()
+        offset = self.offsets[symbol_id]
+        if self.k > 1:
+            uncovered = [k for k in acceptable if path + (offset + k,) not in covered_paths]
+        else:
+            uncovered = [k for k in acceptable if not covered >> (offset + k) & 1]
+        if uncovered:
+            return random.choice(uncovered)
+        reach = self.expansion_reach[symbol_id]
+        weights = [(reach[k] & ~covered).bit_count() for k in acceptable]
+        if any(weights):
+            return random.choices(acceptable, weights)[0]
+        return random.choice(acceptable)
+
+    def expand(self, symbol_id: int, k: int, path: tuple) -> tuple:
+        """Mark the k-th expansion of `symbol_id` as produced; return the path of its children."""
+        expansion = self.offsets[symbol_id] + k
+        self.produced |= 1 << expansion
+        if self.k == 1:
+            return ()
+        path += (expansion,)
+        self.produced_paths.add(path)
+        return path[1 - self.k:]
+
+    def record(self, tree):
+        """Mark the expansions (and k-paths) used by `tree` as productive: its input found
+        new code coverage."""
+        stack = [(tree, ())]
+        while stack:
+            node, path = stack.pop()
+            symbol_id, children = node
+            if children is None:
+                continue
+            if symbol_id is not None:
+                tokens = tuple(child if isinstance(child, str) else child[0] for child in children)
+                k = self._expansion_index.get((symbol_id, tokens))
+                if k is None:
+                    continue
+                expansion = self.offsets[symbol_id] + k
+                self.productive |= 1 << expansion
+                if self.k > 1:
+                    path += (expansion,)
+                    self.productive_paths.add(path)
+                    path = path[1 - self.k:]
+            for child in children:
+                if not isinstance(child, str):
+                    stack.append((child, path))
+
+    def uncovered(self) -> list[str]:
+        """The expansions not covered yet (according to `guide`), as `"<symbol> -> expansion"`."""
+        covered, _ = self._covered()
+        grammar = self.grammar
+        return [
+            f"{symbol} -> {expansion}"
+            for symbol_id, symbol in enumerate(grammar.symbols)
+            for k, expansion in enumerate(grammar.expansion_strings[symbol_id])
+            if not covered >> (self.offsets[symbol_id] + k) & 1
+        ]
+
+    def summary(self) -> dict:
+        """Number of expansions (and k-paths) produced and productive so far."""
+        summary = {
+            "expansions": self.expansion_count,
+            "produced": self.produced.bit_count(),
+            "productive": self.productive.bit_count(),
+        }
+        if self.k > 1:
+            summary["k"] = self.k
+            summary["produced_paths"] = len(self.produced_paths)
+            summary["productive_paths"] = len(self.productive_paths)
+        return summary
@@ -0,0 +1,260 @@
+import random
+
+from poly_fuzzer.common.token_dictionary import TokenDictionary
+
+# Values that often hit boundary conditions, as in AFL
+INTERESTING_8 = [-128, -1, 0, 1, 16, 32, 64, 100, 127]
+INTERESTING_16 = INTERESTING_8 + [-32768, -129, 128, 255, 256, 512, 1000, 1024, 4096, 32767]
+INTERESTING_32 = INTERESTING_16 + [-2147483648, -100663046, -32769, 32768, 65535, 65536, 100663045, 2147483647]
+
+ARITH_MAX = 35
+
+# Printable ASCII, the characters inserted and substituted by the character operators
+PRINTABLE = bytes(range(32, 127))
+
+
+def _interesting_bytes() -> list[bytes]:
+    values = []
+    for width, interesting in ((1, INTERESTING_8), (2, INTERESTING_16), (4, INTERESTING_32)):
+        for value in interesting:
+            for byteorder in ("little", "big"):
+                encoded = (value % (1 << (8 * width))).to_bytes(width, byteorder)
+                if encoded not in values:
+                    values.append(encoded)
+    return values
+
+
+class HavocMutator:
+    """
+    # The `HavocMutator` class is the mutation engine shared by the fuzzers.
+    Its operators work in place on one reusable `bytearray`: `load` writes a candidate into
+    the buffer, any number of operators are stacked on it, and `text` decodes the result.
+    Strings are encoded as UTF-8 with `surrogateescape`, so valid text round-trips and any
+    byte sequence an operator produces is still a `str`.
+    The operators are the character mutations the fuzzers used so far (`delete_characters`,
+    `replace_characters` and `insert_characters`; with `multiple`, half of the time they edit
+    between 1 and len(s) characters, and inputs not longer than `min_delete_length` are never
+    shortened) and AFL's havoc stage: bit and byte flips, byte arithmetic, interesting values,
+    block deletion, cloning and overwriting, splicing with another seed (see `add_donor`), and
+    inserting or overwriting the tokens of a `TokenDictionary` (see `add_tokens`); half of the
+    overwrites complete a token whose first character is already in the input. The operators
+    that edit one position are O(1), those that delete, insert or overwrite a block a memmove
+    plus a copy of the block (taken from the buffer, a donor, a token or a pool of random
+    characters made once). Editing several characters costs O(len + count log count): the
+    result is built once from the slices between the sorted positions and written back,
+    instead of one memmove per character.
+    Inputs are not grown past `max_length` bytes.
+    """
+
+    CHARACTER_OPERATORS = ("delete_characters", "replace_characters", "insert_characters")
+    HAVOC_OPERATORS = (
+        "flip_bit",
+        "random_byte",
+        "arithmetic",
+        "interesting_value",
+        "delete_block",
+        "clone_block",
+        "overwrite_block",
+    )
+    SPLICE_OPERATORS = ("splice",)
+    TOKEN_OPERATORS = ("insert_token", "overwrite_token")
+
+    def __init__(
+        self,
+        multiple: bool = False,
+        min_delete_length: int = 0,
+        max_length: int = 8192,
+        tokens=(),
+    ):
+        self.multiple = multiple
+        self.min_delete_length = min_delete_length
+        self.max_length = max_length
+        self.buffer = bytearray()
+        self.donors = []
+        # `tokens` is a `TokenDictionary`, which is then shared, or an iterable of tokens
+        self.tokens = tokens if isinstance(tokens, TokenDictionary) else TokenDictionary(tokens)
+        self._interesting = _interesting_bytes()
+        # Pool of random printable characters that inserted blocks are copied from
+        self._pool = bytes(random.choice(PRINTABLE) for _ in range(max(max_length, 1)))
+
+    def operators(self, names=CHARACTER_OPERATORS) -> list:
+        """Return the operators called `names`, as bound methods taking the buffer."""
+        return [getattr(self, name) for name in names]
+
+    def load(self, data: str) -> bytearray:
+        """Write `data` into the buffer and return the buffer."""
+        buffer = self.buffer
+        buffer[:] = self.encode(data)
+        return buffer
+
+    @staticmethod
+    def encode(data: str) -> bytes:
+        return data.encode("utf-8", "surrogateescape")
+
+    @staticmethod
+    def text(buffer: bytearray) -> str:
+        return buffer.decode("utf-8", "surrogateescape")
+
+    def mutate(self, data: str, num_mutations: int = 1, operators: list = None) -> str:
+        """Return `data` with `num_mutations` random operators (default: all) applied."""
+        if operators is None:
+            operators = self.operators(
+                self.CHARACTER_OPERATORS + self.HAVOC_OPERATORS + self.SPLICE_OPERATORS + self.TOKEN_OPERATORS
+            )
+        buffer = self.load(data)
+        for _ in range(num_mutations):
+            random.choice(operators)(buffer)
+        return self.text(buffer)
+
+    def add_donor(self, data: str):
+        """Make `data` available to `splice`."""
+        self.donors.append(self.encode(data))
+
+    def add_tokens(self, tokens):
+        """Make `tokens` available to the token operators."""
+        self.tokens.add_tokens(tokens)
+
+    def _count(self, length: int) -> int:
+        """Number of characters edited by one application of a character operator."""
+        if self.multiple and length > 1 and random.random() < 0.5:
+            return random.randint(1, length)
+        return 1
+
+    def _block_length(self, limit: int) -> int:
+        """A block length up to `limit`, biased towards short blocks like AFL's choose_block_len."""
+        if limit <= 1:
+            return limit
+        upper = min(limit, (8, 32, 128)[random.randrange(3)])
+        return random.randint(1, upper)
+
+    # Character operators
+
+    def delete_characters(self, buffer: bytearray):
+        length = len(buffer)
+        if length == 0 or length <= self.min_delete_length:
+            return
+        count = self._count(length)
+        if count == 1:
+            del buffer[random.randrange(length)]
+            return
+        # Several characters: keep the slices between them, rewriting the buffer once
+        deleted = sorted(random.sample(range(length), count))
+        buffer[:] = b"".join(buffer[start + 1:end] for start, end in zip([-1] + deleted, deleted + [length]))
+
+    def replace_characters(self, buffer: bytearray):
+        length = len(buffer)
+        if length == 0:
+            return
+        for _ in range(self._count(length)):
+            buffer[random.randrange(length)] = random.randint(32, 126)
+
+    def insert_characters(self, buffer: bytearray):
+        length = len(buffer)
+        count = min(self._count(length) if buffer else 1, self.max_length - length)
+        if count <= 0:
+            return
+        if count == 1:
+            buffer.insert(random.randint(0, length), random.randint(32, 126))
+            return
+        # Several characters: build the result from the slices between the insertion points,
+        # rewriting the buffer once
+        indices = sorted(random.choices(range(length + 1), k=count))
+        result = bytearray()
+        start = 0
+        for index, character in zip(indices, random.choices(PRINTABLE, k=count)):
+            result += buffer[start:index]
+            result.append(character)
+            start = index
+        result += buffer[start:]
+        buffer[:] = result
+
+    # Havoc operators
+
+    def flip_bit(self, buffer: bytearray):
+        if buffer:
+            bit = random.randrange(len(buffer) << 3)
+            buffer[bit >> 3] ^= 1 << (bit & 7)
+
+    def random_byte(self, buffer: bytearray):
+        if buffer:
+            buffer[random.randrange(len(buffer))] ^= random.randint(1, 255)
+
+    def arithmetic(self, buffer: bytearray):
+        if buffer:
+            index = random.randrange(len(buffer))
+            delta = random.randint(1, ARITH_MAX)
+            buffer[index] = (buffer[index] + (delta if random.random() < 0.5 else -delta)) & 0xFF
+
+    def interesting_value(self, buffer: bytearray):
+        value = random.choice(self._interesting)
+        if len(buffer) >= len(value):
+            index = random.randint(0, len(buffer) - len(value))
+            buffer[index:index + len(value)] = value
+
+    def delete_block(self, buffer: bytearray):
+        if len(buffer) > max(self.min_delete_length, 1):
+            length = self._block_length(len(buffer) - 1)
+            index = random.randint(0, len(buffer) - length)
+            del buffer[index:index + length]
+
+    def clone_block(self, buffer: bytearray):
+        """Insert a copy of a block of the input or, a quarter of the time, random characters."""
+        room = self.max_length - len(buffer)
+        if room <= 0:
+            return
+        index = random.randint(0, len(buffer))
+        if buffer and random.random() < 0.75:
+            length = self._block_length(min(len(buffer), room))
+            source = random.randint(0, len(buffer) - length)
+            buffer[index:index] = buffer[source:source + length]
+        else:
+            length = self._block_length(min(len(self._pool), room))
+            source = random.randint(0, len(self._pool) - length)
+            buffer[index:index] = self._pool[source:source + length]
+
+    def overwrite_block(self, buffer: bytearray):
+        if len(buffer) >= 2:
+            length = self._block_length(len(buffer) - 1)
+            source = random.randint(0, len(buffer) - length)
+            target = random.randint(0, len(buffer) - length)
+            if source != target:
+                buffer[target:target + length] = buffer[source:source + length]
+
+    def splice(self, buffer: bytearray):
+        """Replace the tail of the input with the tail of a donor, from random split points."""
+        if not self.donors:
+            return
+        donor = random.choice(self.donors)
+        if not donor:
+            return
+        split = random.randint(0, len(buffer))
+        donor_split = random.randrange(len(donor))
+        buffer[split:] = donor[donor_split:donor_split + self.max_length - split]
+
+    def insert_token(self, buffer: bytearray):
+        if self.tokens:
+            token = self.tokens.choose()
+            if len(buffer) + len(token) <= self.max_length:
+                index = random.randint(0, len(buffer))
+                buffer[index:index] = token
+
+    def overwrite_token(self, buffer: bytearray):
+        """Overwrite the input with a token at a random position or, half of the time, with a
+        token starting with the character at that position."""
+        if not self.tokens or not buffer:
+            return
+        index = random.randrange(len(buffer))
+        if random.random() < 0.5:
+            candidates = self.tokens.starting_with(buffer[index])
+            if not candidates:
+                return
+            token = random.choice(candidates)
+            # Past the end of the input, the overwrite extends it
+            if index + len(token) > self.max_length:
+                return
+        else:
+            token = self.tokens.choose()
+            if len(token) > len(buffer):
+                return
+            index = min(index, len(buffer) - len(token))
+        buffer[index:index + len(token)] = token
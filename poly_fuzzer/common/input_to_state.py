@@ -0,0 +1,134 @@
+import random
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.token_dictionary import TokenDictionary
+
+
+ORDERING = ("<", "<=", ">", ">=")
+
+
+class InputToState:
+    """
+    # The `InputToState` class turns the comparisons an input makes into new inputs (RedQueen).
+    The target is run once on a seed with `AbstractExecutor.capture_comparisons`. Many
+    operands come straight from the input (`c == "%"`, `digit_high in hex_values`), so for
+    every comparison, the operand found in the seed is replaced by the other one (for `in`
+    tests and subscripts, by the container's members; for orderings, by the other operand
+    and its neighbours). Each candidate replaces a single occurrence, at most
+    `max_positions` of them per operand pair, and at most `max_candidates` candidates are
+    kept per seed. String operands are also added to `dictionary`, if given.
+    This costs a traced run per seed, so seeds are only analyzed, each once, while the
+    campaign is stalled: after `stall_executions` executions without new coverage.
+    """
+
+    def __init__(
+        self,
+        executor: AbstractExecutor,
+        stall_executions: int = 1000,
+        max_candidates: int = 64,
+        max_positions: int = 4,
+        max_members: int = 32,
+        dictionary: TokenDictionary = None,
+    ):
+        self.executor = executor
+        self.stall_executions = stall_executions
+        self.max_candidates = max_candidates
+        self.max_positions = max_positions
+        self.max_members = max_members
+        self.dictionary = dictionary
+        # Candidates not executed yet, and the number of seeds analyzed so far
+        self.pending = []
+        self.analyzed = 0
+
+    def next_input(self, executions: int, last_progress_execution: int, seeds: list):
+        """Return the next candidate to execute, or None to let the fuzzer generate one.
+        If the campaign is stalled and no candidate is pending, the next seed of `seeds` that
+        was not analyzed yet is analyzed first."""
+        if not self.pending:
+            if executions - last_progress_execution < self.stall_executions:
+                return None
+            while not self.pending and self.analyzed < len(seeds):
+                seed = seeds[self.analyzed]
+                self.analyzed += 1
+                self.analyze(seed.data)
+            if not self.pending:
+                return None
+        return self.pending.pop()
+
+    def analyze(self, input: str) -> list[str]:
+        """Run `input` with comparison tracing and queue the candidates derived from it."""
+        comparisons = self.executor.capture_comparisons(input)
+        candidates = self.substitutions(input, comparisons)
+        self.pending.extend(candidates)
+        if self.dictionary is not None:
+            for _, left, right in comparisons:
+                for value in (left, right):
+                    if isinstance(value, (str, bytes)):
+                        self.dictionary.add(value)
+        return candidates
+
+    def substitutions(self, input: str, comparisons: list) -> list[str]:
+        """Return the inputs obtained by replacing, in `input`, an operand of one of the
+        `(kind, left, right)` comparisons by the value it was compared with."""
+        candidates = {}
+        for kind, left, right in comparisons:
+            if kind in ("in", "[]"):
+                old = _text(left)
+                for member in self._members(right):
+                    self._substitute(input, old, member, candidates)
+                if kind == "in" and isinstance(left, str) and isinstance(right, str):
+                    # `"[" in netloc`: make the searched part of the input contain the operand
+                    self._substitute(input, right, right + left, candidates)
+            elif kind in ORDERING and _is_int(left) and _is_int(right):
+                for old, new in ((left, right), (right, left)):
+                    for value in (new - 1, new, new + 1):
+                        self._substitute(input, str(old), str(value), candidates)
+            else:
+                self._substitute(input, _text(left), _text(right), candidates)
+                self._substitute(input, _text(right), _text(left), candidates)
+        candidates.pop(input, None)
+        candidates = list(candidates)
+        if len(candidates) > self.max_candidates:
+            return random.sample(candidates, self.max_candidates)
+        random.shuffle(candidates)
+        return candidates
+
+    def _members(self, container) -> list[str]:
+        """Text of (a sample of) the keys or items of `container`."""
+        if isinstance(container, (str, bytes)):
+            members = [container[i:i + 1] for i in range(len(container))]
+        elif isinstance(container, (dict, set, frozenset, list, tuple)):
+            members = list(container)
+        else:
+            return []
+        if len(members) > self.max_members:
+            members = random.sample(members, self.max_members)
+        return [text for text in map(_text, members) if text is not None]
+
+    def _substitute(self, input: str, old: str, new: str, candidates: dict):
+        if not old or new is None or old == new:
+            return
+        positions = []
+        position = input.find(old)
+        while position >= 0:
+            positions.append(position)
+            position = input.find(old, position + 1)
+        if len(positions) > self.max_positions:
+            positions = random.sample(positions, self.max_positions)
+        for position in positions:
+            candidates[input[:position] + new + input[position + len(old):]] = None
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _text(value):
+    """The text an operand appears as in the input, or None."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "surrogateescape")
+    if _is_int(value):
+        return str(value)
+    return None
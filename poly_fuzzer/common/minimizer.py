@@ -0,0 +1,102 @@
+import heapq
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.corpus_store import coverage_signature
+
+
+class Minimizer:
+    """
+    # The `Minimizer` class shrinks a corpus, like AFL's `afl-cmin` and `afl-tmin`.
+    `minimize_corpus` keeps the smallest set of seeds that covers everything the corpus covers,
+    by greedy weighted set cover: it repeatedly keeps the seed with the most not yet covered
+    locations per second of execution time, preferring shorter seeds on ties.
+    `minimize_input` shrinks one input by delta debugging (ddmin): it removes chunks of
+    characters as long as the input keeps its coverage signature and whether it raises.
+    Seeds are executed with `executor`, which should not be the one of a running campaign. Both
+    assume the target is deterministic; a stateful target (e.g. a shared `HTMLParser().feed`)
+    or one that caches results (e.g. `urlparse`) can cover different locations on a re-run.
+    """
+
+    def __init__(self, executor: AbstractExecutor):
+        self.executor = executor
+
+    def _run(self, input: str):
+        """Execute `input` and return (covered locations, signature, exceptions, execution time)."""
+        exceptions, execution_time, coverage = self.executor._execute_input(input)
+        locations = set(coverage.tolist()) if hasattr(coverage, "tolist") else set(coverage)
+        return locations, coverage_signature(coverage), exceptions, execution_time
+
+    def minimize_corpus(self, seeds: list[AbstractSeed]) -> list[AbstractSeed]:
+        """Return a subset of `seeds` with the same total coverage, in their original order."""
+        coverages = []
+        costs = []
+        for seed in seeds:
+            locations, _, _, execution_time = self._run(seed.data)
+            coverages.append(locations)
+            # Floor the cost so timer resolution does not decide between fast seeds
+            costs.append(max(execution_time, 1e-6))
+
+        # Lazy greedy: a seed's gain can only decrease, so stale heap entries are re-scored
+        # when they reach the top instead of re-scoring every seed after each pick.
+        heap = [
+            (-len(locations) / cost, len(seed.data), index)
+            for index, (seed, locations, cost) in enumerate(zip(seeds, coverages, costs))
+            if locations
+        ]
+        heapq.heapify(heap)
+        covered = set()
+        kept = []
+        while heap:
+            _, length, index = heapq.heappop(heap)
+            gain = len(coverages[index] - covered)
+            if not gain:
+                continue
+            score = (-gain / costs[index], length, index)
+            if heap and score > heap[0]:
+                heapq.heappush(heap, score)
+                continue
+            covered |= coverages[index]
+            kept.append(index)
+        return [seeds[index] for index in sorted(kept)]
+
+    def minimize_input(self, input: str, max_executions: int = 1000) -> str:
+        """Return the smallest input found that has the same coverage signature as `input`."""
+        _, signature, exceptions, _ = self._run(input)
+        executions = 1
+
+        def preserves(candidate):
+            _, candidate_signature, candidate_exceptions, _ = self._run(candidate)
+            return candidate_signature == signature and candidate_exceptions == exceptions
+
+        granularity = 2
+        while len(input) >= 2 and executions < max_executions:
+            chunk = -(-len(input) // granularity)
+            reduced = False
+            for start in range(0, len(input), chunk):
+                if executions >= max_executions:
+                    break
+                candidate = input[:start] + input[start + chunk:]
+                executions += 1
+                if preserves(candidate):
+                    input = candidate
+                    granularity = max(granularity - 1, 2)
+                    reduced = True
+                    break
+            if not reduced:
+                if granularity >= len(input):
+                    break
+                granularity = min(granularity * 2, len(input))
+        return input
+
+    def minimize(self, seeds: list[AbstractSeed], max_executions: int = 1000) -> list[AbstractSeed]:
+        """Minimize the corpus, then every kept seed. Returns new seeds."""
+        minimized = []
+        for seed in self.minimize_corpus(seeds):
+            data = self.minimize_input(seed.data, max_executions)
+            new_seed = AbstractSeed(data)
+            new_seed.coverage = seed.coverage
+            if data == seed.data:
+                new_seed.tree = seed.tree
+            minimized.append(new_seed)
+        return minimized
@@ -0,0 +1,125 @@
+import random
+
+
+class BanditArms:
+    """Finds and cost (seconds) of a set of bandit arms, with a Gamma-Poisson posterior on
+    each arm's find rate (finds per second). Decay is applied lazily through a common scale:
+    the stored values times `scale` are the decayed ones. Also used by `CampaignScheduler`,
+    where a find is a unit of new coverage."""
+
+    def __init__(self, count: int, prior_uses: float):
+        self.finds = [0.0] * count
+        self.costs = [0.0] * count
+        self.uses = [0.0] * count
+        self.prior_uses = prior_uses
+        self.scale = 1.0
+
+    def add(self, index: int, cost: float, found):
+        """Add one use of `cost` seconds that found something (True) or `found` things."""
+        self.uses[index] += 1 / self.scale
+        self.costs[index] += cost / self.scale
+        if found:
+            self.finds[index] += found / self.scale
+
+    def sample_rates(self) -> list[float]:
+        """Thompson sampling: draw a find rate for every arm from its posterior.
+        The prior is one find per `prior_uses` uses at the average cost of a use, which is
+        optimistic, so every arm is tried before the data takes over."""
+        scale = self.scale
+        total_uses = sum(self.uses)
+        mean_cost = sum(self.costs) / total_uses if total_uses else 1.0
+        prior_cost = self.prior_uses * max(mean_cost, 1e-9)
+        return [
+            random.gammavariate(1.0 + finds * scale, 1.0 / (prior_cost + cost * scale))
+            for finds, cost in zip(self.finds, self.costs)
+        ]
+
+    def rates(self) -> list[float]:
+        return [finds / cost if cost else 0.0 for finds, cost in zip(self.finds, self.costs)]
+
+    def decay(self, factor: float):
+        self.scale *= factor
+        if self.scale < 1e-100:
+            for values in (self.finds, self.costs, self.uses):
+                for i in range(len(values)):
+                    values[i] *= self.scale
+            self.scale = 1.0
+
+
+class MutatorScheduler:
+    """
+    # The `MutatorScheduler` class chooses mutators and stacking depths by their yield.
+    Every mutator and every number of stacked mutations (`min_mutations`..`max_mutations`)
+    is an arm of a bandit. An arm is credited with the time it costs (for a mutator, the time
+    it ran plus its share of the execution; for a depth, the whole candidate) and with a find
+    when the candidate it contributed to was novel. For every candidate, a find rate per
+    second is drawn for every arm from its posterior (Thompson sampling); the depth with the
+    highest rate is used and mutators are chosen in proportion to their rates.
+    Statistics decay by `decay` after every candidate, so the schedule follows the campaign
+    as the cheap finds run out.
+    """
+
+    def __init__(
+        self,
+        mutators: list,
+        min_mutations: int = 1,
+        max_mutations: int = 10,
+        decay: float = 0.999,
+        prior_uses: float = 10.0,
+    ):
+        self.mutators = mutators
+        self.min_mutations = min_mutations
+        self.max_mutations = max_mutations
+        self.decay = decay
+        self._mutator_index = {mutator: i for i, mutator in enumerate(mutators)}
+        self._mutator_arms = BanditArms(len(mutators), prior_uses)
+        self._depth_arms = BanditArms(max_mutations - min_mutations + 1, prior_uses)
+        self._weights = [1.0] * len(mutators)
+        # Mutator uses and their time (ns) in the current candidate, and its depth
+        self._used = []
+        self._depth = None
+
+    def begin_candidate(self) -> int:
+        """Start a new candidate and return how many mutations to stack on it."""
+        self._weights = self._mutator_arms.sample_rates()
+        depth_rates = self._depth_arms.sample_rates()
+        self._depth = max(range(len(depth_rates)), key=depth_rates.__getitem__)
+        self._used = []
+        return self.min_mutations + self._depth
+
+    def choose(self):
+        """Choose the next mutator of the current candidate."""
+        return random.choices(self.mutators, weights=self._weights)[0]
+
+    def record(self, mutator, duration_ns: int):
+        """Record that `mutator` ran for `duration_ns` on the current candidate."""
+        self._used.append((self._mutator_index[mutator], duration_ns))
+
+    def reward(self, novel: bool, execution_time: float):
+        """Credit the arms used by the candidate that was just executed."""
+        if self._depth is None:
+            # Not a scheduled candidate (a seed, or a batch)
+            return
+        mutation_time = sum(duration for _, duration in self._used) / 1e9
+        self._mutator_arms.decay(self.decay)
+        self._depth_arms.decay(self.decay)
+        if self._used:
+            execution_share = execution_time / len(self._used)
+            for index, duration in self._used:
+                self._mutator_arms.add(index, duration / 1e9 + execution_share, novel)
+        self._depth_arms.add(self._depth, mutation_time + execution_time, novel)
+        self._used = []
+        self._depth = None
+
+    def summary(self) -> dict:
+        """Return the current find rate estimates (finds per second) of the mutators and depths."""
+        return {
+            "mutators": {
+                getattr(mutator, "__name__", repr(mutator)): rate
+                for mutator, rate in zip(self.mutators, self._mutator_arms.rates())
+            },
+            "depths": {
+                self.min_mutations + depth: rate
+                for depth, rate in enumerate(self._depth_arms.rates())
+            },
+        }
@@ -0,0 +1,44 @@
+from collections import OrderedDict
+
+from poly_fuzzer.common.corpus_store import input_digest
+
+
+class ResultCache:
+    """
+    # The `ResultCache` class is a bounded LRU cache of execution results.
+    It maps the digest of an input to the `(exceptions, execution_time, coverage,
+    path_signature, bucket_key)` of its last execution, so an executor can skip tracing an input it has already run. This is
+    only correct for deterministic targets.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, input: str):
+        """Return the cached result of `input`, or None, and count a hit or a miss."""
+        digest = input_digest(input)
+        result = self._results.get(digest)
+        if result is None:
+            self.misses += 1
+            return None
+        self._results.move_to_end(digest)
+        self.hits += 1
+        return result
+
+    def put(self, input: str, result: tuple):
+        digest = input_digest(input)
+        self._results[digest] = result
+        self._results.move_to_end(digest)
+        if len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,113 @@
+import glob
+import os
+from collections import namedtuple
+
+import numpy as np
+
+
+# One execution of a campaign: the input, whether it raised, how long it ran, how many
+# locations it covered and how many locations the campaign had covered after it
+RunRecord = namedtuple("RunRecord", "input exceptions execution_time run_coverage coverage")
+
+# In the order they are written; "coverage" comes last, as a chunk is complete once its
+# coverage file exists
+_COLUMNS = {
+    "run_coverage": np.int64,
+    "execution_times": np.float64,
+    "exceptions": np.uint8,
+    "coverage": np.int64,
+}
+
+# Files of a chunk
+_FILES = ("inputs_data", "inputs_offsets") + tuple(_COLUMNS)
+
+
+class NpyChunkSink:
+    """
+    # The `NpyChunkSink` class writes run records to a directory of `.npy` chunks.
+    Records are buffered in preallocated NumPy columns and every `chunk_size` records one
+    file per column is written, so memory stays bounded whatever the budget. Inputs are
+    stored Arrow-style, as their concatenated UTF-8 bytes and an array of end offsets.
+    Every file is written atomically and the coverage file of a chunk last, so a chunk whose
+    flush was interrupted has no coverage file; `load_results` skips it and the next sink
+    on the directory overwrites it.
+    `load_results` reads a directory back into the format of `AbstractFuzzer.run_fuzzer`.
+    """
+
+    def __init__(self, directory: str, chunk_size: int = 100_000):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+        self._chunk_index = len(glob.glob(os.path.join(directory, "coverage-*.npy")))
+        self._columns = {name: np.empty(chunk_size, dtype=dtype) for name, dtype in _COLUMNS.items()}
+        self._inputs = []
+        self._size = 0
+
+    def write(self, record: RunRecord):
+        i = self._size
+        columns = self._columns
+        columns["coverage"][i] = record.coverage
+        columns["run_coverage"][i] = record.run_coverage
+        columns["execution_times"][i] = record.execution_time
+        columns["exceptions"][i] = record.exceptions
+        self._inputs.append(record.input)
+        self._size = i + 1
+        if self._size == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records as a new chunk."""
+        if not self._size:
+            return
+        suffix = f"-{self._chunk_index:06d}.npy"
+        encoded = [input.encode("utf-8", "surrogatepass") for input in self._inputs]
+        offsets = np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)))
+        self._save("inputs_data" + suffix, np.frombuffer(b"".join(encoded), dtype=np.uint8))
+        self._save("inputs_offsets" + suffix, offsets)
+        # The coverage column is written last (see `_COLUMNS`): a chunk exists once it is there
+        for name, column in self._columns.items():
+            self._save(name + suffix, column[:self._size])
+        self._chunk_index += 1
+        self._inputs = []
+        self._size = 0
+
+    def _save(self, name: str, array: np.ndarray):
+        path = os.path.join(self.directory, name)
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, array)
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_results(directory: str, inputs: bool = True) -> dict:
+    """Read the chunks written by `NpyChunkSink` into one dict of NumPy arrays.
+    The keys match `AbstractFuzzer.run_fuzzer`, except that "exceptions" is the per-execution
+    array; with `inputs`, the inputs are decoded into a list. Chunks whose flush did not
+    complete are skipped."""
+    paths = sorted(glob.glob(os.path.join(directory, "coverage-*.npy")))
+    suffixes = [
+        suffix
+        for suffix in (os.path.basename(path)[len("coverage"):] for path in paths)
+        if all(os.path.exists(os.path.join(directory, name + suffix)) for name in _FILES)
+    ]
+    data = {}
+    for name, dtype in _COLUMNS.items():
+        chunks = [np.load(os.path.join(directory, name + suffix)) for suffix in suffixes]
+        data[name] = np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+    if inputs:
+        data["inputs"] = []
+        for suffix in suffixes:
+            text = np.load(os.path.join(directory, "inputs_data" + suffix)).tobytes()
+            start = 0
+            for end in np.load(os.path.join(directory, "inputs_offsets" + suffix)).tolist():
+                data["inputs"].append(text[start:end].decode("utf-8", "surrogatepass"))
+                start = end
+    return data
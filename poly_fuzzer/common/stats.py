@@ -0,0 +1,114 @@
+import logging
+import os
+import time
+
+
+logger = logging.getLogger("poly_fuzzer")
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class FuzzerStats:
+    """
+    # The `FuzzerStats` class collects where the time of a campaign goes.
+    Instrumented code adds `perf_counter_ns` durations to named timers (e.g. "generate",
+    "schedule", "mutate.<mutator>", "execute.target", "update") and increments named counters
+    (e.g. "expand.<nonterminal>"). Instrumentation is opt-in: it is enabled with
+    `AbstractFuzzer.enable_stats`, and disabled code paths only test for None.
+    Every `log_interval` seconds a summary line is logged to the "poly_fuzzer" logger and, if
+    `prometheus_path` is given, the stats are written there in the Prometheus text format.
+    """
+
+    def __init__(self, log_interval: float = None, prometheus_path: str = None, check_interval: int = 64):
+        self.log_interval = log_interval
+        self.prometheus_path = prometheus_path
+        self.check_interval = check_interval
+        # name -> [calls, total nanoseconds]
+        self.timers = {}
+        # name -> count
+        self.counters = {}
+        self.executions = 0
+        self.start_ns = time.perf_counter_ns()
+        self._last_report_ns = self.start_ns
+        self._next_check = check_interval
+
+    def add(self, name: str, duration_ns: int):
+        """Add one call of `duration_ns` nanoseconds to the timer `name`."""
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [1, duration_ns]
+        else:
+            timer[0] += 1
+            timer[1] += duration_ns
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def tick(self):
+        """Count one execution; report if `log_interval` seconds have passed."""
+        self.executions += 1
+        if self.executions < self._next_check:
+            return
+        self._next_check = self.executions + self.check_interval
+        if self.log_interval is not None:
+            now = time.perf_counter_ns()
+            if now - self._last_report_ns >= self.log_interval * 1e9:
+                self._last_report_ns = now
+                self.report()
+
+    def report(self):
+        """Log a summary line and write the Prometheus file, if any."""
+        logger.info(self.format_line())
+        if self.prometheus_path is not None:
+            self.write_prometheus(self.prometheus_path)
+
+    def summary(self) -> dict:
+        """Return {timer: {"calls", "seconds", "mean_us", "share"}}; `share` is the fraction of
+        the elapsed time spent in the timer (nested timers overlap)."""
+        elapsed = max(time.perf_counter_ns() - self.start_ns, 1)
+        return {
+            name: {
+                "calls": calls,
+                "seconds": total / 1e9,
+                "mean_us": total / calls / 1e3,
+                "share": total / elapsed,
+            }
+            for name, (calls, total) in sorted(self.timers.items())
+        }
+
+    def format_line(self) -> str:
+        elapsed = (time.perf_counter_ns() - self.start_ns) / 1e9
+        rate = self.executions / elapsed if elapsed else 0.0
+        top = sorted(self.timers.items(), key=lambda item: -item[1][1])[:5]
+        phases = " ".join(f"{name}={total / 1e9:.2f}s" for name, (_, total) in top)
+        return f"execs={self.executions} execs/s={rate:.0f} elapsed={elapsed:.1f}s {phases}"
+
+    def prometheus_text(self) -> str:
+        lines = [
+            "# TYPE poly_fuzzer_executions_total counter",
+            f"poly_fuzzer_executions_total {self.executions}",
+            "# TYPE poly_fuzzer_phase_seconds_total counter",
+        ]
+        lines += [
+            f'poly_fuzzer_phase_seconds_total{{phase="{_label(name)}"}} {total / 1e9:.9f}'
+            for name, (_, total) in sorted(self.timers.items())
+        ]
+        lines.append("# TYPE poly_fuzzer_phase_calls_total counter")
+        lines += [
+            f'poly_fuzzer_phase_calls_total{{phase="{_label(name)}"}} {calls}'
+            for name, (calls, _) in sorted(self.timers.items())
+        ]
+        lines.append("# TYPE poly_fuzzer_events_total counter")
+        lines += [
+            f'poly_fuzzer_events_total{{event="{_label(name)}"}} {count}'
+            for name, count in sorted(self.counters.items())
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Write the Prometheus text dump atomically, e.g. for a node_exporter textfile collector."""
+        with open(path + ".tmp", "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,151 @@
+import inspect
+import random
+import types
+
+from poly_fuzzer.common.abstract_grammar import AbstractGrammar
+
+
+class TokenDictionary:
+    """
+    # The `TokenDictionary` class holds the tokens the havoc token operators insert and overwrite.
+    Tokens are byte strings (text is UTF-8 encoded with `surrogateescape`, like the
+    `HavocMutator` buffer) of 1 to `max_token_length` bytes, kept in insertion order without
+    duplicates and indexed by their first byte, so an operator can complete a token whose
+    first character is already in the input (`<` into `<!DOCTYPE`, `%` into `%2F`).
+    `add_grammar` collects the terminal strings of an `AbstractGrammar`, `add_target` the
+    string and bytes constants of the code the target is made of (the `co_consts` of every
+    function and class of its module, as that is the code whose coverage is measured).
+    """
+
+    def __init__(self, tokens=(), max_token_length: int = 32, max_tokens: int = 1024):
+        self.max_token_length = max_token_length
+        self.max_tokens = max_tokens
+        self.tokens = []
+        self._known = set()
+        # First byte -> tokens starting with it
+        self.prefix_index = {}
+        self.add_tokens(tokens)
+
+    @classmethod
+    def extract(cls, grammar: AbstractGrammar = None, target=None, **kwargs) -> "TokenDictionary":
+        """Return the dictionary of the terminals of `grammar` and the constants of `target`."""
+        dictionary = cls(**kwargs)
+        if grammar is not None:
+            dictionary.add_grammar(grammar)
+        if target is not None:
+            dictionary.add_target(target)
+        return dictionary
+
+    @classmethod
+    def of(cls, dictionary, grammar: AbstractGrammar = None, target=None) -> "TokenDictionary":
+        """Return `dictionary` itself, the dictionary extracted from `grammar` and `target` if
+        it is True, or None if it is None or False."""
+        if dictionary is None or dictionary is False:
+            return None
+        if dictionary is True:
+            return cls.extract(grammar, target)
+        if isinstance(dictionary, TokenDictionary):
+            return dictionary
+        return cls(dictionary)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def __bool__(self):
+        return bool(self.tokens)
+
+    def add(self, token) -> bool:
+        """Add `token` (str or bytes); return False if it is a duplicate, empty, too long or
+        the dictionary is full."""
+        if isinstance(token, str):
+            token = token.encode("utf-8", "surrogateescape")
+        elif isinstance(token, (bytearray, memoryview)):
+            token = bytes(token)
+        if (
+            not token
+            or len(token) > self.max_token_length
+            or len(self.tokens) >= self.max_tokens
+            or token in self._known
+        ):
+            return False
+        self._known.add(token)
+        self.tokens.append(token)
+        self.prefix_index.setdefault(token[0], []).append(token)
+        return True
+
+    def add_tokens(self, tokens):
+        for token in tokens:
+            self.add(token)
+
+    def add_grammar(self, grammar: AbstractGrammar):
+        """Add the terminal strings of every expansion of `grammar`."""
+        for expansions in grammar.expansions:
+            for tokens in expansions:
+                for token in tokens:
+                    if isinstance(token, str):
+                        self.add(token)
+
+    def add_target(self, target):
+        """Add the string and bytes constants of the module `target` is defined in, or of
+        `target` alone if its module cannot be found."""
+        function = inspect.unwrap(getattr(target, "__func__", target))
+        module = inspect.getmodule(function)
+        if module is None:
+            self.add_code(getattr(function, "__code__", None))
+            return
+        for code in _module_code(module):
+            self.add_code(code)
+
+    def add_code(self, code: types.CodeType):
+        """Add the string and bytes constants of `code` and of the code objects nested in it."""
+        if code is None:
+            return
+        stack = [code]
+        while stack:
+            code = stack.pop()
+            for const in code.co_consts:
+                if isinstance(const, types.CodeType):
+                    stack.append(const)
+                elif isinstance(const, (tuple, frozenset)):
+                    # `x in ("a", "b")` and `x in {"a", "b"}` compile to constant tuples and sets
+                    for item in const:
+                        self._add_constant(item)
+                else:
+                    self._add_constant(const)
+
+    def _add_constant(self, const):
+        if isinstance(const, str):
+            const = const.encode("utf-8", "surrogateescape")
+        # Messages and docstrings are not compared with the input
+        if isinstance(const, bytes) and not (len(const) > 4 and b" " in const):
+            self.add(const)
+
+    def choose(self) -> bytes:
+        return random.choice(self.tokens)
+
+    def starting_with(self, byte: int) -> list:
+        """Return the tokens whose first byte is `byte`."""
+        return self.prefix_index.get(byte, ())
+
+
+def _module_code(module):
+    """Yield the code objects of the functions and methods defined in `module`."""
+    seen = set()
+    for value in vars(module).values():
+        members = vars(value).values() if inspect.isclass(value) else (value,)
+        for member in members:
+            if isinstance(member, (staticmethod, classmethod)):
+                member = member.__func__
+            elif isinstance(member, property):
+                member = member.fget
+            code = getattr(member, "__code__", None)
+            if (
+                isinstance(code, types.CodeType)
+                and getattr(member, "__module__", None) == module.__name__
+                and id(code) not in seen
+            ):
+                seen.add(id(code))
+                yield code
@@ -0,0 +1,101 @@
+import random
+
+from poly_fuzzer.common.abstract_grammar import AbstractGrammar
+
+
+class TreeMutator:
+    """
+    # The `TreeMutator` class mutates derivation trees produced by `AbstractGrammar.generate_tree`.
+    Mutations never modify a tree in place: only the nodes on the path from the root to the
+    mutated node are copied, and everything else is shared with the original tree. This makes a
+    mutation much cheaper than generating a new tree.
+    """
+
+    def __init__(self, grammar: AbstractGrammar, max_nonterminals: int = 10, max_duplications: int = 3):
+        self.grammar = grammar
+        self.max_nonterminals = max_nonterminals
+        self.max_duplications = max_duplications
+
+    def mutate(self, tree, donors: list = ()) -> list:
+        """Apply one random tree mutation. `donors` are trees to splice subtrees from."""
+        mutators = [self.regenerate_subtree, self.duplicate_subtree]
+        if donors:
+            mutators.append(lambda tree: self.splice_subtree(tree, random.choice(donors)))
+        return random.choice(mutators)(tree)
+
+    def regenerate_subtree(self, tree) -> list:
+        """Replace a random subtree with a freshly generated one of the same nonterminal."""
+        paths = self._nonterminal_paths(tree)
+        if not paths:
+            return tree
+        path, node = random.choice(paths)
+        new_node = self.grammar.generate_tree(
+            self.grammar.symbols[node[0]], max_nonterminals=self.max_nonterminals
+        )
+        return self._replace(tree, path, new_node)
+
+    def splice_subtree(self, tree, donor) -> list:
+        """Replace a random subtree with a subtree of the same nonterminal taken from `donor`."""
+        donor_nodes = {}
+        for _, node in self._nonterminal_paths(donor):
+            donor_nodes.setdefault(node[0], []).append(node)
+        paths = [(path, node) for path, node in self._nonterminal_paths(tree) if node[0] in donor_nodes]
+        if not paths:
+            return tree
+        path, node = random.choice(paths)
+        return self._replace(tree, path, random.choice(donor_nodes[node[0]]))
+
+    def duplicate_subtree(self, tree) -> list:
+        """Find a node with a descendant of the same nonterminal and replace the descendant
+        with the node itself, repeatedly, e.g. `<div><content></div>` -> `<div><div>...</div></div>`."""
+        pairs = []
+        ancestors = {}
+        for path, node in self._nonterminal_paths(tree):
+            for ancestor_path in ancestors.get(node[0], ()):
+                if path[:len(ancestor_path)] == ancestor_path:
+                    pairs.append((ancestor_path, path[len(ancestor_path):]))
+            ancestors.setdefault(node[0], []).append(path)
+        if not pairs:
+            return tree
+        ancestor_path, relative_path = random.choice(pairs)
+        subtree = self._node_at(tree, ancestor_path)
+        for _ in range(random.randint(1, self.max_duplications)):
+            subtree = self._replace(subtree, relative_path, subtree)
+        return self._replace(tree, ancestor_path, subtree)
+
+    @staticmethod
+    def _nonterminal_paths(tree) -> list:
+        """Return (path, node) for every expanded nonterminal node; a path is a tuple of child indices."""
+        paths = []
+        stack = [((), tree)]
+        while stack:
+            path, node = stack.pop()
+            if node[0] is not None:
+                paths.append((path, node))
+            children = node[1]
+            if children:
+                for index, child in enumerate(children):
+                    if not isinstance(child, str):
+                        stack.append((path + (index,), child))
+        return paths
+
+    @staticmethod
+    def _node_at(tree, path: tuple) -> list:
+        node = tree
+        for index in path:
+            node = node[1][index]
+        return node
+
+    @staticmethod
+    def _replace(tree, path: tuple, new_node) -> list:
+        """Return a copy of `tree` with the node at `path` replaced; only the path is copied."""
+        if not path:
+            return new_node
+        nodes = [tree]
+        for index in path[:-1]:
+            nodes.append(nodes[-1][1][index])
+        for node, index in zip(reversed(nodes), reversed(path)):
+            children = list(node[1])
+            children[index] = new_node
+            new_node = [node[0], children]
+        return new_node
@@ -1,49 +1,342 @@
 import abc
+import random
+import time
 
 from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.budget import Budget
+from poly_fuzzer.common.corpus_store import CorpusStore, coverage_signature
+from poly_fuzzer.common.grammar_coverage import GrammarCoverage
+from poly_fuzzer.common.input_to_state import InputToState
+from poly_fuzzer.common.result_sink import NpyChunkSink, RunRecord
+from poly_fuzzer.common.stats import FuzzerStats
 
 
 class AbstractFuzzer(abc.ABC):
-    def __init__(self, executor: AbstractExecutor):
+    def __init__(self, executor: AbstractExecutor, corpus: CorpusStore = None):
         self.executor = executor
+        # Optional persistent store of the inputs that increased coverage
+        self.corpus = corpus
+        # Results of the current run (see `_new_data`), and the number of inputs it executed
+        self.data = None
+        self.executions = 0
+        # Budget of the current run
+        self.budget = None
+        # Instrumentation, see `enable_stats`
+        self.stats = None
+        # Optional `MutatorScheduler`; without one, mutators are chosen in proportion to
+        # `mutator_weights`, or uniformly if it is None
+        self.mutator_scheduler = None
+        self.mutator_weights = None
+        # Optional `InputToState`, see `enable_input_to_state`
+        self.input_to_state = None
+        # Seed the current input was mutated from, or seed whose data it is; set by the
+        # fuzzers' `generate_input` so `_record` can update the seed's statistics
+        self._parent = None
+        self._replayed = None
+        self._last_record = None
+        # Per input of the last batch, what `_origin` returned for it; set by `generate_batch`
+        self._batch_origins = None
 
     @abc.abstractmethod
     def generate_input(self):
         """Generate input for fuzzing."""
         pass
 
+    def generate_batch(self, n):
+        """Generate `n` inputs for fuzzing. Fuzzers that can generate a batch faster than
+        one input at a time override this; they set `_batch_origins` to the origin (see
+        `_origin`) of every input, so that its results update the right seeds."""
+        inputs = []
+        origins = []
+        for _ in range(n):
+            self._parent = self._replayed = None
+            inputs.append(self.generate_input())
+            origins.append(self._origin())
+        self._batch_origins = origins
+        return inputs
+
+    def _origin(self):
+        """Where the input `generate_input` just returned comes from: the seed it was mutated
+        from and the seed it replays (either may be None)."""
+        return self._parent, self._replayed
+
+    def _restore_origin(self, input, origin):
+        """Make `input` of a batch, whose origin is `origin` (None if unknown), the current
+        input for `_record`."""
+        self._parent, self._replayed = origin if origin is not None else (None, None)
+
+    def enable_stats(self, stats: FuzzerStats = None) -> FuzzerStats:
+        """Time the phases of the fuzzing loop, the executor and the grammar in `stats`
+        (a new `FuzzerStats` by default) and return it."""
+        if stats is None:
+            stats = FuzzerStats()
+        self._set_stats(stats)
+        return stats
+
+    def disable_stats(self):
+        self._set_stats(None)
+
+    def enable_input_to_state(self, stall_executions: int = 1000, **kwargs) -> InputToState:
+        """When no input found new coverage for `stall_executions` executions, execute the
+        candidates an `InputToState` derives from the comparisons the seeds make, one seed at
+        a time, before generating inputs again. Comparison operands are added to the fuzzer's
+        dictionary, if it has one. Returns the `InputToState`."""
+        self.input_to_state = InputToState(
+            self.executor, stall_executions, dictionary=getattr(self, "dictionary", None), **kwargs
+        )
+        return self.input_to_state
+
+    def enable_grammar_coverage(self, k: int = 1, guide: str = "produced") -> GrammarCoverage:
+        """Make the fuzzer's grammar prefer the expansions (and k-paths) not covered yet, see
+        `GrammarCoverage`. Inputs that find new coverage mark the expansions of the tree they
+        were derived from as productive (for a mutated input, the tree its last grammar
+        mutation produced, even if character mutations followed), and `run_fuzzer` reports the grammar coverage under
+        "grammar_coverage". Returns the `GrammarCoverage`."""
+        grammar = getattr(self, "grammar", None)
+        if grammar is None:
+            raise ValueError("The fuzzer has no grammar")
+        return grammar.enable_coverage(k, guide)
+
+    def _set_stats(self, stats):
+        self.stats = stats
+        self.executor.stats = stats
+        grammar = getattr(self, "grammar", None)
+        if grammar is not None:
+            grammar.stats = stats
+
+    def _timed(self, name, function, *args):
+        """Call `function(*args)`, adding its duration to the timer `name` if stats are enabled."""
+        stats = self.stats
+        if stats is None:
+            return function(*args)
+        start = time.perf_counter_ns()
+        result = function(*args)
+        stats.add(name, time.perf_counter_ns() - start)
+        return result
+
+    def _num_mutations(self) -> int:
+        """Number of mutations to stack on the next candidate."""
+        if self.mutator_scheduler is not None:
+            return self.mutator_scheduler.begin_candidate()
+        return random.randint(self.min_mutations, self.max_mutations)
+
+    def _choose_mutator(self):
+        if self.mutator_scheduler is not None:
+            return self.mutator_scheduler.choose()
+        if self.mutator_weights is not None:
+            return random.choices(self.mutators, self.mutator_weights)[0]
+        return random.choice(self.mutators)
+
+    def _apply_mutator(self, mutator, s):
+        """Apply `mutator` to `s` and return its result, timing it for the stats and the
+        mutator scheduler."""
+        stats = self.stats
+        scheduler = self.mutator_scheduler
+        if stats is None and scheduler is None:
+            return mutator(s)
+        start = time.perf_counter_ns()
+        result = mutator(s)
+        duration = time.perf_counter_ns() - start
+        if stats is not None:
+            stats.add("mutate." + mutator.__name__, duration)
+        if scheduler is not None:
+            scheduler.record(mutator, duration)
+        return result
+
     @abc.abstractmethod
     def _update(self, input):
         """Update the fuzzer with based on the result of the input evaluation.
-        Results are stored in the data attribute of the fuzzer.
+        Results are stored in the data attribute of the fuzzer, if it keeps them.
         """
         pass
 
-    def run_fuzzer(self, budget=10):
-        """Run the fuzzer within a time budget."""
-        self.data = {
+    def run_fuzzer(self, budget=10, batch_size=1, sink: NpyChunkSink = None, keep_data=True, resume=False):
+        """Run the fuzzer within a budget: a number of inputs, or a `Budget` limiting the
+        executions, the wall-clock time and the time or executions without new coverage.
+        With `batch_size` > 1, inputs are generated with `generate_batch` and executed with
+        the executor's `_execute_batch`; batches skip input-to-state and cannot be used with
+        a `MutatorScheduler`, which credits the mutators of one candidate at a time.
+        Every execution is written to `sink` if given.
+        With `keep_data`, the per-execution lists are kept in memory and returned; otherwise
+        only a summary is returned and memory does not grow with the budget.
+        If the executor has a `CrashTriage`, its buckets are returned under "crashes".
+        With `enable_grammar_coverage`, the grammar coverage is returned under "grammar_coverage".
+        With `resume`, the run continues the previous one (e.g. a time slice of a
+        `CampaignScheduler`): the execution counter and the returned data carry on, and the
+        budget applies to this call only."""
+        self._check_batch_size(batch_size)
+        if resume and not keep_data and self.data is not None and "final_coverage" in self.data:
+            summary = self.data
+        else:
+            summary = {"executions": 0, "exceptions": 0, "final_coverage": 0, "execution_time": 0.0}
+        cache = self.executor.result_cache
+        if cache is not None:
+            hits, misses = cache.hits, cache.misses
+        try:
+            for record in self.iter_fuzzer(budget, batch_size, keep_data, resume):
+                if sink is not None:
+                    sink.write(record)
+                if not keep_data:
+                    summary["executions"] += 1
+                    summary["exceptions"] += record.exceptions
+                    summary["final_coverage"] = record.coverage
+                    summary["execution_time"] += record.execution_time
+
+        except Exception as e:
+            print(f"Error: {str(e)}")
+
+        if sink is not None:
+            sink.flush()
+        if not keep_data:
+            self.data = summary
+        if cache is not None:
+            # Inputs answered from the executor's result cache instead of being traced
+            self.data["cache_hits"] = self.data.get("cache_hits", 0) + cache.hits - hits
+            self.data["cache_misses"] = self.data.get("cache_misses", 0) + cache.misses - misses
+        if self.executor.triage is not None:
+            # Exception buckets, with their counts and shortest reproducers
+            self.data["crashes"] = self.executor.triage.summary()
+        grammar = getattr(self, "grammar", None)
+        if grammar is not None and grammar.coverage is not None:
+            # Expansions of the grammar produced so far, and those that found new coverage
+            self.data["grammar_coverage"] = grammar.coverage.summary()
+        if self.corpus is not None:
+            self._save_corpus()
+        if self.stats is not None:
+            self.stats.report()
+        return self.data
+
+    def iter_fuzzer(self, budget=10, batch_size=1, keep_data=False, resume=False):
+        """Run the fuzzer and yield a `RunRecord` after every execution.
+        `budget` and `resume` are the same as for `run_fuzzer`. Unlike `run_fuzzer`,
+        exceptions raised by the fuzzer propagate."""
+        self._check_batch_size(batch_size)
+        self.budget = budget = Budget.of(budget)
+        if not resume:
+            self.executions = 0
+        if not (resume and keep_data and self.data is not None and "inputs" in self.data):
+            self.data = self._new_data() if keep_data else None
+        budget.start(self.executions)
+        self._parent = self._replayed = None
+        while not budget.exhausted(self.executions):
+            if batch_size > 1:
+                remaining = budget.remaining(self.executions)
+                size = batch_size if remaining is None else min(batch_size, remaining)
+                self._batch_origins = None
+                inputs = self._timed("generate", self.generate_batch, size)
+                origins = self._batch_origins or [None] * len(inputs)
+                for input, origin, result in zip(inputs, origins, self.executor._execute_batch(inputs)):
+                    self._restore_origin(input, origin)
+                    yield self._record(input, *result)
+                    if budget.exhausted(self.executions):
+                        return
+            else:
+                yield self._fuzz_one()
+
+    def _check_batch_size(self, batch_size):
+        if batch_size > 1 and self.mutator_scheduler is not None:
+            raise ValueError("Batches cannot be used with a MutatorScheduler (adaptive_mutations)")
+
+    def _new_data(self):
+        return {
+            # Cumulative coverage after each input, and coverage of each input alone
             "coverage": [],
+            "run_coverage": [],
             "inputs": [],
             "execution_times": [],
             "exceptions": 0,
         }
-        #global coverage
-        coverage = []
 
-        try:
-            for i in range(budget):
-                input = self.generate_input()
-                self.data["inputs"].append(input)
-                exceptions, execution_time, coverage = self.executor._execute_input(
-                    input
-                )
-                current_coverage = len(coverage)
-                self.data["coverage"].append(current_coverage)
-                self.data["execution_times"].append(execution_time)
-                self.data["exceptions"] += exceptions
-                self._update(input)
+    def _fuzz_one(self) -> RunRecord:
+        """Generate one input, execute it and record the results."""
+        input = None
+        self._parent = self._replayed = None
+        if self.input_to_state is not None:
+            last_progress = self.budget.last_progress_execution if self.budget is not None else 0
+            input = self._timed(
+                "input_to_state",
+                self.input_to_state.next_input,
+                self.executions,
+                last_progress,
+                getattr(self, "seeds", ()),
+            )
+        if input is None:
+            input = self._timed("generate", self.generate_input)
+        exceptions, execution_time, coverage = self.executor._execute_input(
+            input
+        )
+        return self._record(input, exceptions, execution_time, coverage)
 
-        except Exception as e:
-            print(f"Error: {str(e)}")
+    def _record(self, input, exceptions, execution_time, coverage) -> RunRecord:
+        """Record the results of the input that was just executed and update the fuzzer.
+        The results are appended to the data attribute, unless it is None."""
+        stats = self.stats
+        if stats is not None:
+            start = time.perf_counter_ns()
+        self.executions += 1
+        if self.budget is not None and self.executor.novelty:
+            self.budget.progress(self.executions)
+        record = RunRecord(
+            input, exceptions, execution_time, len(coverage), len(self.executor.global_coverage)
+        )
+        if self.data is not None:
+            self.data["inputs"].append(input)
+            self.data["coverage"].append(record.coverage)
+            self.data["run_coverage"].append(record.run_coverage)
+            self.data["execution_times"].append(execution_time)
+            self.data["exceptions"] += exceptions
+        if self.corpus is not None:
+            if self.executor.novelty:
+                self.corpus.add(input, len(coverage), coverage_signature(coverage), execution_time)
+            else:
+                self.corpus.record_hit(input)
+        if self.mutator_scheduler is not None:
+            self.mutator_scheduler.reward(self.executor.novelty > 0, execution_time)
+        parent = self._parent
+        if parent is not None:
+            parent.chosen += 1
+            if self.executor.novelty:
+                parent.productive += 1
+        replayed = self._replayed
+        if replayed is not None:
+            replayed.coverage = record.run_coverage
+            replayed.execution_time = execution_time
+            replayed.path = self.executor.path_signature
+        power_schedule = getattr(self, "power_schedule", None)
+        if power_schedule is not None:
+            power_schedule.observe(parent, self.executor.path_signature, coverage)
+        if self.executor.novelty:
+            self._record_grammar_coverage(input)
+        self._last_record = record
+        self._update(input)
+        if stats is not None:
+            stats.add("update", time.perf_counter_ns() - start)
+            stats.tick()
+        return record
 
-        return self.data
+    def _record_grammar_coverage(self, input):
+        """Mark the expansions of the tree `input` was derived from as productive."""
+        grammar = getattr(self, "grammar", None)
+        if grammar is None or grammar.coverage is None:
+            return
+        tree = getattr(self, "_grammar_tree", None)
+        if tree is not None and input is getattr(self, "_candidate_input", None):
+            grammar.coverage.record(tree)
+
+    def _new_seed(self, input) -> AbstractSeed:
+        """Return a seed for `input`, the input that was just executed, with its coverage,
+        path and execution time."""
+        seed = AbstractSeed(input)
+        seed.coverage = len(self.executor.run_coverage)
+        seed.path = self.executor.path_signature
+        record = self._last_record
+        if record is not None and record.input is input:
+            seed.execution_time = record.execution_time
+        return seed
+
+    def _save_corpus(self):
+        """Persist the energy of the fuzzer's seeds and commit the corpus."""
+        for seed in getattr(self, "seeds", ()):
+            self.corpus.update(seed)
+        self.corpus.flush()
@@ -0,0 +1,96 @@
+import time
+
+from poly_fuzzer.common.budget import Budget
+from poly_fuzzer.common.mutator_scheduler import BanditArms
+from poly_fuzzer.fuzzers.abstract_fuzzer import AbstractFuzzer
+
+
+class CampaignScheduler:
+    """
+    # The `CampaignScheduler` class shares one process between the campaigns of several targets.
+    Every campaign is a fuzzer with its own executor (and so its own target), under a name.
+    The campaigns run in time slices of `slice_seconds` with `run_fuzzer(resume=True)`.
+    Every campaign gets one slice first; each later slice goes to the campaign with the best
+    coverage gain per CPU-second, drawn for every campaign from a posterior as in
+    `MutatorScheduler` (Thompson sampling). Gains and costs decay by `decay` after every
+    slice, so a campaign that stopped finding coverage soon stops taking cycles, yet is still
+    tried now and then.
+    `run` returns one report with the data and the schedule of every campaign.
+    """
+
+    def __init__(
+        self,
+        campaigns: dict[str, AbstractFuzzer],
+        slice_seconds: float = 0.5,
+        decay: float = 0.9,
+        prior_slices: float = 1.0,
+        keep_data: bool = False,
+    ):
+        self.campaigns = dict(campaigns)
+        self.names = list(self.campaigns)
+        self.slice_seconds = slice_seconds
+        self.decay = decay
+        self.keep_data = keep_data
+        self._arms = BanditArms(len(self.names), prior_slices)
+        self.slices = [0] * len(self.names)
+        self.cpu_seconds = [0.0] * len(self.names)
+        self.coverage_gain = [0] * len(self.names)
+        self._started = [False] * len(self.names)
+
+    def run(self, seconds: float) -> dict:
+        """Run the campaigns for about `seconds` seconds (rounded up to whole slices)."""
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            self.run_slice()
+        return self.report()
+
+    def run_slice(self) -> str:
+        """Run one slice of the campaign chosen by `choose` and return its name."""
+        index = self.choose()
+        fuzzer = self.campaigns[self.names[index]]
+        coverage = len(fuzzer.executor.global_coverage)
+        start = time.process_time()
+        fuzzer.run_fuzzer(
+            Budget(seconds=self.slice_seconds, check_interval=8),
+            keep_data=self.keep_data,
+            resume=self._started[index],
+        )
+        cpu_seconds = time.process_time() - start
+        gain = len(fuzzer.executor.global_coverage) - coverage
+        self._started[index] = True
+        self._arms.decay(self.decay)
+        self._arms.add(index, cpu_seconds, gain)
+        self.slices[index] += 1
+        self.cpu_seconds[index] += cpu_seconds
+        self.coverage_gain[index] += gain
+        return self.names[index]
+
+    def choose(self) -> int:
+        """Index of the campaign that runs next."""
+        for index, started in enumerate(self._started):
+            if not started:
+                return index
+        rates = self._arms.sample_rates()
+        return max(range(len(rates)), key=rates.__getitem__)
+
+    def report(self) -> dict:
+        """Return {"cpu_seconds", "slices", "campaigns": {name: ...}} for every campaign."""
+        rates = self._arms.rates()
+        campaigns = {}
+        for index, name in enumerate(self.names):
+            fuzzer = self.campaigns[name]
+            campaigns[name] = {
+                "slices": self.slices[index],
+                "cpu_seconds": self.cpu_seconds[index],
+                "executions": fuzzer.executions,
+                "coverage": len(fuzzer.executor.global_coverage),
+                "coverage_gain": self.coverage_gain[index],
+                # Recent coverage gain per CPU-second, as used for scheduling
+                "gain_rate": rates[index],
+                "data": fuzzer.data,
+            }
+        return {
+            "cpu_seconds": sum(self.cpu_seconds),
+            "slices": sum(self.slices),
+            "campaigns": campaigns,
+        }
@@ -0,0 +1,192 @@
+from poly_fuzzer.fuzzers.abstract_fuzzer import AbstractFuzzer
+import numpy as np
+from poly_fuzzer.common.abstract_seed import AbstractSeed, SeedTable
+from poly_fuzzer.common.corpus_store import CorpusStore
+from poly_fuzzer.common.mutator_scheduler import MutatorScheduler
+from poly_fuzzer.common.havoc import HavocMutator
+from poly_fuzzer.common.token_dictionary import TokenDictionary
+from poly_fuzzer.common.batch_mutator import BatchMutator, CharacterOperator, DELETE, REPLACE, INSERT
+from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
+from poly_fuzzer.common.abstract_grammar import AbstractGrammar
+from poly_fuzzer.common.tree_mutator import TreeMutator
+
+
+class GrammarMutationFuzzer(AbstractFuzzer):
+    """
+    # The `GrammarMutationFuzzer` class is the engine of the URL, CGI and HTML parser fuzzers.
+    It replays its seeds (at most `max_seeds`, novel inputs are added up to that number),
+    then mutates them with the operators of a `HavocMutator` and, with a `grammar`, with
+    grammar mutations of the candidate's derivation tree. Grammar mutations are chosen a
+    `grammar_share` of the time (a quarter, their share when the fuzzers had three character
+    operators), the other operators uniformly; with `adaptive_mutations`, a `MutatorScheduler`
+    chooses among all of them by their yield.
+    Subclasses only set the parameters of their target: `multiple_characters`, whether the
+    character operators edit several characters at once.
+    """
+
+    multiple_characters = True
+    grammar_share = 0.25
+
+    def __init__(
+        self,
+        executor,
+        seeds: list[AbstractSeed],
+        power_schedule: AbstractPowerSchedule = None,
+        grammar: AbstractGrammar = None,
+        min_mutations: int = 1,
+        max_mutations: int = 10,
+        max_seeds: int = 10,
+        corpus: CorpusStore = None,
+        adaptive_mutations: bool = False,
+        dictionary=None,
+    ):
+        super().__init__(executor, corpus)
+        self.grammar = grammar
+        self.seed_index = 0
+        self.executor = executor
+        self.power_schedule = power_schedule
+        self.min_mutations = min_mutations
+        self.max_mutations = max_mutations
+        # With a `dictionary` (True: the tokens of the grammar and the target's constants),
+        # dictionary tokens are inserted and overwritten too
+        self.dictionary = TokenDictionary.of(dictionary, grammar, executor.program_module)
+        # Operators of the shared engine, stacked in place on its buffer
+        self.havoc = HavocMutator(
+            multiple=self.multiple_characters, tokens=self.dictionary if self.dictionary is not None else ()
+        )
+        self.mutators = self.havoc.operators(
+            HavocMutator.CHARACTER_OPERATORS + HavocMutator.HAVOC_OPERATORS + HavocMutator.SPLICE_OPERATORS
+        )
+        if self.dictionary is not None:
+            self.mutators += self.havoc.operators(HavocMutator.TOKEN_OPERATORS)
+        self.max_seeds = max_seeds
+        # The statistics of the seeds are kept as columns, see `SeedTable`
+        self.seeds = SeedTable(seeds[:self.max_seeds])
+        if self.grammar:
+            # Weighted so that grammar mutations get `grammar_share` of the choices
+            others = len(self.mutators)
+            self.mutators.append(self._grammar_mutation)
+            self.mutator_weights = [1.0] * others + [others * self.grammar_share / (1 - self.grammar_share)]
+        # Same operators, applied to a whole batch at once by generate_batch
+        batch_operators = [
+            CharacterOperator(DELETE, multiple=self.multiple_characters),
+            CharacterOperator(REPLACE, multiple=self.multiple_characters),
+            CharacterOperator(INSERT, multiple=self.multiple_characters),
+        ]
+        if self.grammar:
+            batch_operators.append(lambda s: self.grammar.generate_input())
+        # With adaptive_mutations, mutators and stacking depths are chosen by their yield
+        if adaptive_mutations:
+            self.mutator_scheduler = MutatorScheduler(self.mutators, min_mutations, max_mutations)
+        self.batch_mutator = BatchMutator(batch_operators, min_mutations, max_mutations)
+        # Derivation tree of the last candidate (None once a character mutation was applied),
+        # the tree its last grammar mutation wrote (kept by later character mutations, for the
+        # grammar coverage), and the trees of the seeds, used as splicing donors
+        self.tree_mutator = TreeMutator(self.grammar) if self.grammar else None
+        self._candidate_tree = None
+        self._grammar_tree = None
+        self._candidate_input = None
+        self._donor_trees = [seed.tree for seed in self.seeds if seed.tree is not None]
+        for seed in self.seeds:
+            self.havoc.add_donor(seed.data)
+
+    def generate_input(self):
+        """Mutate the seed to generate input for fuzzing.
+        With this function we first use the gien seeds to generate inputs
+        and then we mutate the seeds to generate new inputs."""
+        if self.seed_index < len(self.seeds):
+            # Still seeding
+            seed = self.seeds[self.seed_index]
+            inp = seed.data
+            self._candidate_tree = self._grammar_tree = seed.tree
+            self._replayed = seed
+            self.seed_index += 1
+        else:
+            # Mutating
+            inp = self._create_candidate()
+
+        self._candidate_input = inp
+        return inp
+
+    def generate_batch(self, n):
+        """Generate `n` inputs: the remaining seeds first, then candidates mutated as one batch.
+        The candidates are mutated with the `BatchMutator`'s character operators and grammar
+        derivations only, not with the havoc, dictionary or derivation tree operators."""
+        inputs = []
+        origins = []
+        while len(inputs) < n and self.seed_index < len(self.seeds):
+            seed = self.seeds[self.seed_index]
+            inputs.append(seed.data)
+            origins.append((None, seed, seed.tree))
+            self.seed_index += 1
+        count = n - len(inputs)
+        if self.power_schedule:
+            parents = [self._timed("schedule", self.power_schedule.choose, self.seeds) for _ in range(count)]
+        else:
+            parents = [self.seeds[i] for i in np.random.randint(len(self.seeds), size=count)]
+        origins += [(parent, None, None) for parent in parents]
+        self._batch_origins = origins
+        return inputs + self.batch_mutator.mutate_batch([parent.data for parent in parents])
+
+    def _origin(self):
+        return self._parent, self._replayed, self._candidate_tree
+
+    def _restore_origin(self, input, origin):
+        self._parent, self._replayed, self._candidate_tree = origin if origin is not None else (None, None, None)
+        self._grammar_tree = self._candidate_tree
+        self._candidate_input = input
+
+    def _update(self, input):
+        """Update the fuzzer with the input and its coverage."""
+        if self.executions > 1:
+            if self.executor.novelty:
+                if len(self.seeds) < self.max_seeds:
+                    seed = self._new_seed(input)
+                    # Keep the derivation tree if the input is the candidate it was derived for
+                    if input is self._candidate_input:
+                        seed.tree = self._candidate_tree
+                        if seed.tree is not None:
+                            self._donor_trees.append(seed.tree)
+                    self.seeds.append(seed)
+                    self.havoc.add_donor(input)
+
+    def _create_candidate(self):
+        # Stacking: Apply multiple mutations to generate the candidate
+        if self.power_schedule:
+            seed = self._timed("schedule", self.power_schedule.choose, self.seeds)
+        else:
+            seed = self.seeds[np.random.randint(len(self.seeds))]
+        self._parent = seed
+        candidate = seed.data
+        self._candidate_tree = seed.tree
+        self._grammar_tree = None
+
+        buffer = self.havoc.load(candidate)
+        for _ in range(self._num_mutations()):
+            self._mutate_buffer(buffer)
+        return self.havoc.text(buffer)
+
+    def mutate(self, s):
+        """Return s with a random mutation applied"""
+        buffer = self.havoc.load(s)
+        self._mutate_buffer(buffer)
+        return self.havoc.text(buffer)
+
+    def _mutate_buffer(self, buffer):
+        """Apply a random mutation to the candidate in `buffer`, in place."""
+        mutator = self._choose_mutator()
+        if mutator != self._grammar_mutation:
+            # The candidate no longer matches its derivation tree
+            self._candidate_tree = None
+        self._apply_mutator(mutator, buffer)
+
+    def _grammar_mutation(self, buffer):
+        """Mutate the candidate's derivation tree (regenerate, splice or duplicate a subtree),
+        or derive a new input if the candidate has no tree, and write it into `buffer`."""
+        if self.grammar:
+            if self._candidate_tree is None:
+                self._candidate_tree = self.grammar.generate_tree()
+            else:
+                self._candidate_tree = self.tree_mutator.mutate(self._candidate_tree, self._donor_trees)
+            self._grammar_tree = self._candidate_tree
+            buffer[:] = self.havoc.encode(self.grammar.tree_to_string(self._candidate_tree))
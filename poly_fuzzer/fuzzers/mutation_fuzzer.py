@@ -1,7 +1,12 @@
 from poly_fuzzer.fuzzers.abstract_fuzzer import AbstractFuzzer
 import random
 import numpy as np
-from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.abstract_seed import AbstractSeed, SeedTable
+from poly_fuzzer.common.corpus_store import CorpusStore
+from poly_fuzzer.common.mutator_scheduler import MutatorScheduler
+from poly_fuzzer.common.havoc import HavocMutator
+from poly_fuzzer.common.token_dictionary import TokenDictionary
+from poly_fuzzer.common.batch_mutator import BatchMutator, CharacterOperator, DELETE, REPLACE
 from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
 
 
@@ -21,15 +26,34 @@ class MutationFuzzer(AbstractFuzzer):
         power_schedule: AbstractPowerSchedule = None,
         min_mutations: int = 1,
         max_mutations: int = 10,
+        corpus: CorpusStore = None,
+        adaptive_mutations: bool = False,
+        dictionary=None,
     ):
-        super().__init__(executor)
-        self.seeds = seeds
+        super().__init__(executor, corpus)
+        # The statistics of the seeds are kept as columns, see `SeedTable`
+        self.seeds = SeedTable(seeds)
         self.seed_index = 0
         self.executor = executor
         self.power_schedule = power_schedule
         self.min_mutations = min_mutations
         self.max_mutations = max_mutations
-        self.mutators = [self._delete_random_character, self._replace_random_character]
+        # Single-character deletions (of inputs longer than 5) and replacements, stacked in
+        # place on the shared engine's buffer
+        self.dictionary = TokenDictionary.of(dictionary, target=executor.program_module)
+        self.havoc = HavocMutator(min_delete_length=5, tokens=self.dictionary if self.dictionary is not None else ())
+        self.mutators = self.havoc.operators(("delete_characters", "replace_characters"))
+        # With a `dictionary` (True: the target's constants), tokens are inserted and overwritten too
+        if self.dictionary is not None:
+            self.mutators += self.havoc.operators(HavocMutator.TOKEN_OPERATORS)
+        # With adaptive_mutations, mutators and stacking depths are chosen by their yield
+        if adaptive_mutations:
+            self.mutator_scheduler = MutatorScheduler(self.mutators, min_mutations, max_mutations)
+        self.batch_mutator = BatchMutator(
+            [CharacterOperator(DELETE, min_length=5), CharacterOperator(REPLACE)],
+            min_mutations,
+            max_mutations,
+        )
 
     def generate_input(self):
 
@@ -38,7 +62,8 @@ class MutationFuzzer(AbstractFuzzer):
         and then we mutate the seeds to generate new inputs."""
         if self.seed_index < len(self.seeds):
             # Still seeding
-            inp = self.seeds[self.seed_index].data
+            self._replayed = self.seeds[self.seed_index]
+            inp = self._replayed.data
             self.seed_index += 1
         else:
             # Mutating
@@ -46,50 +71,49 @@ class MutationFuzzer(AbstractFuzzer):
 
         return inp
 
+    def generate_batch(self, n):
+        """Generate `n` inputs: the remaining seeds first, then candidates mutated as one batch.
+        The candidates are mutated with the `BatchMutator`'s character operators only, not
+        with the dictionary operators."""
+        inputs = []
+        origins = []
+        while len(inputs) < n and self.seed_index < len(self.seeds):
+            seed = self.seeds[self.seed_index]
+            inputs.append(seed.data)
+            origins.append((None, seed))
+            self.seed_index += 1
+        count = n - len(inputs)
+        if self.power_schedule:
+            parents = [self._timed("schedule", self.power_schedule.choose, self.seeds) for _ in range(count)]
+        else:
+            parents = [self.seeds[i] for i in np.random.randint(len(self.seeds), size=count)]
+        origins += [(parent, None) for parent in parents]
+        self._batch_origins = origins
+        return inputs + self.batch_mutator.mutate_batch([parent.data for parent in parents])
+
     def _update(self, input):
         """Update the fuzzer with the input and its coverage."""
-        if len(self.data["coverage"]) > 1:
-            if self.data["coverage"][-1] > self.data["coverage"][-2]:
-                self.seeds.append(AbstractSeed(input))
+        if self.executions > 1:
+            if self.executor.novelty:
+                self.seeds.append(self._new_seed(input))
 
     def _create_candidate(self):
-        seed = np.random.choice(self.seeds)
-
         # Stacking: Apply multiple mutations to generate the candidate
         if self.power_schedule:
-            candidate = self.power_schedule.choose(self.seeds).data
+            seed = self._timed("schedule", self.power_schedule.choose, self.seeds)
         else:
-            candidate = seed.data
+            seed = self.seeds[np.random.randint(len(self.seeds))]
+        self._parent = seed
+        candidate = seed.data
         # Apply power schedule to generate the candidate
         #
-        trials = random.randint(self.min_mutations, self.max_mutations)
-        for i in range(trials):
-            candidate = self.mutate(candidate)
-        return candidate
+        buffer = self.havoc.load(candidate)
+        for _ in range(self._num_mutations()):
+            self._apply_mutator(self._choose_mutator(), buffer)
+        return self.havoc.text(buffer)
 
     def mutate(self, s):
         """Return s with a random mutation applied"""
-        mutator = random.choice(self.mutators)
-        return mutator(s)
-
-    def _delete_random_character(self, s):
-        """Returns s with a random character deleted"""
-        if len(s) > 5:
-            pos = random.randint(0, len(s) - 1)
-            return s[:pos] + s[pos + 1 :]
-        else:
-            return s
-
-    def _insert_random_character(self, s):
-        """Returns s with a random character inserted"""
-        pos = random.randint(0, len(s))
-        random_character = chr(random.randrange(32, 127))
-        return s[:pos] + random_character + s[pos:]
-
-    def _replace_random_character(self, s):
-        """Returns s with a random character replaced"""
-        if s == "":
-            return ""
-        pos = random.randint(0, len(s) - 1)
-        random_character = chr(random.randrange(32, 127))
-        return s[:pos] + random_character + s[pos + 1 :]
+        buffer = self.havoc.load(s)
+        self._apply_mutator(self._choose_mutator(), buffer)
+        return self.havoc.text(buffer)
@@ -0,0 +1,227 @@
+import heapq
+import multiprocessing
+import os
+import queue
+import random
+import shutil
+import tempfile
+import time
+import traceback
+
+import numpy as np
+
+from poly_fuzzer.common.corpus_store import input_digest
+from poly_fuzzer.common.crash_triage import merge_summaries
+from poly_fuzzer.common.result_sink import NpyChunkSink
+from poly_fuzzer.fuzzers.abstract_fuzzer import AbstractFuzzer
+
+
+class ParallelRunner:
+    """
+    # The `ParallelRunner` class runs one campaign on several cores.
+    Every worker process builds its own fuzzer (and executor) with `make_fuzzer()` and seeds
+    `random` and `np.random` with `seed + worker_id`. Inputs that increase a worker's coverage
+    are written to its directory in a shared corpus; every `sync_interval` inputs, each worker
+    executes the inputs the other workers found since the last sync and keeps the ones that are
+    new to it. `run` returns one merged data dict in the format of `AbstractFuzzer.run_fuzzer`.
+    With the `fork` start method `make_fuzzer` can be any callable; otherwise it must be picklable.
+    A worker that raises, or dies without reporting, does not stop the others: its error is
+    returned under "errors" (worker id -> message) and the inputs it ran before are kept.
+    """
+
+    # Seconds between checks that the workers that have not reported are still alive
+    poll_interval = 1.0
+
+    def __init__(
+        self,
+        make_fuzzer,
+        workers: int = None,
+        sync_interval: int = 100,
+        corpus_dir: str = None,
+        seed: int = 0,
+    ):
+        self.make_fuzzer = make_fuzzer
+        self.workers = workers or os.cpu_count() or 1
+        self.sync_interval = sync_interval
+        self.corpus_dir = corpus_dir
+        self.seed = seed
+
+    def run(self, budget=10, batch_size: int = 1, sink_dir: str = None) -> dict:
+        """Run every worker within `budget` (a number of inputs or a `Budget`) and merge the
+        results. `batch_size` is passed to the workers' `iter_fuzzer`. With `sink_dir`, every
+        worker writes its executions to an `NpyChunkSink` in `sink_dir/worker-<id>`."""
+        corpus_dir = self.corpus_dir or tempfile.mkdtemp(prefix="poly_fuzzer_corpus_")
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        results = context.Queue()
+        processes = [
+            context.Process(
+                target=_run_worker,
+                args=(self.make_fuzzer, worker_id, self.seed + worker_id, budget, batch_size,
+                      self.sync_interval, corpus_dir, sink_dir, results),
+            )
+            for worker_id in range(self.workers)
+        ]
+        try:
+            for process in processes:
+                process.start()
+            worker_results = self._collect(processes, results)
+            for process in processes:
+                process.join()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            if self.corpus_dir is None:
+                shutil.rmtree(corpus_dir, ignore_errors=True)
+
+        worker_results.sort(key=lambda result: result["worker_id"])
+        return self._merge(worker_results)
+
+    def _collect(self, processes, results) -> list[dict]:
+        """Wait for the result of every worker; a worker that exits without one gets an
+        error result."""
+        pending = set(range(len(processes)))
+        worker_results = []
+        while pending:
+            # Workers that were dead before the wait had put their result, if any, by then
+            dead = [worker_id for worker_id in pending if not processes[worker_id].is_alive()]
+            try:
+                result = results.get(timeout=self.poll_interval)
+            except queue.Empty:
+                for worker_id in dead:
+                    pending.discard(worker_id)
+                    error = f"Worker exited with code {processes[worker_id].exitcode} without a result"
+                    worker_results.append(_failed(worker_id, error))
+                continue
+            pending.discard(result["worker_id"])
+            worker_results.append(result)
+        return worker_results
+
+    @staticmethod
+    def _merge(worker_results: list[dict]) -> dict:
+        """Interleave the workers' inputs by time and recompute the cumulative coverage."""
+        errors = {result["worker_id"]: result["error"] for result in worker_results if result["error"]}
+        # Workers that failed before running any input have no data
+        worker_results = [result for result in worker_results if result["data"] is not None]
+        data = {
+            "coverage": [],
+            "run_coverage": [],
+            "inputs": [],
+            "execution_times": [],
+            "exceptions": sum(result["data"]["exceptions"] for result in worker_results),
+            "workers": len(worker_results),
+        }
+        for key in ("cache_hits", "cache_misses"):
+            if all(key in result["data"] for result in worker_results):
+                data[key] = sum(result["data"][key] for result in worker_results)
+        if all("crashes" in result["data"] for result in worker_results):
+            data["crashes"] = merge_summaries([result["data"]["crashes"] for result in worker_results])
+        global_coverage = set()
+        streams = [
+            ((timestamp, worker, index) for index, timestamp in enumerate(result["timestamps"]))
+            for worker, result in enumerate(worker_results)
+        ]
+        for _, worker, index in heapq.merge(*streams):
+            result = worker_results[worker]
+            global_coverage.update(result["new_coverage"].get(index, ()))
+            data["coverage"].append(len(global_coverage))
+            for key in ("run_coverage", "inputs", "execution_times"):
+                data[key].append(result["data"][key][index])
+        if errors:
+            data["errors"] = errors
+        return data
+
+
+def _run_worker(make_fuzzer, worker_id, seed, budget, batch_size, sync_interval, corpus_dir, sink_dir, results):
+    fuzzer = None
+    sink = None
+    timestamps = []
+    # Execution index -> locations it added to this worker's coverage
+    new_coverage = {}
+    error = None
+    try:
+        random.seed(seed)
+        np.random.seed(seed)
+        fuzzer: AbstractFuzzer = make_fuzzer()
+        executor = fuzzer.executor
+        own_dir = os.path.join(corpus_dir, f"worker-{worker_id}")
+        os.makedirs(own_dir, exist_ok=True)
+        if sink_dir is not None:
+            sink = NpyChunkSink(os.path.join(sink_dir, f"worker-{worker_id}"))
+        synced = set()
+
+        def observe(record):
+            # Index of the record in the worker's data, imported executions included
+            index = len(timestamps)
+            timestamps.append(time.monotonic())
+            if sink is not None:
+                sink.write(record)
+            if len(executor.new_coverage):
+                new_coverage[index] = [
+                    location.item() if isinstance(location, np.generic) else location
+                    for location in executor.new_coverage
+                ]
+
+        for generated, record in enumerate(fuzzer.iter_fuzzer(budget, batch_size, keep_data=True), 1):
+            observe(record)
+            if executor.novelty:
+                _export(own_dir, record.input, synced)
+            if generated % sync_interval == 0:
+                for imported in _import(fuzzer, corpus_dir, own_dir, synced):
+                    observe(imported)
+        if sink is not None:
+            sink.flush()
+        if executor.result_cache is not None:
+            fuzzer.data["cache_hits"] = executor.result_cache.hits
+            fuzzer.data["cache_misses"] = executor.result_cache.misses
+        if executor.triage is not None:
+            fuzzer.data["crashes"] = executor.triage.summary()
+    except Exception:
+        error = traceback.format_exc()
+
+    data = fuzzer.data if fuzzer is not None else None
+    if data is not None:
+        # The inputs run before an error, for which timestamps were taken
+        for key in ("inputs", "coverage", "run_coverage", "execution_times"):
+            del data[key][len(timestamps):]
+    results.put({
+        "worker_id": worker_id,
+        "data": data,
+        "timestamps": timestamps,
+        "new_coverage": new_coverage,
+        "error": error,
+    })
+
+
+def _failed(worker_id, error) -> dict:
+    return {"worker_id": worker_id, "data": None, "timestamps": [], "new_coverage": {}, "error": error}
+
+
+def _export(own_dir, input, synced):
+    name = input_digest(input)
+    synced.add(name)
+    path = os.path.join(own_dir, name)
+    with open(path + ".tmp", "w", encoding="utf-8", errors="surrogatepass") as f:
+        f.write(input)
+    os.replace(path + ".tmp", path)
+
+
+def _import(fuzzer, corpus_dir, own_dir, synced):
+    """Execute the inputs other workers found, within the fuzzer's budget, and yield their
+    records. They are recorded like the fuzzer's own inputs, so those new to this worker
+    become seeds."""
+    for worker_dir in os.scandir(corpus_dir):
+        if not worker_dir.is_dir() or worker_dir.path == own_dir:
+            continue
+        for entry in os.scandir(worker_dir.path):
+            if entry.name.endswith(".tmp") or entry.name in synced:
+                continue
+            if fuzzer.budget is not None and fuzzer.budget.exhausted(fuzzer.executions):
+                return
+            synced.add(entry.name)
+            with open(entry.path, encoding="utf-8", errors="surrogatepass") as f:
+                input = f.read()
+            # Not mutated from, nor replaying, one of the fuzzer's seeds
+            fuzzer._parent = fuzzer._replayed = None
+            yield fuzzer._record(input, *fuzzer.executor._execute_input(input))
@@ -1,5 +1,7 @@
 import abc
-from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.abstract_seed import AbstractSeed, SeedTable
+from poly_fuzzer.common.coverage_map import MAP_SIZE, feature_indices
+import numpy as np
 import random
 
 
@@ -9,15 +11,72 @@ class AbstractPowerSchedule:
     In your implementation consider assigninng more energy to
     seeds that are shorter, that execute faster, and yield coverage increases more often. Implement this in the
     _assign_energy method. The _normalized_energy method should then normalize the energy values to sum to 1.
+
+    Schedules that set `vectorized` also accept a `SeedTable` in `_assign_energy` and fill its
+    energy column with one NumPy expression (the default `_assign_energy` does too). `choose` on
+    a table then keeps the cumulative energies until the table's `version` changes, which it
+    does whenever a seed is appended or a column energies depend on is written, and samples
+    with a binary search. The energies are always those `_assign_energy` gives the current
+    seeds, and the Python overhead per choice does not depend on the number of seeds.
+
+    The fuzzers pass every execution to `observe`. `path_frequency[signature & (map_size - 1)]`
+    counts the executions that took each path (`AbstractExecutor.path_signature`, which
+    seeds keep in their `path` column), as AFLFast does. Schedules that set `uses_features`
+    also count in `feature_frequency` the executions that covered each location (see
+    `feature_indices`). Schedules whose energies change with these counts set
+    `refresh_interval`: the energies of a table are then also recomputed after that many
+    observations.
     """
 
-    def __init__(self) -> None:
+    vectorized = False
+    uses_features = False
+    refresh_interval = None
+
+    def __init__(self, map_size: int = MAP_SIZE) -> None:
         """Constructor"""
-        self.path_frequency: dict = {}
+        if map_size & (map_size - 1):
+            raise ValueError("map_size must be a power of two")
+        self.map_size = map_size
+        self.path_frequency = np.zeros(map_size, dtype=np.uint32)
+        self.feature_frequency = np.zeros(map_size, dtype=np.uint32) if self.uses_features else None
+        self.observations = 0
+        self.mean_coverage = 0.0
+        self.reset()
+
+    def reset(self):
+        """Forget the cached energies; the next `choose` recomputes them."""
+        # Cumulative energies of a `SeedTable`, and the table version they were computed for
+        self._table = None
+        self._table_version = None
+        self._table_observations = 0
+        self._cumulative = None
+
+    def observe(self, seed: AbstractSeed, path_signature: int, run_coverage):
+        """Count an execution that took the path `path_signature` and covered `run_coverage`;
+        `seed` is the seed its input was mutated from, or None."""
+        self.observations += 1
+        self.path_frequency[path_signature & (self.map_size - 1)] += 1
+        features = None
+        if self.uses_features:
+            features = feature_indices(run_coverage, self.map_size)
+            self.feature_frequency[features] += 1
+        self._observe(seed, features)
+
+    def _observe(self, seed: AbstractSeed, features: np.ndarray):
+        """Update the schedule's own statistics after `observe`; `features` is None unless
+        `uses_features`."""
+        pass
+
+    def seed_path_frequency(self, table: SeedTable) -> np.ndarray:
+        """Number of executions that took the path of every seed of `table`."""
+        return self.path_frequency[table.path & (self.map_size - 1)]
 
     @abc.abstractmethod
     def _assign_energy(self, seeds: list[AbstractSeed]) -> list[AbstractSeed]:
         """Assigns each seed the same energy"""
+        if isinstance(seeds, SeedTable):
+            seeds.energy[:] = 1
+            return seeds
         for seed in seeds:
             seed.energy = 1
         return seeds
@@ -30,9 +89,32 @@ class AbstractPowerSchedule:
         norm_energy = [nrg / sum_energy for nrg in energy]
         return norm_energy
 
+    def _is_vectorized(self) -> bool:
+        # The default `_assign_energy` handles tables
+        return self.vectorized or type(self)._assign_energy is AbstractPowerSchedule._assign_energy
+
     def choose(self, seeds: list[AbstractSeed]) -> AbstractSeed:
         """Choose weighted by normalized energy."""
+        if isinstance(seeds, SeedTable) and self._is_vectorized():
+            return self._choose_from_table(seeds)
         seeds = self._assign_energy(seeds)
         norm_energy = self._normalized_energy(seeds)
         seed = random.choices(seeds, weights=norm_energy)[0]
         return seed
+
+    def _choose_from_table(self, table: SeedTable) -> AbstractSeed:
+        stale = (
+            self.refresh_interval is not None
+            and self.observations - self._table_observations >= self.refresh_interval
+        )
+        if stale or table is not self._table or table.version != self._table_version:
+            self._assign_energy(table)
+            self._cumulative = np.cumsum(table.energy)
+            self._table = table
+            self._table_version = table.version
+            self._table_observations = self.observations
+        cumulative = self._cumulative
+        total = cumulative[-1]
+        assert total > 0
+        index = int(np.searchsorted(cumulative, random.random() * total, side="right"))
+        return table[min(index, len(cumulative) - 1)]
@@ -0,0 +1,71 @@
+import numpy as np
+from poly_fuzzer.common.abstract_seed import AbstractSeed, SeedTable
+from poly_fuzzer.common.coverage_map import MAP_SIZE
+from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
+
+
+SCHEDULES = ("explore", "fast", "coe", "lin", "quad")
+
+
+class AFLFastPowerSchedule(AbstractPowerSchedule):
+    """
+    # The `AFLFastPowerSchedule` class implements the power schedules of AFLFast.
+    The energy of a seed is AFL's performance score (more for seeds faster and with more
+    coverage than average) times a factor of `s`, the number of times the seed was fuzzed,
+    and `f`, the number of executions that took the seed's path (`path_frequency`):
+    - "explore": 1
+    - "fast": 2^s / f
+    - "coe": 2^s if f is at most the mean f of the seeds, 0 otherwise
+    - "lin": (s + 1) / f
+    - "quad": (s + 1)^2 / f
+    The factor is capped at `max_factor`. AFL fuzzes a seed for a whole round of mutants at a
+    time, while the fuzzers here choose a seed per input, so `s` counts rounds of
+    `round_size` choices. Seeds on paths that many executions take get little energy, so the
+    campaign moves on to rare paths. Requires a `SeedTable`, which the fuzzers use.
+    """
+
+    vectorized = True
+    refresh_interval = 16
+
+    def __init__(
+        self,
+        schedule: str = "fast",
+        max_factor: float = 32.0,
+        round_size: int = 16,
+        map_size: int = MAP_SIZE,
+    ) -> None:
+        if schedule not in SCHEDULES:
+            raise ValueError(f"Unknown schedule: {schedule!r}")
+        super().__init__(map_size=map_size)
+        self.schedule = schedule
+        self.max_factor = max_factor
+        self.round_size = round_size
+
+    def _assign_energy(self, seeds: SeedTable) -> SeedTable:
+        if not isinstance(seeds, SeedTable):
+            raise TypeError("AFLFastPowerSchedule needs a SeedTable")
+        seeds.energy[:] = self._performance_score(seeds) * self._factor(seeds)
+        return seeds
+
+    def _performance_score(self, table: SeedTable) -> np.ndarray:
+        """AFL's score: 100, scaled by 0.1-3x for the speed and 0.25-3x for the coverage of
+        a seed relative to the mean."""
+        execution_time = table.execution_time.astype(np.float64)
+        speed = execution_time.mean() / np.maximum(execution_time, 1e-9)
+        coverage = table.coverage / max(table.coverage.mean(), 1.0)
+        return 100 * np.clip(speed, 0.1, 3.0) * np.clip(coverage, 0.25, 3.0)
+
+    def _factor(self, table: SeedTable) -> np.ndarray:
+        fuzzed = table.chosen // self.round_size
+        frequency = np.maximum(self.seed_path_frequency(table), 1).astype(np.float64)
+        if self.schedule == "explore":
+            return np.ones(len(table))
+        if self.schedule == "fast":
+            factor = np.exp2(np.minimum(fuzzed, 62)) / frequency
+        elif self.schedule == "coe":
+            factor = np.where(frequency <= frequency.mean(), np.exp2(np.minimum(fuzzed, 62)), 0.0)
+        else:
+            # Counting the current round, so that seeds never fuzzed get energy
+            rounds = fuzzed + 1.0
+            factor = (rounds if self.schedule == "lin" else rounds**2) / frequency
+        return np.minimum(factor, self.max_factor)
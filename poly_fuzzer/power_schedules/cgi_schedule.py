@@ -1,12 +1,20 @@
-from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.abstract_seed import AbstractSeed, SeedTable
 from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
 
 
 class CGIPowerSchedule(AbstractPowerSchedule):
     """CGI power schedule implementation. Assign more energy to seeds that execute faster and yield coverage increases more often."""
 
+    vectorized = True
+
     def _assign_energy(self, seeds: list[AbstractSeed]) -> list[AbstractSeed]:
+        if isinstance(seeds, SeedTable):
+            seeds.energy[:] = (seeds.coverage + 1) / (seeds.length + 1)
+            return seeds
         for seed in seeds:
-            # Assign based on coverage and length (shorter is better)
-            seed.energy = (seed.coverage + 1) / (len(seed.data) + 1)  # +1 to avoid division by zero
+            seed.energy = self._seed_energy(seed)
         return seeds
+
+    def _seed_energy(self, seed: AbstractSeed) -> float:
+        # Assign based on coverage and length (shorter is better)
+        return (seed.coverage + 1) / (len(seed.data) + 1)  # +1 to avoid division by zero
@@ -0,0 +1,109 @@
+import math
+
+import numpy as np
+from poly_fuzzer.common.abstract_seed import AbstractSeed, SeedTable
+from poly_fuzzer.common.coverage_map import MAP_SIZE
+from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
+
+
+class EntropicPowerSchedule(AbstractPowerSchedule):
+    """
+    # The `EntropicPowerSchedule` class implements libFuzzer's Entropic power schedule.
+    A feature (covered location) is rare while fewer than `rare_threshold` executions covered
+    it. Every seed counts how often the mutants made from it covered each rare feature, and
+    its energy is the entropy of these counts, estimated with one extra species for the
+    mutants (`chosen + 1`) and a count of one for every rare feature its mutants never
+    covered. A seed whose mutants keep finding rare features has high entropy; a seed whose
+    mutants all do the same thing has none. When a feature stops being rare, it is dropped
+    from the counts of every seed. Seeds chosen more than `max_mutation_factor` times the
+    mean get no energy, as in libFuzzer. Requires a `SeedTable`, which the fuzzers use.
+    """
+
+    vectorized = True
+    uses_features = True
+    refresh_interval = 16
+
+    def __init__(
+        self,
+        rare_threshold: int = 255,
+        max_mutation_factor: float = 20.0,
+        map_size: int = MAP_SIZE,
+    ) -> None:
+        self.rare_threshold = rare_threshold
+        self.max_mutation_factor = max_mutation_factor
+        super().__init__(map_size=map_size)
+        # Number of rare features
+        self.rare_features = 0
+        # Per table row: {rare feature: count} (None until a mutant is observed), the number
+        # of these features and the sums of `count + 1` and `(count + 1) * log(count + 1)`
+        self._local = []
+        self._seen = np.zeros(64, dtype=np.int64)
+        self._incidence = np.zeros(64)
+        self._incidence_entropy = np.zeros(64)
+        # Rare feature -> rows that counted it
+        self._holders = {}
+
+    def _observe(self, seed: AbstractSeed, features: np.ndarray):
+        frequency = self.feature_frequency[features]
+        self.rare_features += np.count_nonzero(frequency == 1)
+        for feature in features[frequency == self.rare_threshold].tolist():
+            self.rare_features -= 1
+            self._forget(feature)
+        if seed is None or seed._table is None:
+            return
+        row = seed._index
+        self._grow(row)
+        local = self._local[row]
+        if local is None:
+            local = self._local[row] = {}
+        for feature in features[frequency < self.rare_threshold].tolist():
+            count = local.get(feature, 0)
+            local[feature] = count + 1
+            if not count:
+                # The feature counted as 1 among the unseen ones; it now counts 2
+                self._holders.setdefault(feature, set()).add(row)
+                self._seen[row] += 1
+                self._incidence[row] += 1
+            self._incidence[row] += 1
+            self._incidence_entropy[row] += _plogp(count + 2) - _plogp(count + 1)
+
+    def _forget(self, feature: int):
+        """Drop `feature`, which is no longer rare, from the counts of every seed."""
+        for row in self._holders.pop(feature, ()):
+            count = self._local[row].pop(feature)
+            self._seen[row] -= 1
+            self._incidence[row] -= count + 1
+            self._incidence_entropy[row] -= _plogp(count + 1)
+
+    def _grow(self, row: int):
+        if row >= len(self._local):
+            self._local.extend([None] * (row + 1 - len(self._local)))
+        size = len(self._seen)
+        if row < size:
+            return
+        while size <= row:
+            size *= 2
+        for name in ("_seen", "_incidence", "_incidence_entropy"):
+            column = getattr(self, name)
+            grown = np.zeros(size, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def _assign_energy(self, seeds: SeedTable) -> SeedTable:
+        if not isinstance(seeds, SeedTable):
+            raise TypeError("EntropicPowerSchedule needs a SeedTable")
+        n = len(seeds)
+        self._grow(n - 1)
+        mutants = seeds.chosen + 1.0
+        incidence = self._incidence[:n] + (self.rare_features - self._seen[:n]) + mutants
+        entropy = self._incidence_entropy[:n] + mutants * np.log(mutants)
+        energy = np.log(incidence) - entropy / incidence
+        energy[seeds.chosen > self.max_mutation_factor * max(seeds.chosen.mean(), 1.0)] = 0
+        # Without rare features the entropies are 0, up to rounding; choose uniformly then
+        energy[energy < 1e-9] = 0
+        seeds.energy[:] = energy if energy.any() else 1.0
+        return seeds
+
+
+def _plogp(x: float) -> float:
+    return x * math.log(x)
@@ -1,15 +1,24 @@
-from poly_fuzzer.common.abstract_seed import AbstractSeed
+import numpy as np
+from poly_fuzzer.common.abstract_seed import AbstractSeed, SeedTable
 from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
-import random
 
 
 class HTMLParserPowerSchedule(AbstractPowerSchedule):
     """HTML parser power schedule implementation. Assign more energy to seeds that execute faster and yield coverage increases more often."""
 
+    vectorized = True
+
     def _assign_energy(self, seeds: list[AbstractSeed]) -> list[AbstractSeed]:
-        mean_coverage = sum(seed.coverage for seed in seeds) / len(seeds) if seeds else 0
+        if isinstance(seeds, SeedTable):
+            coverage = seeds.coverage
+            self.mean_coverage = coverage.mean() if len(seeds) else 0
+            seeds.energy[:] = (np.maximum(coverage - self.mean_coverage, 0) * 1000 + 1) / (seeds.length + 1)
+            return seeds
+        self.mean_coverage = sum(seed.coverage for seed in seeds) / len(seeds) if seeds else 0
         for seed in seeds:
-            # Assign based on coverage and length (shorter is better)
-            seed.energy = (max(seed.coverage - mean_coverage, 0)*1000 + 1) / (len(seed.data) + 1)  # +1 to avoid division by zero
-
+            seed.energy = self._seed_energy(seed)
         return seeds
+
+    def _seed_energy(self, seed: AbstractSeed) -> float:
+        # Assign based on coverage and length (shorter is better)
+        return (max(seed.coverage - self.mean_coverage, 0) * 1000 + 1) / (len(seed.data) + 1)  # +1 to avoid division by zero
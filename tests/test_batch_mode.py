@@ -0,0 +1,57 @@
+import random
+
+import numpy as np
+import pytest
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.batch_mutator import BatchMutator, CharacterOperator, DELETE, INSERT, REPLACE
+from poly_fuzzer.common.budget import Budget
+from poly_fuzzer.fuzzers.cgi_fuzzer import CGIFuzzer
+from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
+
+
+def test_batch_mutator_keeps_lone_surrogates():
+    mutator = BatchMutator([CharacterOperator(REPLACE)], min_mutations=1, max_mutations=1)
+    parents = ["a\udc95b", "\udcff", "plain"]
+    candidates = mutator.mutate_batch(parents)
+    assert len(candidates) == 3
+    assert all(len(candidate) == len(parent) for candidate, parent in zip(candidates, parents))
+    mutator = BatchMutator([CharacterOperator(DELETE), CharacterOperator(INSERT)])
+    assert len(mutator.mutate_batch(parents)) == 3
+
+
+def test_havoc_then_batch_mode():
+    seeds = [AbstractSeed("hello+world"), AbstractSeed("%\udc95GG"), AbstractSeed("a\udcffb")]
+    fuzzer = CGIFuzzer(AbstractExecutor(cgi_decode), seeds)
+    # Byte-level havoc mutations produce inputs that are not valid UTF-8
+    for _ in fuzzer.iter_fuzzer(Budget(executions=300)):
+        pass
+    for _ in fuzzer.iter_fuzzer(Budget(executions=200), batch_size=32, resume=True):
+        pass
+    assert fuzzer.executions == 500
+
+
+def test_batch_mode_updates_the_seeds():
+    random.seed(0)
+    np.random.seed(0)
+    seeds = [AbstractSeed("a"), AbstractSeed("%GG")]
+    fuzzer = CGIFuzzer(AbstractExecutor(cgi_decode), seeds, power_schedule=AbstractPowerSchedule())
+    novel_mutants = 0
+    for _ in fuzzer.iter_fuzzer(Budget(executions=300), batch_size=16):
+        if fuzzer._parent is not None and fuzzer.executor.novelty:
+            novel_mutants += 1
+    table = fuzzer.seeds
+    # Every mutant is credited to its parent, and replayed seeds got their coverage
+    assert table.chosen.sum() == 300 - fuzzer.seed_index
+    assert table.productive.sum() == novel_mutants > 0
+    assert all(table.coverage[:len(seeds)] > 0)
+
+
+def test_batch_mode_rejects_mutator_scheduler():
+    fuzzer = CGIFuzzer(AbstractExecutor(cgi_decode), [AbstractSeed("%3F")], adaptive_mutations=True)
+    with pytest.raises(ValueError):
+        fuzzer.run_fuzzer(budget=10, batch_size=4)
+    with pytest.raises(ValueError):
+        next(fuzzer.iter_fuzzer(10, batch_size=4))
@@ -0,0 +1,62 @@
+import pytest
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.budget import Budget
+from poly_fuzzer.fuzzers.cgi_fuzzer import CGIFuzzer
+
+
+def _make_fuzzer():
+    return CGIFuzzer(AbstractExecutor(cgi_decode), [AbstractSeed("hello+world"), AbstractSeed("%3F")])
+
+
+def test_needs_a_limit():
+    with pytest.raises(ValueError):
+        Budget()
+    assert Budget.of(7).executions == 7
+
+
+@pytest.mark.parametrize("batch_size", [1, 16])
+def test_executions_are_exact(batch_size):
+    fuzzer = _make_fuzzer()
+    data = fuzzer.run_fuzzer(Budget(executions=50), batch_size=batch_size)
+    assert fuzzer.executions == len(data["inputs"]) == 50
+
+
+def test_plateau_executions():
+    fuzzer = _make_fuzzer()
+    budget = Budget(executions=100000, plateau_executions=200)
+    fuzzer.run_fuzzer(budget)
+    # Stopped once 200 executions in a row found nothing new
+    assert fuzzer.executions < 100000
+    assert fuzzer.executions - budget.last_progress_execution == 200
+
+
+def test_plateau_counts_from_the_last_progress():
+    budget = Budget(plateau_executions=10)
+    assert not budget.exhausted(9)
+    budget.progress(5)
+    assert not budget.exhausted(14)
+    assert budget.exhausted(15)
+    assert budget.remaining(12) == 3
+
+
+def test_clock_is_read_every_check_interval():
+    budget = Budget(seconds=0, check_interval=10)
+    assert not any(budget.exhausted(executions) for executions in range(1, 10))
+    assert budget.exhausted(10)
+    budget = Budget(plateau_seconds=0, check_interval=4)
+    assert not budget.exhausted(3)
+    assert budget.exhausted(4)
+    assert budget.remaining(4) is None
+
+
+def test_resume_restarts_the_limits():
+    fuzzer = _make_fuzzer()
+    fuzzer.run_fuzzer(Budget(executions=30))
+    budget = Budget(executions=20, plateau_executions=1000)
+    data = fuzzer.run_fuzzer(budget, resume=True)
+    assert fuzzer.executions == len(data["inputs"]) == 50
+    assert budget.start_execution == 30
+    assert budget.remaining(40) == 10
@@ -0,0 +1,65 @@
+import random
+from urllib.parse import urlparse
+
+import numpy as np
+from cgi_decode import cgi_decode
+
+from benchmarks.targets import CGI_SEEDS, URL_SEEDS
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.fuzzers.campaign_scheduler import CampaignScheduler
+from poly_fuzzer.fuzzers.cgi_fuzzer import CGIFuzzer
+from poly_fuzzer.fuzzers.url_fuzzer import URLFuzzer
+
+
+def _make_scheduler(**kwargs):
+    random.seed(0)
+    np.random.seed(0)
+    campaigns = {
+        "cgi": CGIFuzzer(AbstractExecutor(cgi_decode), CGI_SEEDS),
+        "url": URLFuzzer(AbstractExecutor(urlparse), URL_SEEDS),
+    }
+    return CampaignScheduler(campaigns, slice_seconds=0.02, **kwargs)
+
+
+def test_report_adds_up():
+    scheduler = _make_scheduler(keep_data=True)
+    names = [scheduler.run_slice() for _ in range(8)]
+    # Every campaign gets a slice first
+    assert names[:2] == ["cgi", "url"]
+    report = scheduler.report()
+    campaigns = report["campaigns"]
+    assert report["slices"] == sum(campaign["slices"] for campaign in campaigns.values()) == 8
+    assert report["cpu_seconds"] == sum(campaign["cpu_seconds"] for campaign in campaigns.values())
+    for name, campaign in campaigns.items():
+        assert campaign["slices"] == names.count(name) >= 1
+        # The campaigns started without coverage
+        assert campaign["coverage"] == campaign["coverage_gain"] > 0
+        assert campaign["executions"] == len(campaign["data"]["inputs"]) > 0
+
+
+def test_resumed_slices_continue_the_data():
+    scheduler = _make_scheduler(keep_data=True)
+    for _ in range(6):
+        scheduler.run_slice()
+    for name, campaign in scheduler.report()["campaigns"].items():
+        data = campaign["data"]
+        fuzzer = scheduler.campaigns[name]
+        assert len(data["coverage"]) == len(data["run_coverage"]) == fuzzer.executions
+        # The cumulative coverage carries on across slices
+        assert data["coverage"] == sorted(data["coverage"])
+        assert data["coverage"][-1] == campaign["coverage"]
+
+
+def test_summaries_carry_on():
+    scheduler = _make_scheduler()
+    for _ in range(5):
+        scheduler.run_slice()
+    for name, campaign in scheduler.report()["campaigns"].items():
+        assert campaign["data"]["executions"] == campaign["executions"]
+        assert campaign["data"]["final_coverage"] == campaign["coverage"]
+
+
+def test_run():
+    report = _make_scheduler().run(0.1)
+    assert report["slices"] >= 2
+    assert all(campaign["slices"] >= 1 for campaign in report["campaigns"].values())
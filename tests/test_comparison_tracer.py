@@ -0,0 +1,89 @@
+import subprocess
+import sys
+
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.comparison_tracer import ComparisonTracer, comparison_sites
+
+
+def _compare_attribute(s, obj):
+    return s == obj.name
+
+
+def _compare_locals(a, b):
+    return a < b
+
+
+def _call_method(s):
+    return s.startswith("x") == s.endswith("y")
+
+
+def _compare_attributes(a, b):
+    return a.real == b.imag
+
+
+def _names(site):
+    kind, left, right = site
+    return kind, left[1:], right[1:]
+
+
+# The instructions differ between interpreters (3.11, 3.12, 3.13+), the sites do not
+
+
+def test_sites_of_variables_and_attributes():
+    assert [_names(site) for site in comparison_sites(_compare_attribute.__code__).values()] == [
+        ("==", ("s", ()), ("obj", ("name",)))
+    ]
+    assert [_names(site) for site in comparison_sites(_compare_locals.__code__).values()] == [
+        ("<", ("a", ()), ("b", ()))
+    ]
+    assert [_names(site) for site in comparison_sites(_compare_attributes.__code__).values()] == [
+        ("==", ("a", ("real",)), ("b", ("imag",)))
+    ]
+
+
+def test_computed_operands_are_not_tracked():
+    assert comparison_sites(_call_method.__code__) == {}
+
+
+def test_sites_of_cgi_decode():
+    kinds = {kind for kind, _, _ in comparison_sites(cgi_decode.__code__).values()}
+    assert {"==", "in", "[]"} <= kinds
+
+
+def _capture(tracer, input):
+    tracer.start()
+    try:
+        cgi_decode(input)
+    except Exception:
+        pass
+    finally:
+        tracer.stop()
+    return tracer.comparisons
+
+
+def test_capture_comparisons_on_cgi_decode():
+    tracer = ComparisonTracer(lambda code: code is cgi_decode.__code__)
+    comparisons = _capture(tracer, "%4")
+    assert ("==", "%", "%") in comparisons
+    assert ("==", "%", "+") in comparisons
+    # "%4" raises at s[i + 2], before its digits are looked up
+    comparisons = _capture(tracer, "%4G")
+    containers = {left: right for kind, left, right in comparisons if kind == "in"}
+    assert set(containers) == {"4", "G"}
+    assert containers["G"]["f"] == 15
+
+
+def test_first_capture_of_a_process():
+    # Opcode events are set up differently by every interpreter the first time
+    script = (
+        "from cgi_decode import cgi_decode\n"
+        "from poly_fuzzer.common.comparison_tracer import ComparisonTracer\n"
+        "tracer = ComparisonTracer(lambda code: code is cgi_decode.__code__)\n"
+        "tracer.start()\n"
+        "cgi_decode('a+%3F')\n"
+        "tracer.stop()\n"
+        "print(len(tracer.comparisons))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    assert int(output) > 0
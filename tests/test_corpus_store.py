@@ -0,0 +1,53 @@
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.corpus_store import CorpusStore, coverage_signature
+from poly_fuzzer.fuzzers.cgi_fuzzer import CGIFuzzer
+from poly_fuzzer.fuzzers.mutation_fuzzer import MutationFuzzer
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "corpus.db")
+    store = CorpusStore(path)
+    assert store.add("a+b", coverage=5, signature="s", execution_time=0.25)
+    assert store.add("%\udc95", coverage=2)
+    assert not store.add("a+b")
+    assert store.record_hit("a+b") and not store.record_hit("missing")
+    seed = AbstractSeed("a+b")
+    seed.energy = 1.5
+    store.update(seed)
+    store.close()
+
+    store = CorpusStore(path)
+    assert len(store) == 2 and "%\udc95" in store
+    assert [seed.data for seed in store.seeds()] == ["a+b", "%\udc95"]
+    metadata = store.metadata("a+b")
+    assert (metadata["coverage"], metadata["signature"], metadata["hits"], metadata["energy"]) == (5, "s", 3, 1.5)
+    assert [seed.data for seed in store.seeds(limit=1)] == ["a+b"]
+    store.close()
+
+
+def test_campaign_resumes_from_corpus(tmp_path):
+    path = str(tmp_path / "corpus.db")
+    store = CorpusStore(path)
+    fuzzer = CGIFuzzer(AbstractExecutor(cgi_decode), [AbstractSeed("hello+world"), AbstractSeed("%3F")], corpus=store)
+    data = fuzzer.run_fuzzer(budget=300)
+    store.close()
+
+    store = CorpusStore(path)
+    seeds = store.seeds()
+    # The corpus holds the inputs that found new coverage, with their coverage signatures
+    previous = [0] + data["coverage"][:-1]
+    novel = [input for input, before, after in zip(data["inputs"], previous, data["coverage"]) if after > before]
+    assert {seed.data for seed in seeds} == set(novel)
+    executor = AbstractExecutor(cgi_decode)
+    for seed in seeds:
+        _, _, coverage = executor._execute_input(seed.data)
+        assert store.metadata(seed.data)["signature"] == coverage_signature(coverage)
+        assert seed.coverage == len(coverage)
+    # Replaying the corpus covers what the first campaign covered
+    resumed = MutationFuzzer(AbstractExecutor(cgi_decode), seeds, corpus=store)
+    assert resumed.run_fuzzer(budget=len(seeds))["coverage"][-1] == data["coverage"][-1]
+    assert len(store) == len(seeds)
+    store.close()
@@ -0,0 +1,66 @@
+import sys
+
+import pytest
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.coverage_backend import (
+    MonitoringCoverageBackend,
+    SettraceCoverageBackend,
+    make_coverage_backend,
+)
+
+INPUTS = ["", "hello+world", "%3F", "a%20b+c", "%", "%GG", "%4"]
+
+
+def _is_target(code):
+    return code.co_filename == cgi_decode.__code__.co_filename
+
+
+def _line_coverage(backend, input):
+    backend.start()
+    try:
+        cgi_decode(input)
+    except Exception:
+        pass
+    finally:
+        backend.stop()
+    return backend.coverage
+
+
+def test_settrace_lines():
+    backend = SettraceCoverageBackend(_is_target)
+    coverage = _line_coverage(backend, "a+%3F")
+    first_line = cgi_decode.__code__.co_firstlineno
+    assert coverage and all(filename == cgi_decode.__code__.co_filename for filename, _ in coverage)
+    assert all(line > first_line for _, line in coverage)
+    # The "%" branch is only covered by inputs that contain one
+    assert coverage > _line_coverage(backend, "a+b")
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="sys.monitoring requires Python 3.12")
+def test_monitoring_matches_settrace():
+    settrace = SettraceCoverageBackend(_is_target)
+    monitoring = MonitoringCoverageBackend(_is_target)
+    for input in INPUTS:
+        assert _line_coverage(monitoring, input) == _line_coverage(settrace, input), input
+    # Lines disabled in one execution are reported again in the next one
+    assert _line_coverage(monitoring, INPUTS[1]) == _line_coverage(settrace, INPUTS[1])
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="sys.monitoring requires Python 3.12")
+def test_monitoring_matches_settrace_in_edge_mode():
+    executors = [
+        AbstractExecutor(cgi_decode, coverage_backend=backend(_is_target), coverage_mode="edge")
+        for backend in (SettraceCoverageBackend, MonitoringCoverageBackend)
+    ]
+    for input in INPUTS:
+        results = [executor._execute_input(input)[2].tolist() for executor in executors]
+        assert results[0] == results[1], input
+        assert executors[0].novelty == executors[1].novelty
+
+
+def test_default_backend():
+    backend = make_coverage_backend(_is_target)
+    expected = MonitoringCoverageBackend if sys.version_info >= (3, 12) else SettraceCoverageBackend
+    assert type(backend) is expected
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.coverage_map import EdgeCoverageMap, location_id
+
+
+def test_edge_map_novelty():
+    edge_map = EdgeCoverageMap(16)
+    edge_map.trace_bits[3] = 1
+    assert edge_map.has_new_bits(edge_map.classify()) == 2
+    assert edge_map.new_indices.tolist() == [3]
+    assert len(edge_map) == 1
+    # Same edge, same bucket
+    assert edge_map.has_new_bits(edge_map.classify()) == 0
+    # Same edge, new hit-count bucket
+    edge_map.trace_bits[3] = 2
+    assert edge_map.has_new_bits(edge_map.classify()) == 1
+    # 5 and 6 hits are in the same bucket (4-7)
+    edge_map.trace_bits[3] = 5
+    assert edge_map.has_new_bits(edge_map.classify()) == 1
+    edge_map.trace_bits[3] = 6
+    assert edge_map.has_new_bits(edge_map.classify()) == 0
+    edge_map.reset()
+    edge_map.trace_bits[9] = 1
+    assert edge_map.has_new_bits(edge_map.classify()) == 2
+    assert len(edge_map) == 2
+
+
+def test_location_ids_fit_the_map():
+    assert location_id("cgi_decode.py", 42, 16) == location_id("cgi_decode.py", 42, 1 << 16) % 16 < 16
+
+
+def test_edge_map_size():
+    with pytest.raises(ValueError):
+        EdgeCoverageMap(1000)
+
+
+def test_executor_edge_novelty():
+    executor = AbstractExecutor(cgi_decode, coverage_mode="edge")
+    executor._execute_input("a")
+    assert executor.novelty == 2
+    executor._execute_input("b")
+    assert executor.novelty == 0
+    # The loop runs twice: the same edges, some in a new hit-count bucket
+    executor._execute_input("ab")
+    assert executor.novelty == 1
+    assert np.array_equal(executor.run_coverage, np.flatnonzero(executor.coverage_map.classify()))
@@ -0,0 +1,132 @@
+import os
+
+import pytest
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.crash_triage import CrashTriage, merge_summaries
+
+
+def _outer(s):
+    return _middle(s)
+
+
+def _middle(s):
+    return _inner(s)
+
+
+def _inner(s):
+    if s == "type":
+        raise TypeError(s)
+    raise KeyError(s)
+
+
+def _raise(triage, input):
+    try:
+        _outer(input)
+    except Exception as e:
+        return triage.record(e, input)
+
+
+def _hang_or_abort(s):
+    if s == "hang":
+        while True:
+            pass
+    os.abort()
+
+
+def test_cgi_decode_buckets():
+    triage = CrashTriage()
+    executor = AbstractExecutor(cgi_decode, triage=triage)
+    for input in ["ab%", "%", "x%GGyz", "%GG", "%GGGG", "hello+world"]:
+        executor._execute_input(input)
+    buckets = {bucket["exception_type"]: bucket for bucket in triage.summary()}
+    assert set(buckets) == {"IndexError", "ValueError"}
+    assert buckets["IndexError"]["count"] == 2
+    assert buckets["IndexError"]["reproducer"] == "%"
+    assert buckets["ValueError"]["count"] == 3
+    assert buckets["ValueError"]["reproducer"] == "%GG"
+    # Only the target's frames, not the executor's
+    for bucket in buckets.values():
+        assert [function for _, function, _ in bucket["frames"]] == ["cgi_decode"]
+
+
+def test_new_bucket_is_novel():
+    executor = AbstractExecutor(cgi_decode, triage=CrashTriage())
+    executor._execute_input("%GG")
+    executor._execute_input("%")
+    assert executor.new_bucket and executor.novelty == 2
+    executor._execute_input("%")
+    assert not executor.new_bucket
+
+
+def test_frames_depth():
+    triage = CrashTriage(frames=2)
+    assert _raise(triage, "key")
+    (bucket,) = triage.summary()
+    # Innermost last
+    assert [function for _, function, _ in bucket["frames"]] == ["_middle", "_inner"]
+    # The same innermost frames, whatever the caller
+    try:
+        _middle("other")
+    except KeyError as e:
+        assert not triage.record(e, "other")
+    assert triage.summary()[0]["count"] == 2
+
+
+def test_max_buckets():
+    triage = CrashTriage(max_buckets=1)
+    assert _raise(triage, "key")
+    assert not _raise(triage, "type")
+    assert not _raise(triage, "type")
+    assert len(triage) == 1
+    assert triage.dropped == 2
+
+
+def test_save(tmp_path):
+    triage = CrashTriage()
+    _raise(triage, "key")
+    triage.save(str(tmp_path))
+    (bucket,) = triage.summary()
+    assert (tmp_path / f"KeyError-{bucket['bucket_id']}").read_text() == "key"
+    assert (tmp_path / "buckets.json").exists()
+
+
+def test_merge_summaries():
+    first, second = CrashTriage(), CrashTriage()
+    _raise(first, "long key")
+    _raise(first, "type")
+    _raise(second, "key")
+    _raise(second, "key")
+    merged = merge_summaries([first.summary(), second.summary()])
+    assert [bucket["exception_type"] for bucket in merged] == ["KeyError", "TypeError"]
+    assert merged[0]["count"] == 3
+    assert merged[0]["reproducer"] == "key"
+    assert merged[1]["count"] == 1
+
+
+def test_cache_hits_are_counted():
+    triage = CrashTriage()
+    executor = AbstractExecutor(cgi_decode, cache_size=10, triage=triage)
+    for input in ["%", "%", "%GG", "%"]:
+        executor._execute_input(input)
+    assert executor.result_cache.hits == 2
+    counts = {bucket["exception_type"]: bucket["count"] for bucket in triage.summary()}
+    assert counts == {"IndexError": 3, "ValueError": 1}
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_fork_server_timeout_and_crash_buckets():
+    from poly_fuzzer.common.forkserver_executor import ForkServerExecutor
+
+    triage = CrashTriage()
+    executor = ForkServerExecutor(_hang_or_abort, timeout=0.2, triage=triage)
+    try:
+        for input in ["hang", "abort", "hang"]:
+            executor._execute_input(input)
+    finally:
+        executor.close()
+    buckets = {bucket["exception_type"]: bucket for bucket in triage.summary()}
+    assert set(buckets) == {"Timeout", "Crash"}
+    assert buckets["Timeout"]["count"] == 2
+    assert buckets["Timeout"]["frames"] == buckets["Crash"]["frames"] == []
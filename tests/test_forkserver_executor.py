@@ -0,0 +1,76 @@
+import sys
+
+import pytest
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.forkserver_executor import (
+    STATUS_CRASH,
+    STATUS_EXCEPTION,
+    STATUS_OK,
+    STATUS_TIMEOUT,
+    ForkServerExecutor,
+    _code_objects,
+)
+
+
+def _target(s):
+    if s == "hang":
+        while True:
+            pass
+    if s == "exit":
+        sys.exit(3)
+    if s == "crash":
+        import os
+
+        os.abort()
+    return _helper(s)
+
+
+def _helper(s):
+    def letters(s):
+        return "".join(filter(str.isalpha, s))
+
+    return letters(s)
+
+
+_target.__module__ = "cgi_decode"
+
+
+@pytest.mark.parametrize("persistent", [1, 10])
+def test_statuses(persistent):
+    executor = ForkServerExecutor(_target, timeout=0.3, persistent=persistent)
+    try:
+        statuses = []
+        for input in ["ok", "hang", "ok", "exit", "crash", "ok", "x" * (1 << 20)] * 2:
+            exceptions, _, _ = executor._execute_input(input)
+            statuses.append((exceptions, executor.last_status))
+    finally:
+        executor.close()
+    expected = [
+        (0, STATUS_OK), (1, STATUS_TIMEOUT), (0, STATUS_OK), (1, STATUS_EXCEPTION),
+        (1, STATUS_CRASH), (0, STATUS_OK), (0, STATUS_OK),
+    ]
+    assert statuses == expected * 2
+
+
+@pytest.mark.parametrize("persistent", [1, 25])
+@pytest.mark.parametrize("coverage_mode", ["line", "edge"])
+def test_coverage_matches_in_process(persistent, coverage_mode):
+    inputs = ["a+b", "%41%42", "%", "%zz", "hello+world%21"] * 20
+    executor = ForkServerExecutor(cgi_decode, persistent=persistent, coverage_mode=coverage_mode)
+    reference = AbstractExecutor(cgi_decode, coverage_mode=coverage_mode)
+    try:
+        for input in inputs:
+            result = executor._execute_input(input)
+            expected = reference._execute_input(input)
+            assert result[0] == expected[0]
+            assert executor.path_signature == reference.path_signature
+    finally:
+        executor.close()
+    assert len(executor.global_coverage) == len(reference.global_coverage)
+
+
+def test_code_objects_include_the_module_and_nested_code():
+    names = {code.co_name for code in _code_objects(_helper)}
+    assert {"_helper", "letters", "test_statuses"} <= names
@@ -0,0 +1,69 @@
+import random
+from urllib.parse import urlparse
+
+import numpy as np
+import pytest
+
+from benchmarks.targets import URL_GRAMMAR, URL_SEEDS
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_grammar import AbstractGrammar
+from poly_fuzzer.fuzzers.url_fuzzer import URLFuzzer
+
+
+def _grammar():
+    # A grammar of its own: coverage is kept on the grammar
+    return AbstractGrammar(URL_GRAMMAR.gram)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_guided_generation_covers_every_expansion(seed):
+    random.seed(seed)
+    grammar = _grammar()
+    coverage = grammar.enable_coverage()
+    for _ in range(20):
+        grammar.generate_tree()
+    assert coverage.uncovered() == []
+    assert coverage.summary() == {"expansions": 45, "produced": 45, "productive": 0}
+
+
+def test_k_paths():
+    random.seed(0)
+    grammar = _grammar()
+    coverage = grammar.enable_coverage(k=2)
+    tree = grammar.generate_tree()
+    coverage.record(tree)
+    summary = coverage.summary()
+    assert summary["k"] == 2
+    assert 0 < summary["productive_paths"] == summary["produced_paths"]
+
+
+def test_record_marks_the_tree_productive():
+    grammar = _grammar()
+    coverage = grammar.enable_coverage(guide="productive")
+    tree = grammar.generate_tree()
+    coverage.record(tree)
+    assert coverage.productive == coverage.produced
+    assert len(coverage.uncovered()) == 45 - coverage.productive.bit_count()
+
+
+def test_unknown_guide():
+    with pytest.raises(ValueError):
+        _grammar().enable_coverage(guide="covered")
+
+
+def test_run_fuzzer_reports_grammar_coverage():
+    random.seed(0)
+    np.random.seed(0)
+    fuzzer = URLFuzzer(AbstractExecutor(urlparse), URL_SEEDS, grammar=_grammar())
+    fuzzer.enable_grammar_coverage(guide="productive")
+    data = fuzzer.run_fuzzer(budget=1000)
+    summary = data["grammar_coverage"]
+    assert summary["expansions"] == 45
+    # Inputs whose last grammar mutation was followed by character mutations count too
+    assert 0 < summary["productive"] <= summary["produced"]
+
+
+def test_needs_a_grammar():
+    fuzzer = URLFuzzer(AbstractExecutor(urlparse), URL_SEEDS)
+    with pytest.raises(ValueError):
+        fuzzer.enable_grammar_coverage()
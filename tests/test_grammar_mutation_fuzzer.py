@@ -0,0 +1,50 @@
+import random
+from collections import Counter
+
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_grammar import AbstractGrammar
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.havoc import HavocMutator
+from poly_fuzzer.fuzzers.cgi_fuzzer import CGIFuzzer
+from poly_fuzzer.fuzzers.url_fuzzer import URLFuzzer
+
+GRAMMAR = AbstractGrammar({
+    "<start>": ["<param>=<value>"],
+    "<param>": ["name", "id"],
+    "<value>": ["A", "B", "%20"],
+})
+
+
+def test_grammar_mutation_share():
+    fuzzer = URLFuzzer(AbstractExecutor(cgi_decode), [AbstractSeed("id=A")], grammar=GRAMMAR)
+    random.seed(1)
+    chosen = Counter(fuzzer._choose_mutator() for _ in range(20000))
+    assert abs(chosen[fuzzer._grammar_mutation] / 20000 - 0.25) < 0.02
+
+
+def test_fuzzers_share_the_engine():
+    cgi = CGIFuzzer(AbstractExecutor(cgi_decode), [AbstractSeed("id=A")], grammar=GRAMMAR)
+    url = URLFuzzer(AbstractExecutor(cgi_decode), [AbstractSeed("id=A")])
+    assert (cgi.havoc.multiple, url.havoc.multiple) == (False, True)
+    assert url.mutator_weights is None
+    assert cgi.run_fuzzer(budget=200)["coverage"][-1] > 0
+
+
+def test_character_operators_edit_in_one_pass():
+    havoc = HavocMutator(multiple=True)
+    random.seed(2)
+    for _ in range(500):
+        data = "".join(random.choice("ab%") for _ in range(random.randint(1, 30)))
+        buffer = havoc.load(data)
+        havoc.delete_characters(buffer)
+        deleted = havoc.text(buffer)
+        # What is left is a subsequence of the input
+        rest = iter(data)
+        assert len(deleted) < len(data) and all(c in rest for c in deleted)
+        buffer = havoc.load(data)
+        havoc.insert_characters(buffer)
+        inserted = havoc.text(buffer)
+        rest = iter(inserted)
+        assert len(inserted) > len(data) and all(c in rest for c in data)
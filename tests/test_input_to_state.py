@@ -0,0 +1,43 @@
+import random
+
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.input_to_state import InputToState
+from poly_fuzzer.common.token_dictionary import TokenDictionary
+
+
+def test_single_substitutions():
+    input_to_state = InputToState(AbstractExecutor(cgi_decode))
+    assert set(input_to_state.substitutions("aaaa", [("==", "a", "b")])) == {"baaa", "abaa", "aaba", "aaab"}
+    assert set(input_to_state.substitutions("x7", [("<", 7, 10)])) == {"x9", "x10", "x11"}
+    candidates = input_to_state.substitutions("%4G", [("in", "G", {"A": 10, "B": 11})])
+    assert set(candidates) == {"%4A", "%4B"}
+
+
+def test_analyze_cgi_decode():
+    random.seed(0)
+    dictionary = TokenDictionary()
+    input_to_state = InputToState(AbstractExecutor(cgi_decode), dictionary=dictionary)
+    candidates = input_to_state.analyze("%4G")
+    assert "+4G" in candidates
+    assert "%4F" in candidates
+    assert all(len(candidate) == 3 for candidate in candidates)
+    assert b"%" in dictionary.tokens
+
+
+def test_next_input_waits_for_a_stall():
+    input_to_state = InputToState(AbstractExecutor(cgi_decode), stall_executions=10)
+    seeds = [AbstractSeed("%4G")]
+    assert input_to_state.next_input(15, 10, seeds) is None
+    assert input_to_state.analyzed == 0
+    candidate = input_to_state.next_input(20, 10, seeds)
+    assert candidate is not None and candidate != "%4G"
+    assert input_to_state.analyzed == 1
+
+
+def test_capture_comparisons_leaves_the_coverage():
+    executor = AbstractExecutor(cgi_decode)
+    assert ("==", "%", "%") in executor.capture_comparisons("%4")
+    assert not executor.global_coverage
@@ -0,0 +1,55 @@
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed, SeedTable
+from poly_fuzzer.common.corpus_store import CorpusStore, coverage_signature
+from poly_fuzzer.common.minimizer import Minimizer
+
+SEEDS = ["hello", "a+b", "a+b+c", "%41", "%41%42", "%zz", "abc%41+x%zz", "plain text"]
+
+
+def _coverage(executor, inputs):
+    covered = set()
+    for input in inputs:
+        covered |= set(executor._execute_input(input)[2])
+    return covered
+
+
+def test_minimize_corpus_keeps_the_coverage():
+    minimizer = Minimizer(AbstractExecutor(cgi_decode))
+    seeds = [AbstractSeed(data) for data in SEEDS]
+    kept = minimizer.minimize_corpus(seeds)
+    assert len(kept) < len(seeds)
+    # A subset, in the original order
+    assert [seed.data for seed in kept] == [data for data in SEEDS if data in {seed.data for seed in kept}]
+    executor = AbstractExecutor(cgi_decode)
+    assert _coverage(executor, [seed.data for seed in kept]) == _coverage(executor, SEEDS)
+
+
+def test_minimize_input_keeps_the_signature():
+    executor = AbstractExecutor(cgi_decode)
+    minimizer = Minimizer(AbstractExecutor(cgi_decode))
+    for input in ("abc%41+xyz", "hello world %zz"):
+        minimized = minimizer.minimize_input(input)
+        assert len(minimized) < len(input)
+        expected = executor._execute_input(input)
+        expected_signature = coverage_signature(expected[2])
+        result = executor._execute_input(minimized)
+        assert coverage_signature(result[2]) == expected_signature
+        assert result[0] == expected[0]
+
+
+def test_corpus_round_trip(tmp_path):
+    store = CorpusStore(str(tmp_path / "corpus.db"))
+    for data in SEEDS:
+        store.add(data)
+    table = SeedTable(store.seeds())
+    minimized = Minimizer(AbstractExecutor(cgi_decode)).minimize(table, max_executions=200)
+    target = CorpusStore(str(tmp_path / "minimized.db"))
+    for seed in minimized:
+        target.add(seed.data, seed.coverage)
+    executor = AbstractExecutor(cgi_decode)
+    assert _coverage(executor, [seed.data for seed in target.seeds()]) == _coverage(executor, SEEDS)
+    assert sum(map(len, (seed.data for seed in target.seeds()))) < sum(map(len, SEEDS))
+    store.close()
+    target.close()
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from poly_fuzzer.common.mutator_scheduler import BanditArms, MutatorScheduler
+
+
+def _best(arms) -> int:
+    rates = arms.sample_rates()
+    return max(range(len(rates)), key=rates.__getitem__)
+
+
+def test_rewarded_arm_is_chosen_more_often():
+    random.seed(0)
+    arms = BanditArms(3, prior_uses=1.0)
+    for _ in range(20):
+        arms.add(0, 0.01, 3)
+        arms.add(1, 0.01, False)
+        arms.add(2, 0.01, False)
+    choices = [_best(arms) for _ in range(1000)]
+    assert choices.count(0) > 900
+    assert arms.rates()[0] == pytest.approx(300.0)
+    assert arms.rates()[1] == 0.0
+
+
+def test_untried_arms_are_tried():
+    random.seed(0)
+    arms = BanditArms(2, prior_uses=1.0)
+    arms.add(0, 0.01, False)
+    # The prior is optimistic: an arm without uses wins against one that found nothing
+    choices = [_best(arms) for _ in range(1000)]
+    assert choices.count(1) > 500
+
+
+def test_lazy_decay():
+    arms = BanditArms(2, prior_uses=1.0)
+    arms.add(0, 1.0, 4)
+    arms.decay(0.5)
+    # Decay only changes the common scale
+    assert arms.finds[0] == 4.0 and arms.scale == 0.5
+    arms.add(0, 1.0, 1)
+    assert arms.finds[0] * arms.scale == pytest.approx(4 * 0.5 + 1)
+    assert arms.costs[0] * arms.scale == pytest.approx(1 * 0.5 + 1)
+    assert arms.uses[0] * arms.scale == pytest.approx(1.5)
+    # The stored values are rescaled before the scale underflows
+    arms.decay(1e-101)
+    assert arms.scale == 1.0
+    assert arms.finds[0] == pytest.approx(3 * 1e-101)
+
+
+def test_old_statistics_shrink():
+    random.seed(0)
+    arms = BanditArms(2, prior_uses=1.0)
+    for _ in range(50):
+        arms.add(0, 0.01, 1)
+        arms.add(1, 0.01, False)
+    assert _best(arms) == 0
+    for _ in range(500):
+        arms.decay(0.98)
+        arms.add(0, 0.01, False)
+        arms.add(1, 0.01, 1)
+    choices = [_best(arms) for _ in range(1000)]
+    assert choices.count(1) > 900
+
+
+def test_scheduler_prefers_the_productive_mutator():
+    random.seed(0)
+
+    def productive(s):
+        return s
+
+    def useless(s):
+        return s
+
+    scheduler = MutatorScheduler([productive, useless], min_mutations=1, max_mutations=1)
+    chosen = []
+    for _ in range(600):
+        assert scheduler.begin_candidate() == 1
+        mutator = scheduler.choose()
+        chosen.append(mutator)
+        scheduler.record(mutator, 10_000)
+        scheduler.reward(mutator is productive, 1e-4)
+    assert chosen[-200:].count(productive) > 150
+    summary = scheduler.summary()
+    assert summary["mutators"]["productive"] > summary["mutators"]["useless"] == 0.0
+    assert list(summary["depths"]) == [1]
+
+
+def test_reward_without_candidate_is_ignored():
+    scheduler = MutatorScheduler([len], min_mutations=1, max_mutations=2)
+    scheduler.reward(True, 0.1)
+    assert scheduler.summary()["depths"] == {1: 0.0, 2: 0.0}
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.budget import Budget
+from poly_fuzzer.common.result_sink import load_results
+from poly_fuzzer.fuzzers.cgi_fuzzer import CGIFuzzer
+from poly_fuzzer.fuzzers.parallel_runner import ParallelRunner, _import
+
+
+def _make_fuzzer():
+    return CGIFuzzer(AbstractExecutor(cgi_decode), [AbstractSeed("hello+world"), AbstractSeed("%3F")])
+
+
+def _is_worker_1():
+    # Workers seed np.random with `seed + worker_id` before calling make_fuzzer
+    return np.random.get_state()[1][0] == 1
+
+
+def _make_fuzzer_raising_in_worker_1():
+    if _is_worker_1():
+        raise RuntimeError("broken target")
+    return _make_fuzzer()
+
+
+def _make_fuzzer_exiting_in_worker_1():
+    if _is_worker_1():
+        os._exit(3)
+    return _make_fuzzer()
+
+
+def test_worker_error_is_reported():
+    data = ParallelRunner(_make_fuzzer_raising_in_worker_1, workers=2, seed=0).run(budget=50)
+    assert list(data["errors"]) == [1]
+    assert "broken target" in data["errors"][1]
+    assert len(data["inputs"]) == len(data["coverage"]) == 50
+
+
+def test_dead_worker_is_reported():
+    runner = ParallelRunner(_make_fuzzer_exiting_in_worker_1, workers=2, seed=0)
+    runner.poll_interval = 0.1
+    data = runner.run(budget=50)
+    assert "code 3" in data["errors"][1]
+    assert len(data["inputs"]) == 50
+
+
+def test_budget_and_sink(tmp_path):
+    data = ParallelRunner(_make_fuzzer, workers=2, sync_interval=20).run(
+        budget=Budget(executions=40), sink_dir=str(tmp_path)
+    )
+    assert "errors" not in data
+    assert len(data["inputs"]) == 80
+    for worker_id in range(2):
+        results = load_results(str(tmp_path / f"worker-{worker_id}"))
+        assert len(results["inputs"]) == 40
+
+
+def test_imported_inputs_are_recorded(tmp_path):
+    fuzzer = _make_fuzzer()
+    # Two inputs into a run of ten, as in a worker's sync
+    records = fuzzer.iter_fuzzer(Budget(executions=10), keep_data=True)
+    next(records), next(records)
+    seeds = len(fuzzer.seeds)
+    other_dir = tmp_path / "worker-1"
+    other_dir.mkdir()
+    (other_dir / "input").write_text("%GG")
+    records = list(_import(fuzzer, str(tmp_path), str(tmp_path / "worker-0"), set()))
+    assert [record.input for record in records] == ["%GG"]
+    # Counted like the fuzzer's own executions, and kept as a timed seed
+    assert fuzzer.executions == 3
+    assert fuzzer.data["inputs"][-1] == "%GG"
+    assert len(fuzzer.seeds) == seeds + 1
+    assert fuzzer.seeds[seeds].data == "%GG"
+    assert fuzzer.seeds[seeds].execution_time == records[0].execution_time > 0
+
+
+def test_imports_stop_at_the_budget(tmp_path):
+    fuzzer = _make_fuzzer()
+    fuzzer.run_fuzzer(budget=Budget(executions=2))
+    other_dir = tmp_path / "worker-1"
+    other_dir.mkdir()
+    (other_dir / "input").write_text("%GG")
+    assert list(_import(fuzzer, str(tmp_path), str(tmp_path / "worker-0"), set())) == []
+    assert fuzzer.executions == 2
@@ -0,0 +1,115 @@
+import os
+import random
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed, SeedTable
+from poly_fuzzer.common.coverage_map import feature_indices
+from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
+from poly_fuzzer.power_schedules.cgi_schedule import CGIPowerSchedule
+from poly_fuzzer.power_schedules.html_parser_schedule import HTMLParserPowerSchedule
+from poly_fuzzer.power_schedules.url_schedule import URLPowerSchedule
+
+SIGNATURES = """
+from cgi_decode import cgi_decode
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.coverage_map import feature_indices
+for mode in ("line", "edge"):
+    executor = AbstractExecutor(cgi_decode, coverage_mode=mode)
+    executor._execute_input("a+b%41")
+    print(executor.path_signature, feature_indices(executor.run_coverage).tolist())
+"""
+
+
+def _signatures(hash_seed):
+    environment = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment["PYTHONPATH"] = os.pathsep.join(filter(None, [root, environment.get("PYTHONPATH")]))
+    return subprocess.run(
+        [sys.executable, "-c", SIGNATURES], env=environment, capture_output=True, text=True, check=True
+    ).stdout
+
+
+def test_path_signatures_are_the_same_in_every_process():
+    assert _signatures(1) == _signatures(2)
+
+
+def test_path_signature_identifies_the_path():
+    executor = AbstractExecutor(cgi_decode)
+    signatures = []
+    for input in ("abc", "xyz", "a+b", "abc"):
+        executor._execute_input(input)
+        signatures.append(executor.path_signature)
+        assert len(feature_indices(executor.run_coverage)) > 0
+    assert signatures[0] == signatures[1] == signatures[3] != signatures[2]
+
+
+def _cgi_energies(seeds):
+    return [(seed.coverage + 1) / (len(seed.data) + 1) for seed in seeds]
+
+
+def _mean_coverage_energies(seeds):
+    mean_coverage = sum(seed.coverage for seed in seeds) / len(seeds)
+    return [(max(seed.coverage - mean_coverage, 0) * 1000 + 1) / (len(seed.data) + 1) for seed in seeds]
+
+
+def _seeds(count):
+    seeds = []
+    for i in range(count):
+        seed = AbstractSeed("x" * random.randint(0, 30))
+        seed.coverage = random.randint(0, 50)
+        seeds.append(seed)
+    return seeds
+
+
+@pytest.mark.parametrize(
+    "schedule, energies",
+    [
+        (CGIPowerSchedule, _cgi_energies),
+        (URLPowerSchedule, _mean_coverage_energies),
+        (HTMLParserPowerSchedule, _mean_coverage_energies),
+    ],
+)
+def test_energies_match_the_formulas(schedule, energies):
+    random.seed(3)
+    schedule = schedule()
+    seeds = _seeds(20)
+    table = SeedTable(seeds)
+    copies = []
+    for step in range(30):
+        # Small changes of the population, which move the mean coverage a little
+        if step % 3 == 0:
+            table.append(_seeds(1)[0])
+        else:
+            table[random.randrange(len(table))].coverage += 1
+        schedule.choose(table)
+        assert np.allclose(table.energy, energies(table))
+        assert np.allclose(schedule._cumulative, np.cumsum(energies(table)))
+        # A plain list of seeds, changed in the same way, gets the same energies
+        copies += [AbstractSeed(seed.data) for seed in table[len(copies):]]
+        for copy, seed in zip(copies, table):
+            copy.coverage = seed.coverage
+        schedule.choose(copies)
+        assert np.allclose([copy.energy for copy in copies], energies(table))
+
+
+def test_choices_follow_the_energies():
+    random.seed(4)
+    table = SeedTable(_seeds(5))
+    schedule = CGIPowerSchedule()
+    chosen = np.bincount([schedule.choose(table).key[1] for _ in range(20000)], minlength=5)
+    expected = np.array(_cgi_energies(table))
+    assert np.allclose(chosen / 20000, expected / expected.sum(), atol=0.02)
+
+
+def test_default_schedule_is_uniform_on_tables():
+    random.seed(5)
+    table = SeedTable(_seeds(4))
+    chosen = np.bincount([AbstractPowerSchedule().choose(table).key[1] for _ in range(8000)], minlength=4)
+    assert np.allclose(chosen / 8000, 0.25, atol=0.03)
+    assert list(table.energy) == [1, 1, 1, 1]
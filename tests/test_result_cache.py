@@ -0,0 +1,65 @@
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.result_cache import ResultCache
+from poly_fuzzer.fuzzers.cgi_fuzzer import CGIFuzzer
+
+
+def test_hit_restores_the_results():
+    executor = AbstractExecutor(cgi_decode, cache_size=10)
+    first = executor._execute_input("a+%3F")
+    coverage, path = set(executor.run_coverage), executor.path_signature
+    assert executor.novelty == 2
+    executor._execute_input("%GG")
+    assert executor.path_signature != path
+    second = executor._execute_input("a+%3F")
+    assert second[:2] == first[:2]
+    assert executor.run_coverage == coverage
+    assert executor.path_signature == path
+    assert executor.novelty == 0
+    assert not executor.new_coverage
+    assert (executor.result_cache.hits, executor.result_cache.misses) == (1, 2)
+
+
+def test_edge_mode_hit():
+    executor = AbstractExecutor(cgi_decode, coverage_mode="edge", cache_size=10)
+    executor._execute_input("a+%3F")
+    coverage, path = executor.run_coverage.copy(), executor.path_signature
+    executor._execute_input("%GG")
+    executor._execute_input("a+%3F")
+    assert list(executor.run_coverage) == list(coverage)
+    assert executor.path_signature == path
+    assert executor.novelty == 0
+    assert len(executor.new_coverage) == 0
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_size=2)
+    cache.put("a", (0,))
+    cache.put("b", (1,))
+    # "a" becomes the most recently used, so "b" is evicted
+    assert cache.get("a") == (0,)
+    cache.put("c", (2,))
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == (0,) and cache.get("c") == (2,)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_executor_evicts_at_cache_size():
+    executor = AbstractExecutor(cgi_decode, cache_size=2)
+    for input in ["a", "b", "c", "a"]:
+        executor._execute_input(input)
+    assert len(executor.result_cache) == 2
+    assert (executor.result_cache.hits, executor.result_cache.misses) == (0, 4)
+
+
+def test_run_data_counts():
+    executor = AbstractExecutor(cgi_decode, cache_size=100)
+    fuzzer = CGIFuzzer(executor, [AbstractSeed("%3F"), AbstractSeed("%3F")])
+    data = fuzzer.run_fuzzer(budget=50)
+    # The second seed is the first one again
+    assert data["cache_hits"] >= 1
+    assert data["cache_hits"] + data["cache_misses"] == 50
+    assert (data["cache_hits"], data["cache_misses"]) == (executor.result_cache.hits, executor.result_cache.misses)
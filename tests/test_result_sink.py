@@ -0,0 +1,48 @@
+import pytest
+
+from poly_fuzzer.common.result_sink import NpyChunkSink, RunRecord, load_results
+
+
+def _records(start, count):
+    return [RunRecord(f"input {i} \udc95", i % 2, 0.5, i, start + i) for i in range(start, start + count)]
+
+
+def test_round_trip(tmp_path):
+    with NpyChunkSink(str(tmp_path), chunk_size=3) as sink:
+        for record in _records(0, 7):
+            sink.write(record)
+    data = load_results(str(tmp_path))
+    assert data["inputs"] == [record.input for record in _records(0, 7)]
+    assert data["run_coverage"].tolist() == list(range(7))
+    assert data["exceptions"].sum() == 3
+
+
+def test_interrupted_flush_is_skipped(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+    sink = NpyChunkSink(directory, chunk_size=4)
+    for record in _records(0, 4):
+        sink.write(record)
+    save = NpyChunkSink._save
+
+    def interrupted_save(self, name, array):
+        if name.startswith("execution_times"):
+            raise KeyboardInterrupt
+        save(self, name, array)
+
+    monkeypatch.setattr(NpyChunkSink, "_save", interrupted_save)
+    for record in _records(4, 3):
+        sink.write(record)
+    with pytest.raises(KeyboardInterrupt):
+        sink.flush()
+    monkeypatch.undo()
+    # Only the complete chunk is read
+    data = load_results(directory)
+    assert data["run_coverage"].tolist() == [0, 1, 2, 3]
+    assert len(data["inputs"]) == 4
+    # A new sink on the directory overwrites the partial chunk
+    with NpyChunkSink(directory) as sink:
+        for record in _records(4, 2):
+            sink.write(record)
+    data = load_results(directory)
+    assert data["run_coverage"].tolist() == [0, 1, 2, 3, 4, 5]
+    assert data["coverage"].tolist() == [0, 1, 2, 3, 8, 9]
@@ -0,0 +1,47 @@
+from cgi_decode import cgi_decode
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed, SeedTable
+from poly_fuzzer.fuzzers.cgi_fuzzer import CGIFuzzer
+from poly_fuzzer.fuzzers.mutation_fuzzer import MutationFuzzer
+
+
+def test_round_trip():
+    seed = AbstractSeed("hello")
+    seed.coverage = 7
+    seed.execution_time = 0.5
+    seed.tree = [0, ["hello"]]
+    table = SeedTable([seed, AbstractSeed("ab")])
+    view = table[0]
+    assert (view.data, view.coverage, view.execution_time, view.tree) == ("hello", 7, 0.5, [0, ["hello"]])
+    assert list(table.length) == [5, 2]
+    assert [s.data for s in table] == ["hello", "ab"]
+    view.chosen += 2
+    assert table.chosen[0] == 2
+
+
+def test_append_copies_the_seed():
+    seed = AbstractSeed("abc")
+    table = SeedTable()
+    view = table.append(seed)
+    view.coverage = 3
+    assert seed._table is None
+    assert (seed.data, seed.coverage) == ("abc", 0)
+    # A view of another table is copied too, with its statistics
+    other = SeedTable([view])
+    assert (other[0].data, other[0].coverage, other.length[0]) == ("abc", 3, 3)
+    other[0].coverage = 9
+    assert view.coverage == 3
+
+
+def test_seed_list_shared_by_two_fuzzers():
+    seeds = [AbstractSeed("hello+world"), AbstractSeed("%3F"), AbstractSeed("%GG")]
+    first = CGIFuzzer(AbstractExecutor(cgi_decode), seeds)
+    first.run_fuzzer(budget=50)
+    second = MutationFuzzer(AbstractExecutor(cgi_decode), seeds)
+    second.run_fuzzer(budget=50)
+    third = CGIFuzzer(AbstractExecutor(cgi_decode), first.seeds)
+    assert [seed.data for seed in seeds] == ["hello+world", "%3F", "%GG"]
+    assert all(seed._table is None for seed in seeds)
+    assert second.executions == 50
+    assert [seed.data for seed in third.seeds] == [seed.data for seed in first.seeds][:third.max_seeds]
@@ -0,0 +1,61 @@
+import random
+from html.parser import HTMLParser
+
+from cgi_decode import cgi_decode
+
+from benchmarks.targets import CGI_GRAMMAR
+from poly_fuzzer.common.havoc import HavocMutator
+from poly_fuzzer.common.token_dictionary import TokenDictionary
+
+
+def test_grammar_terminals():
+    dictionary = TokenDictionary.extract(grammar=CGI_GRAMMAR)
+    for token in (b"name", b"query", b"=", b"&", b"%20", b"%GG"):
+        assert token in dictionary.tokens
+    # Nonterminals are not terminals
+    assert not any(token.startswith(b"<") for token in dictionary)
+
+
+def test_target_constants():
+    dictionary = TokenDictionary.extract(target=cgi_decode)
+    for token in (b"+", b"%", b"0", b"f", b"F"):
+        assert token in dictionary.tokens
+    # The message of the ValueError and the docstring contain spaces
+    assert b"Invalid encoding" not in dictionary.tokens
+    assert not any(len(token) > 4 and b" " in token for token in dictionary)
+
+
+def test_methods_of_the_target_module():
+    dictionary = TokenDictionary.extract(target=HTMLParser.feed)
+    assert b"<!doctype" in dictionary.tokens
+
+
+def test_duplicates_and_limits():
+    dictionary = TokenDictionary(["ab", b"ab", "", "x" * 40], max_tokens=3)
+    assert dictionary.tokens == [b"ab"]
+    assert dictionary.add("\udc80")
+    assert dictionary.add("c")
+    assert not dictionary.add("d")
+    assert TokenDictionary.of(None) is None
+    assert TokenDictionary.of(dictionary) is dictionary
+    assert TokenDictionary.of(["z"]).tokens == [b"z"]
+
+
+def test_prefix_index():
+    dictionary = TokenDictionary.extract(target=HTMLParser.feed)
+    completions = dictionary.starting_with(ord("<"))
+    assert b"<!doctype" in completions
+    assert all(token.startswith(b"<") for token in completions)
+    assert dictionary.starting_with(ord("\x00")) == ()
+
+
+def test_overwrite_completes_a_token():
+    random.seed(0)
+    havoc = HavocMutator(tokens=["<!doctype"])
+    results = set()
+    for _ in range(20):
+        buffer = havoc.load("<")
+        havoc.overwrite_token(buffer)
+        results.add(havoc.text(buffer))
+    # Half of the time "<" is completed; a token longer than the input is not overwritten
+    assert results == {"<", "<!doctype"}
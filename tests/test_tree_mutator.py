@@ -0,0 +1,77 @@
+import copy
+import random
+import re
+
+import pytest
+
+from benchmarks.targets import CGI_GRAMMAR, HTML_GRAMMAR
+from poly_fuzzer.common.tree_mutator import TreeMutator
+
+# CGI_GRAMMAR is regular: the strings it derives
+CHARS = r"(?:A|B|C|D|E|\+|%20|%3F|%GG|%)+"
+PARAM = r"(?:name|id|search|query)=" + CHARS
+CGI_LANGUAGE = re.compile(rf"{PARAM}(?:&{PARAM})*")
+
+
+def _is_derivation(grammar, node) -> bool:
+    """True if every node of the tree expands its nonterminal with one of its expansions."""
+    symbol_id, children = node
+    if children is None:
+        return False
+    tokens = tuple(child if isinstance(child, str) else child[0] for child in children)
+    if symbol_id is not None and tokens not in grammar.expansions[symbol_id]:
+        return False
+    return all(isinstance(child, str) or _is_derivation(grammar, child) for child in children)
+
+
+def _nodes(node):
+    yield node
+    for child in node[1]:
+        if not isinstance(child, str):
+            yield from _nodes(child)
+
+
+def _mutations(grammar, mutator):
+    donor = grammar.generate_tree()
+    return {
+        "regenerate": mutator.regenerate_subtree,
+        "splice": lambda tree: mutator.splice_subtree(tree, donor),
+        "duplicate": mutator.duplicate_subtree,
+        "mutate": lambda tree: mutator.mutate(tree, [donor]),
+    }
+
+
+@pytest.mark.parametrize("name", ["regenerate", "splice", "duplicate", "mutate"])
+def test_mutants_are_derivable(name):
+    random.seed(0)
+    mutator = TreeMutator(CGI_GRAMMAR)
+    mutate = _mutations(CGI_GRAMMAR, mutator)[name]
+    changed = 0
+    for _ in range(50):
+        tree = CGI_GRAMMAR.generate_tree()
+        mutant = mutate(tree)
+        assert _is_derivation(CGI_GRAMMAR, mutant)
+        assert CGI_LANGUAGE.fullmatch(CGI_GRAMMAR.tree_to_string(mutant))
+        changed += CGI_GRAMMAR.tree_to_string(mutant) != CGI_GRAMMAR.tree_to_string(tree)
+    assert changed > 0
+
+
+@pytest.mark.parametrize("name", ["regenerate", "splice", "duplicate"])
+def test_parent_is_unchanged(name):
+    random.seed(1)
+    grammar = HTML_GRAMMAR
+    mutator = TreeMutator(grammar)
+    mutate = _mutations(grammar, mutator)[name]
+    sharing = 0
+    for _ in range(20):
+        tree = grammar.generate_tree()
+        original = copy.deepcopy(tree)
+        mutant = mutate(tree)
+        assert tree == original
+        assert _is_derivation(grammar, mutant)
+        # Path copying: unless the root itself was replaced, the nodes off the mutated path
+        # are shared with the parent, not copied
+        shared = {id(node) for node in _nodes(tree)}
+        sharing += mutant is not tree and any(id(node) in shared for node in _nodes(mutant))
+    assert sharing > 0
+